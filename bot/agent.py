@@ -2,19 +2,19 @@ import math
 from lux.gamesetup.game import Game
 from lux.cell import Cell
 from lux.constants import Constants
+from lux.agent_log import AgentLog
 import random
 
 DIRECTIONS = Constants.DIRECTIONS
 game_state = None
 
-logfile = "agent.log"
-open(logfile, "w")
+log = AgentLog.from_environment()
 
-print('test')
 
 def agent(observation, configuration):
     global game_state
 
+    log.begin_turn(observation["step"])
     actions = setup(observation)
 
     player = game_state.players[observation.player]
@@ -53,13 +53,11 @@ def agent(observation, configuration):
                 actions.append(unit.build_city())
             expandable = can_build_city(player, unit)
             if expandable is not None:
-                with open(logfile, "a") as f:
-                    f.write(f"{observation['step']}: {unit.id} trying to build a city\n")
+                log.debug("%s trying to build a city", unit.id)
                 actions = build_city(unit, expandable, actions, taken_tiles)
             else:
                 if unit.get_cargo_space_left() > 0:
-                    with open(logfile, "a") as f:
-                        f.write(f"{observation['step']}: {unit.id} trying to collect resources\n")
+                    log.debug("%s trying to collect resources", unit.id)
                     closest_resource_tile = get_closest_resource(player, resource_tiles, unit)
                     if closest_resource_tile is not None:
                         move_dir = unit.pos.direction_to(closest_resource_tile.pos)
@@ -72,8 +70,7 @@ def agent(observation, configuration):
                         actions.append(unit.move(move_dir))
                 else:
                     if len(player.cities) > 0:
-                        with open(logfile, "a") as f:
-                            f.write(f"{observation['step']}: {unit.id} trying to deliver resources to city\n")
+                        log.debug("%s trying to deliver resources to city", unit.id)
                         closest_city_tile = get_closest_city(player, unit)
                         if closest_city_tile is not None:
                             move_dir = unit.pos.direction_to(closest_city_tile.pos)
@@ -90,7 +87,8 @@ def agent(observation, configuration):
 
     # you can add debug annotations using the functions in the annotate object
     # actions.append(annotate.circle(0, 0))
-    
+
+    log.end_turn()
     return actions
 
 
@@ -0,0 +1,54 @@
+"""
+Turns per second of BatchEnv against one LuxEngine per game, replaying the same recorded actions
+
+Run from the bot directory with: python -m benchmarks.bench_batch --size 16 --games 32
+"""
+import argparse
+import time
+
+from simulator.batch import BatchEnv
+from simulator.engine import LuxEngine
+from simulator.match import load_agent, run_match
+
+
+def record_actions(agent_path, size, seed):
+    """
+    Plays agent_path against itself and returns the actions of every turn
+    """
+    log = []
+    run_match([load_agent(agent_path), load_agent(agent_path)], size, seed,
+              on_turn=lambda turn, updates, actions: log.append(actions))
+    return log
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=16, choices=[12, 16, 24, 32])
+    arg_parser.add_argument("--games", type=int, default=32)
+    arg_parser.add_argument("--agent", default="risk_averse_baseline.py")
+    args = arg_parser.parse_args()
+
+    seeds = list(range(args.games))
+    logs = [record_actions(args.agent, args.size, seed) for seed in seeds]
+    turns = sum(len(log) for log in logs)
+
+    engines = [LuxEngine(args.size, seed) for seed in seeds]
+    start = time.perf_counter()
+    for engine, log in zip(engines, logs):
+        for actions in log:
+            engine.step(actions)
+    scalar = time.perf_counter() - start
+
+    env = BatchEnv(args.size, seeds)
+    start = time.perf_counter()
+    for turn in range(max(len(log) for log in logs)):
+        env.step([log[turn] if turn < len(log) else None for log in logs])
+    batched = time.perf_counter() - start
+
+    print(f"{args.games} games of {args.agent} on {args.size}x{args.size}, {turns} game turns")
+    print(f"{'LuxEngine, one per game':<28}{turns / scalar:>12.0f} turns/s")
+    print(f"{'BatchEnv':<28}{turns / batched:>12.0f} turns/s{scalar / batched:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Bytes per entity and total game-state footprint for a late-game 32x32 map with hundreds of units and city tiles
+
+Run from the bot directory with: python -m benchmarks.bench_memory
+"""
+import argparse
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+from lux.gamesetup.game import Game
+
+from benchmarks.observations import late_game_messages
+
+
+def slot_values(obj) -> dict:
+    return {name: getattr(obj, name) for cls in type(obj).__mro__ for name in getattr(cls, "__slots__", ())}
+
+
+def owned_size(obj) -> int:
+    """
+    Bytes held by obj itself: the object, its __dict__ if it has one and its Cargo for units. Shared objects such as
+    interned positions and id strings are not counted
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    cargo = getattr(obj, "cargo", None)
+    if cargo is not None:
+        size += owned_size(cargo)
+    return size
+
+
+def dict_backed_size(obj) -> int:
+    """
+    Bytes the same entity takes as a plain __dict__ object, the layout the lux classes used before __slots__
+    """
+    values = slot_values(obj)
+    reference = SimpleNamespace(**values)
+    size = sys.getsizeof(reference) + sys.getsizeof(reference.__dict__)
+    if "cargo" in values:
+        size += dict_backed_size(values["cargo"])
+    return size
+
+
+def build_game(messages) -> Game:
+    game = Game()
+    game._initialize(messages)
+    game._update(messages[2:])
+    system = SimpleNamespace(player=game.players[0], opponent=game.players[1], game=game, memory={})
+    game.map.calculate_metrics(system)
+    for y in range(game.map.height):
+        for x in range(game.map.width):
+            game.map.get_cell(x, y)
+    return game
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=32)
+    args = arg_parser.parse_args()
+
+    messages = late_game_messages(args.size)
+    build_game(messages)  # warm up imports and interned positions so they are not counted below
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    game = build_game(messages)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    units = [unit for player in game.players for unit in player.units]
+    cities = [city for player in game.players for city in player.cities.values()]
+    citytiles = [citytile for city in cities for citytile in city.citytiles]
+    cells = [game.map.get_cell(x, y) for y in range(game.map.height) for x in range(game.map.width)]
+    entities = [("Unit (with Cargo)", units), ("City", cities), ("CityTile", citytiles), ("Cell", cells)]
+
+    print(f"{args.size}x{args.size} late-game map: {len(units)} units, {len(cities)} cities, "
+          f"{len(citytiles)} city tiles, {len(cells)} cells")
+    print(f"{'entity':<20}{'bytes':>8}{'dict-backed':>14}{'count':>8}{'total':>10}")
+    for name, objects in entities:
+        size = owned_size(objects[0])
+        print(f"{name:<20}{size:>8}{dict_backed_size(objects[0]):>14}{len(objects):>8}{size * len(objects):>10}")
+    map_arrays = sum(getattr(game.map, name).nbytes for name in
+                     ("resource_type", "resource_amount", "road", "city_owner", "city_index", "city_cooldown"))
+    print(f"GameMap arrays: {map_arrays} bytes")
+    print(f"Total game-state footprint (tracemalloc): {total} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Lines parsed per second on a late-game 32x32 observation, for the original line-by-line parser and the table-driven
+batch parser in lux.gamesetup.parser
+
+A rebuild only fills the map arrays and builds the Unit, City and CityTile objects when they are first read, so it is
+timed both alone and followed by reading every entity
+
+Run from the bot directory with: python -m benchmarks.bench_parser
+"""
+import argparse
+import timeit
+
+from lux.city import City
+from lux.constants import Constants
+from lux.game_map import GameMap
+from lux.gamesetup.game import Game
+from lux.gamesetup.parser import parse_updates
+from lux.unit import Unit
+
+from benchmarks.observations import late_game_messages
+
+INPUT_CONSTANTS = Constants.INPUT_CONSTANTS
+
+
+def legacy_update(game, messages):
+    """
+    The if/elif parser Game._update used before the batch parser, kept as the baseline
+    """
+    game.map = GameMap(game.map_width, game.map_height)
+    game.turn += 1
+    game._reset_player_states()
+
+    for update in messages:
+        if update == "D_DONE":
+            break
+        strs = update.split(" ")
+        input_identifier = strs[0]
+        if input_identifier == INPUT_CONSTANTS.RESEARCH_POINTS:
+            team = int(strs[1])
+            game.players[team].research_points = int(strs[2])
+        elif input_identifier == INPUT_CONSTANTS.RESOURCES:
+            r_type = strs[1]
+            x = int(strs[2])
+            y = int(strs[3])
+            amt = int(float(strs[4]))
+            game.map._setResource(r_type, x, y, amt)
+        elif input_identifier == INPUT_CONSTANTS.UNITS:
+            unittype = int(strs[1])
+            team = int(strs[2])
+            unitid = strs[3]
+            x = int(strs[4])
+            y = int(strs[5])
+            cooldown = float(strs[6])
+            wood = int(strs[7])
+            coal = int(strs[8])
+            uranium = int(strs[9])
+            game.players[team].units.append(Unit(team, unittype, unitid, x, y, cooldown, wood, coal, uranium))
+        elif input_identifier == INPUT_CONSTANTS.CITY:
+            team = int(strs[1])
+            cityid = strs[2]
+            fuel = float(strs[3])
+            lightupkeep = float(strs[4])
+            game.players[team].cities[cityid] = City(team, cityid, fuel, lightupkeep)
+        elif input_identifier == INPUT_CONSTANTS.CITY_TILES:
+            team = int(strs[1])
+            cityid = strs[2]
+            x = int(strs[3])
+            y = int(strs[4])
+            cooldown = float(strs[5])
+            city = game.players[team].cities[cityid]
+            citytile = city._add_city_tile(x, y, cooldown)
+            game.map._setCityTile(citytile)
+            game.players[team].city_tile_count += 1
+        elif input_identifier == INPUT_CONSTANTS.ROADS:
+            x = int(strs[1])
+            y = int(strs[2])
+            road = float(strs[3])
+            game.map._setRoad(x, y, road)
+
+
+def new_game(messages, incremental=False) -> Game:
+    game = Game(incremental=incremental)
+    game._initialize(messages)
+    game._update(messages[2:])
+    return game
+
+
+def read_entities(game, updates) -> None:
+    """
+    a rebuild followed by reading every entity, which builds the objects the rebuild leaves to builders
+    """
+    game._update(updates)
+    for player in game.players:
+        player.units, player.cities
+    game.map.citytiles
+
+
+def lines_per_second(function, lines, number, repeat) -> float:
+    best = min(timeit.repeat(function, number=number, repeat=repeat))
+    return lines * number / best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=32)
+    arg_parser.add_argument("--number", type=int, default=50)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    messages = late_game_messages(args.size)
+    updates = messages[2:]
+    lines = len(updates) - 1
+    legacy_game = new_game(messages)
+    rebuild_game = new_game(messages)
+    incremental_game = new_game(messages, incremental=True)
+
+    results = [
+        ("legacy if/elif Game._update", lambda: legacy_update(legacy_game, updates)),
+        ("parse_updates (arrays only)", lambda: parse_updates(updates)),
+        ("batch Game._update, rebuild", lambda: rebuild_game._update(updates)),
+        ("batch Game._update, rebuild + read", lambda: read_entities(rebuild_game, updates)),
+        ("batch Game._update, incremental", lambda: incremental_game._update(updates)),
+    ]
+    print(f"{args.size}x{args.size} late-game observation, {lines} lines")
+    baseline = None
+    for name, function in results:
+        rate = lines_per_second(function, lines, args.number, args.repeat)
+        baseline = baseline or rate
+        print(f"{name:<34} {rate:>12,.0f} lines/s  {rate / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
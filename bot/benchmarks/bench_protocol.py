@@ -0,0 +1,143 @@
+"""
+Turn latency of the stdin/stdout protocol loop, from the engine writing the first line of a turn to reading its D_FINISH
+
+Run from the bot directory with: python -m benchmarks.bench_protocol --size 32
+A local stand-in for the engine replays every turn of a recorded game (see benchmarks.bench_suite) to an agent process,
+writing each turn in chunks of --lines-per-write lines the way the engine streams them, and waits for D_FINISH before
+writing the next turn. Two loops are timed: the line-at-a-time loop main.py used to run, with an input() per line and
+a print for the actions and another for D_FINISH, and lux.protocol.run_agent. With --agent parse the agent only
+parses the turn, so the timings are the protocol and parsing cost alone; with --agent ooagent it plays the turns
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter_ns
+from typing import Dict, List
+
+from lux.gamesetup.parser import parse_updates
+from lux.protocol import FINISH, LineReader, Observation, run_agent
+from simulator.match import BOT_DIR
+
+from benchmarks.bench_suite import SEEDS, load_replay
+
+LOOPS = ["legacy", "stream"]
+
+
+# -------------------------------------- Agent process --------------------------------------- #
+
+def parse_only(observation, configuration) -> List[str]:
+    """
+    an agent that parses the turn, unless the loop already did, and does nothing
+    """
+    if "parsed" not in observation:
+        parse_updates(observation["updates"][2:] if observation["step"] == 0 else observation["updates"])
+    return []
+
+
+def legacy_loop(agent) -> None:
+    """
+    The loop main.py ran before lux.protocol: one input() per line and two prints per turn
+    """
+    observation = Observation()
+    observation["updates"] = []
+    observation["step"] = 0
+    step = 0
+    while True:
+        try:
+            inputs = input()
+        except EOFError:
+            return
+        observation["updates"].append(inputs)
+        if step == 0:
+            observation.player = int(observation["updates"][0])
+        if inputs == "D_DONE":
+            actions = agent(observation, None)
+            print(",".join(actions))
+            print("D_FINISH")
+            observation["updates"] = []
+            step += 1
+            observation["step"] = step
+
+
+def serve(loop: str, agent_name: str) -> None:
+    if agent_name == "ooagent":
+        from ooagent import agent
+    else:
+        agent = parse_only
+    if loop == "legacy":
+        legacy_loop(agent)
+    else:
+        run_agent(agent, LineReader(sys.stdin.fileno()), sys.stdout.buffer)
+
+
+# --------------------------------------- Engine side ---------------------------------------- #
+
+def time_turns(loop: str, agent_name: str, turns: List[List[str]], lines_per_write: int) -> List[float]:
+    """
+    Microseconds from writing the first line of every turn to reading its D_FINISH
+    """
+    chunks = [[("\n".join(updates[start:start + lines_per_write]) + "\n").encode()
+               for start in range(0, len(updates), lines_per_write)] for updates in turns]
+    scratch = tempfile.mkdtemp(prefix="lux-protocol-")
+    # the legacy loop relies on unbuffered prints, as main.py did under the runner
+    environment = dict(os.environ, PYTHONPATH=BOT_DIR, PYTHONUNBUFFERED="1", LUX_LOG="")
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_protocol", "--serve", loop, "--agent",
+                                agent_name], cwd=scratch, env=environment, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    stdin = process.stdin.fileno()
+    finish = FINISH.encode()
+    elapsed = []
+    try:
+        for turn_chunks in chunks:
+            start = perf_counter_ns()
+            for chunk in turn_chunks:
+                os.write(stdin, chunk)
+            for line in process.stdout:
+                if line.rstrip(b"\r\n") == finish:
+                    break
+            else:
+                raise RuntimeError(f"the {loop} loop exited with code {process.wait()} before D_FINISH")
+            elapsed.append((perf_counter_ns() - start) / 1e3)
+    finally:
+        process.stdin.close()
+        process.wait()
+        shutil.rmtree(scratch, ignore_errors=True)
+    return elapsed
+
+
+def report(loop: str, elapsed: List[float]) -> Dict[str, float]:
+    ranked = sorted(elapsed)
+    result = dict(median_us=statistics.median(ranked), p95_us=ranked[int(len(ranked) * 0.95)],
+                  mean_us=statistics.fmean(ranked))
+    print(f"{loop:<10}{result['median_us']:>12,.0f} us median{result['p95_us']:>12,.0f} us p95"
+          f"{result['mean_us']:>12,.0f} us mean")
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=32, choices=list(SEEDS))
+    arg_parser.add_argument("--agent", default="parse", choices=["parse", "ooagent"])
+    arg_parser.add_argument("--loops", nargs="+", default=LOOPS, choices=LOOPS)
+    arg_parser.add_argument("--lines-per-write", type=int, default=32,
+                            help="lines the engine stand-in writes at a time")
+    arg_parser.add_argument("--replays", default=os.path.join(BOT_DIR, "benchmarks", "replays"),
+                            help="directory of the recorded games")
+    arg_parser.add_argument("--serve", default=None, choices=LOOPS, help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    if args.serve is not None:
+        serve(args.serve, args.agent)
+        return
+
+    turns, digest = load_replay(os.path.abspath(args.replays), args.size)
+    print(f"{len(turns)} turns of replay {digest}, {sum(map(len, turns)):,} lines, agent {args.agent}")
+    for loop in args.loops:
+        report(loop, time_turns(loop, args.agent, turns, args.lines_per_write))
+
+
+if __name__ == "__main__":
+    main()
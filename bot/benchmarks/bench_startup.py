@@ -0,0 +1,87 @@
+"""
+Cold start of an agent process: the time from launching main.py until it prints the D_FINISH of the first turn
+
+Run from the bot directory with: python -m benchmarks.bench_startup --entries main.py oomain.py
+Every run starts a fresh interpreter in a scratch directory, the way the Lux runner and simulator.match.ProcessAgent
+do, and writes the first turn of a simulated game to its stdin as soon as it is launched. The bare interpreter, python
+-c pass, is timed the same way as the floor every entry pays before its first import. Every entry is also timed as it
+was at --baseline, the first commit of the repository unless another revision is given, extracted with git archive
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter_ns
+from typing import Dict, List, Optional
+
+from benchmarks.revisions import export_revision, get_root_revision, remove_export
+from simulator.engine import LuxEngine
+from simulator.match import BOT_DIR
+
+
+def time_first_turn(command: List[str], messages: Optional[List[str]]) -> float:
+    """
+    Milliseconds from launching command until it prints D_FINISH, or until it exits when messages is None
+    """
+    scratch = tempfile.mkdtemp(prefix="lux-startup-")
+    environment = dict(os.environ, LUX_REPLAY="")
+    try:
+        start = perf_counter_ns()
+        process = subprocess.Popen(command, cwd=scratch, env=environment, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        if messages is None:
+            process.communicate()
+            return (perf_counter_ns() - start) / 1e6
+        process.stdin.write("\n".join(messages) + "\n")
+        process.stdin.flush()
+        for line in process.stdout:
+            if line.rstrip("\n") == "D_FINISH":
+                elapsed = (perf_counter_ns() - start) / 1e6
+                break
+        else:
+            raise RuntimeError(f"{' '.join(command)} exited with code {process.wait()} before D_FINISH")
+        process.kill()
+        process.communicate()
+        return elapsed
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def report(name: str, elapsed: List[float]) -> Dict[str, float]:
+    result = dict(median_ms=statistics.median(elapsed), min_ms=min(elapsed), max_ms=max(elapsed))
+    print(f"{name:<16}{result['median_ms']:>10.1f} ms median{result['min_ms']:>10.1f} ms min"
+          f"{result['max_ms']:>10.1f} ms max")
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--entries", nargs="+", default=["main.py", "oomain.py"],
+                            help="agent entry points in the bot directory")
+    arg_parser.add_argument("--size", type=int, default=32, choices=[12, 16, 24, 32])
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--number", type=int, default=20, help="launches of every entry")
+    arg_parser.add_argument("--baseline", default=get_root_revision(),
+                            help="git revision the entries are also timed at, none to skip it")
+    args = arg_parser.parse_args()
+
+    messages = LuxEngine(args.size, args.seed).get_initial_messages(0)
+    report("python", [time_first_turn([sys.executable, "-c", "pass"], None) for _ in range(args.number)])
+    baseline_dir = export_revision(args.baseline) if args.baseline and args.baseline != "none" else None
+    try:
+        for entry in args.entries:
+            command = [sys.executable, os.path.join(BOT_DIR, entry)]
+            report(entry, [time_first_turn(command, messages) for _ in range(args.number)])
+            if baseline_dir is not None and os.path.exists(os.path.join(baseline_dir, entry)):
+                command = [sys.executable, os.path.join(baseline_dir, entry)]
+                report(f"  @{args.baseline[:7]}", [time_first_turn(command, messages) for _ in range(args.number)])
+    finally:
+        if baseline_dir is not None:
+            remove_export(baseline_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+"""
+Ops per second and allocations of the lux hot paths on recorded games, for every map size at early, mid and late game
+
+Run from the bot directory with: python -m benchmarks.bench_suite --out bench_results.json --compare old.json
+The games are played once by the simulator, ooagent against the risk averse baseline, and recorded with lux.replay
+into --replays. Later runs load the recordings, so every run and every commit times the same observations; delete the
+directory to record them again. Each result names the replay it came from by digest, and --compare only lines up
+results recorded on the same replay. Results are written as JSON, one entry per benchmark, size and phase
+
+--baseline REV also times whole turns of ooagent as it was at a git revision, the first commit when no revision is
+given, against the ooagent of the working tree. Both play every recorded turn in a fresh interpreter, and the median
+turn around each phase is compared
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter_ns
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.revisions import export_revision, get_root_revision, remove_export
+from lux.replay import ReplayReader, ReplayRecorder
+from simulator.match import BOT_DIR, Observation, load_agent, run_match
+
+SEEDS = {12: 3, 16: 1, 24: 2, 32: 3}
+PHASES = {"early": 15, "mid": 170, "late": 330}
+PHASE_WINDOW = 10  # turns on either side of a phase whose median whole turn is compared against the baseline
+AGENTS = ["ooagent.py", "risk_averse_baseline.py"]
+
+Result = Dict[str, Any]
+
+
+# ---------------------------------------- Recordings ---------------------------------------- #
+
+def record_replay(size: int, seed: int, path: str) -> None:
+    """
+    Plays AGENTS[0] against AGENTS[1] and records what team 0 saw and did every turn
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    recorder = ReplayRecorder(path)
+    agents = [load_agent(os.path.join(BOT_DIR, name)) for name in AGENTS]
+    run_match(agents, size, seed, on_turn=lambda turn, updates, actions: recorder.record(turn, updates[0], actions[0]))
+    recorder.close()
+
+
+def load_replay(directory: str, size: int) -> Tuple[List[List[str]], str]:
+    """
+    The update lines of every turn of the recorded game on size, recording it first if needed, and the digest of the
+    replay file
+    """
+    path = os.path.join(directory, f"replay_{size}_{SEEDS[size]}.lxr")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        staging = f"{path}.tmp"
+        record_replay(size, SEEDS[size], staging)
+        os.replace(staging, path)
+    reader = ReplayReader(path)
+    turns = [updates for updates, _ in reader]
+    reader.close()
+    with open(path, "rb") as replay_file:
+        digest = hashlib.sha1(replay_file.read()).hexdigest()[:12]
+    return turns, digest
+
+
+def make_observation(turns: List[List[str]], turn: int) -> Observation:
+    observation = Observation(0)
+    observation["step"] = turn
+    observation["updates"] = turns[turn]
+    return observation
+
+
+# ----------------------------------------- Measuring ---------------------------------------- #
+
+def measure(name: str, operation: Callable[[Any], Any], prepare: Callable[[], Any], number: int) -> Result:
+    """
+    Times number calls of operation, each on a fresh argument from prepare() made outside the timed region, then
+    traces the allocations of one more call
+    """
+    elapsed = []
+    for _ in range(number):
+        argument = prepare()
+        start = perf_counter_ns()
+        operation(argument)
+        elapsed.append(perf_counter_ns() - start)
+    argument = prepare()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    operation(argument)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = sum(elapsed)
+    return dict(benchmark=name, ops=number, ops_per_second=number * 1e9 / total, mean_us=total / number / 1e3,
+                min_us=min(elapsed) / 1e3, alloc_peak_bytes=peak - before, alloc_retained_bytes=current - before)
+
+
+def measure_each(name: str, operation: Callable[[Any], Any], arguments: List[Any], repeat: int) -> Result:
+    """
+    Times operation on every one of arguments, repeat times over, then traces the allocations of one pass. Ops and
+    allocations are counted per call, and ops_per_second is None when there is nothing to call it on
+    """
+    elapsed = []
+    for _ in range(repeat):
+        for argument in arguments:
+            start = perf_counter_ns()
+            operation(argument)
+            elapsed.append(perf_counter_ns() - start)
+    peaks = []
+    retained = 0
+    tracemalloc.start()
+    for argument in arguments:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        operation(argument)
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        retained += current - before
+    tracemalloc.stop()
+    if not elapsed:
+        return dict(benchmark=name, ops=0, ops_per_second=None, mean_us=None, min_us=None, alloc_peak_bytes=0,
+                    alloc_retained_bytes=0)
+    total = sum(elapsed)
+    return dict(benchmark=name, ops=len(elapsed), ops_per_second=len(elapsed) * 1e9 / total,
+                mean_us=total / len(elapsed) / 1e3, min_us=min(elapsed) / 1e3,
+                alloc_peak_bytes=sum(peaks) // len(peaks), alloc_retained_bytes=retained // len(peaks))
+
+
+# ---------------------------------------- Benchmarks ---------------------------------------- #
+
+def bench_turn(turns: List[List[str]], turn: int, number: int) -> List[Result]:
+    """
+    Every benchmark on the observation of turn, with the state of an ooagent that played the turns before it
+    """
+    agent = load_agent(os.path.join(BOT_DIR, "ooagent.py"))
+    module = sys.modules[agent.__module__]
+    for previous in range(turn):
+        agent(make_observation(turns, previous), None)
+    # the profiler, log, budget and turn store hold files and clocks, so every copy shares the live ones
+    services = {id(service): service for service in (module.system.profiler, module.system.log, module.system.budget,
+                                                     module.system.turn_store)}
+    saved = copy.deepcopy(module.system, dict(services))
+
+    def restore() -> None:
+        module.system = copy.deepcopy(saved, dict(services))
+
+    def prepare_system():
+        restore()
+        system = module.system
+        system.setup(make_observation(turns, turn))
+        system.player.activate_city_actions(system)
+        return system
+
+    results = [measure("Game._update", lambda game: game._update(turns[turn]),
+                       lambda: copy.deepcopy(saved.game), number)]
+
+    system = prepare_system()
+    results.append(measure("GameMap.calculate_metrics", lambda metrics_system: metrics_system.map.calculate_metrics(
+        metrics_system), lambda: system, number))
+    positions = [unit.pos for unit in system.player.units]
+    game_map = system.map
+    metrics = SimpleNamespace(player=system.player, opponent=system.opponent, step=system.step)
+    results.append(measure_each("GameMap.get_closest_resource_position",
+                                lambda pos: game_map.get_closest_resource_position(pos, metrics), positions, number))
+    results.append(measure_each("GameMap.get_closest_city_tile",
+                                lambda pos: game_map.get_closest_city_tile(pos, metrics), positions, number))
+    results.append(measure_each("GameMap.get_closest_safe_tile", game_map.get_closest_safe_tile, positions, number))
+
+    system = prepare_system()
+    units = [unit for unit in system.player.units if unit.can_act()]
+    results.append(measure_each("Unit.activate_actions", lambda unit: unit.activate_actions(system, system.player),
+                                units, number))
+
+    def prepare_turn() -> Observation:
+        restore()
+        return make_observation(turns, turn)
+
+    results.append(measure("ooagent.agent", lambda observation: agent(observation, None), prepare_turn, number))
+    for result in results:
+        result.update(units=len(system.player.units), city_tiles=system.player.city_tile_count)
+    return results
+
+
+def run_suite(sizes: List[int], phases: List[str], replays: str, number: int) -> List[Result]:
+    results = []
+    for size in sizes:
+        turns, digest = load_replay(replays, size)
+        for phase in phases:
+            turn = min(PHASES[phase], len(turns) - 1)
+            for result in bench_turn(turns, turn, number):
+                results.append(dict(size=size, phase=phase, turn=turn, replay=digest, **result))
+                rate = "-" if result["ops_per_second"] is None else f"{result['ops_per_second']:,.0f}"
+                print(f"{size:>3} {phase:<6}{result['benchmark']:<40}{rate:>12} ops/s"
+                      f"{result['alloc_peak_bytes']:>12,} B peak", file=sys.stderr)
+    return results
+
+
+# ------------------------------------------ Baseline ---------------------------------------- #
+
+# run in a fresh interpreter with the bot directory, the recorded turns as JSON and the output path as arguments
+TURN_TIMER = """
+import json
+import sys
+from time import perf_counter_ns
+
+sys.path.insert(0, sys.argv[1])
+from ooagent import agent
+
+
+class Observation(dict):
+    def __init__(self, player=0):
+        super().__init__()
+        self.player = player
+
+
+with open(sys.argv[2]) as turns_file:
+    turns = json.load(turns_file)
+elapsed = []
+for step, updates in enumerate(turns):
+    observation = Observation()
+    observation["step"] = step
+    observation["updates"] = updates
+    start = perf_counter_ns()
+    agent(observation, None)
+    elapsed.append(perf_counter_ns() - start)
+with open(sys.argv[3], "w") as out_file:
+    json.dump(elapsed, out_file)
+"""
+
+
+def time_turns(bot_dir: str, turns: List[List[str]], number: int) -> List[float]:
+    """
+    Microseconds of every turn of the ooagent in bot_dir playing turns, the fastest of number games. Every game runs
+    in a fresh interpreter in a scratch directory, so agents of different commits share neither modules nor files
+    """
+    scratch = tempfile.mkdtemp(prefix="lux-turns-")
+    try:
+        turns_path = os.path.join(scratch, "turns.json")
+        with open(turns_path, "w") as turns_file:
+            json.dump(turns, turns_file)
+        fastest = None
+        for _ in range(number):
+            out_path = os.path.join(scratch, "elapsed.json")
+            subprocess.run([sys.executable, "-c", TURN_TIMER, bot_dir, turns_path, out_path], cwd=scratch, check=True,
+                           stdout=subprocess.DEVNULL)
+            with open(out_path) as out_file:
+                elapsed = json.load(out_file)
+            fastest = elapsed if fastest is None else [min(old, new) for old, new in zip(fastest, elapsed)]
+        return [nanoseconds / 1e3 for nanoseconds in fastest]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def compare_turns(sizes: List[int], phases: List[str], replays: str, revision: str, number: int,
+                  tolerance: float) -> Tuple[List[Result], List[str]]:
+    """
+    Whole turns of the working tree's ooagent against the one at revision on every size and phase, and the keys of
+    those slower by more than tolerance
+    """
+    baseline_dir = export_revision(revision)
+    results, regressions = [], []
+    try:
+        for size in sizes:
+            turns, digest = load_replay(replays, size)
+            head = time_turns(BOT_DIR, turns, number)
+            baseline = time_turns(baseline_dir, turns, number)
+            for phase in phases:
+                window = slice(max(PHASES[phase] - PHASE_WINDOW, 0), PHASES[phase] + PHASE_WINDOW + 1)
+                head_us, baseline_us = statistics.median(head[window]), statistics.median(baseline[window])
+                ratio = baseline_us / head_us
+                flag = ""
+                if ratio < 1 - tolerance:
+                    flag = "  REGRESSION"
+                    regressions.append(f"whole turn {size} {phase}")
+                results.append(dict(benchmark="ooagent whole turn", size=size, phase=phase, replay=digest,
+                                    revision=revision, median_us=head_us, baseline_median_us=baseline_us))
+                print(f"{size:>3} {phase:<6}{'ooagent whole turn':<24}{head_us:>10,.0f} us{baseline_us:>10,.0f} us "
+                      f"at {revision[:7]}{ratio:>8.2f}x{flag}")
+    finally:
+        remove_export(baseline_dir)
+    return results, regressions
+
+
+# ----------------------------------------- Reporting ---------------------------------------- #
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BOT_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Result], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    Prints the change in ops per second of every result against the same benchmark in the baseline file and returns
+    the keys of those slower by more than tolerance
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = {(result["benchmark"], result["size"], result["phase"], result["replay"]): result
+                    for result in json.load(baseline_file)["results"]}
+    regressions = []
+    for result in results:
+        key = (result["benchmark"], result["size"], result["phase"], result["replay"])
+        old = baseline.get(key)
+        if old is None or not old["ops_per_second"] or not result["ops_per_second"]:
+            continue
+        ratio = result["ops_per_second"] / old["ops_per_second"]
+        flag = ""
+        if ratio < 1 - tolerance:
+            flag = "  REGRESSION"
+            regressions.append(f"{key[0]} {key[1]} {key[2]}")
+        print(f"{key[1]:>3} {key[2]:<6}{key[0]:<40}{ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--sizes", nargs="+", type=int, default=[12, 16, 24, 32], choices=[12, 16, 24, 32])
+    arg_parser.add_argument("--phases", nargs="+", default=list(PHASES), choices=list(PHASES))
+    arg_parser.add_argument("--number", type=int, default=20, help="timed calls of every benchmark")
+    arg_parser.add_argument("--replays", default=os.path.join(BOT_DIR, "benchmarks", "replays"),
+                            help="directory of the recorded games")
+    arg_parser.add_argument("--out", default="bench_results.json", help="where the results are written as JSON")
+    arg_parser.add_argument("--compare", default=None, help="results file of an earlier run to compare against")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2,
+                            help="slowdown beyond which --compare and --baseline report a regression")
+    arg_parser.add_argument("--baseline", nargs="?", const=get_root_revision(), default=None,
+                            help="git revision to time whole turns against, the first commit when none is given")
+    arg_parser.add_argument("--games", type=int, default=3,
+                            help="games played by each agent for --baseline, keeping the fastest time of every turn")
+    args = arg_parser.parse_args()
+    out = os.path.abspath(args.out)
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    replays = os.path.abspath(args.replays)
+
+    results = run_suite(args.sizes, args.phases, replays, args.number)
+    whole_turns, regressions = [], []
+    if args.baseline is not None:
+        whole_turns, regressions = compare_turns(args.sizes, args.phases, replays, args.baseline, args.games,
+                                                 args.tolerance)
+    with open(out, "w") as out_file:
+        json.dump(dict(commit=get_commit(), python=platform.python_version(), number=args.number, results=results,
+                       whole_turns=whole_turns), out_file, indent=2)
+    print(f"{len(results)} results written to {out}")
+    if compare_path is not None:
+        regressions += compare(results, compare_path, args.tolerance)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
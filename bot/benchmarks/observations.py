@@ -0,0 +1,44 @@
+import random
+from typing import List
+
+RESOURCE_TYPES = ["wood", "wood", "wood", "coal", "uranium"]
+
+
+def late_game_updates(size: int = 32, seed: int = 0, units: int = 300, citytiles: int = 250,
+                      resources: int = 260, roads: int = 400) -> List[str]:
+    """
+    Returns the update lines of a synthetic late-game turn: a crowded board with hundreds of units and city tiles,
+    terminated by D_DONE
+    """
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    rng.shuffle(cells)
+    resource_cells = cells[:resources]
+    city_cells = cells[resources:resources + citytiles]
+
+    lines = ["rp 0 210", "rp 1 187"]
+    for x, y in resource_cells:
+        lines.append(f"r {rng.choice(RESOURCE_TYPES)} {x} {y} {rng.randint(1, 1500)}")
+    for i in range(units):
+        x, y = rng.choice(cells)
+        lines.append(f"u {rng.choice([0, 0, 0, 1])} {i % 2} u_{i} {x} {y} {rng.choice([0, 1, 2])} "
+                     f"{rng.randint(0, 100)} {rng.randint(0, 20)} {rng.randint(0, 5)}")
+    cities = max(1, citytiles // 8)
+    for i in range(cities):
+        lines.append(f"c {i % 2} c_{i} {rng.uniform(0, 5000):.2f} {rng.randint(1, 8) * 23}")
+    for i, (x, y) in enumerate(city_cells):
+        city = i % cities
+        lines.append(f"ct {city % 2} c_{city} {x} {y} {rng.choice([0, 5, 10])}")
+    for x, y in city_cells:
+        lines.append(f"ccd {x} {y} 6")
+    for x, y in cells[resources + citytiles:resources + citytiles + roads - citytiles]:
+        lines.append(f"ccd {x} {y} {rng.choice([0.75, 1.5, 2.25, 3])}")
+    lines.append("D_DONE")
+    return lines
+
+
+def late_game_messages(size: int = 32, seed: int = 0) -> List[str]:
+    """
+    Same as late_game_updates, with the player id and map size header of the first turn
+    """
+    return ["0", f"{size} {size}"] + late_game_updates(size, seed)
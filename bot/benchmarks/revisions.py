@@ -0,0 +1,45 @@
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
+from typing import Optional
+
+from simulator.match import BOT_DIR
+
+
+def get_root_revision() -> Optional[str]:
+    """
+    the first commit of the repository, the agent as it was before any of the work the benchmarks measure
+    """
+    try:
+        roots = subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], cwd=BOT_DIR, capture_output=True,
+                               text=True, check=True).stdout.split()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return roots[-1] if roots else None
+
+
+def export_revision(revision: str) -> str:
+    """
+    Extracts the bot directory of a git revision into a new scratch directory and returns the path of its bot
+    directory. remove_export deletes it again
+    """
+    scratch = tempfile.mkdtemp(prefix="lux-revision-")
+    archive = os.path.join(scratch, "bot.tar")
+    try:
+        with open(archive, "wb") as archive_file:
+            subprocess.run(["git", "archive", "--format=tar", f"{revision}:{os.path.basename(BOT_DIR)}"],
+                           cwd=os.path.dirname(BOT_DIR), stdout=archive_file, check=True)
+        bot_dir = os.path.join(scratch, "bot")
+        with tarfile.open(archive) as tar:
+            tar.extractall(bot_dir)
+    except BaseException:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise
+    os.remove(archive)
+    return bot_dir
+
+
+def remove_export(bot_dir: str) -> None:
+    shutil.rmtree(os.path.dirname(bot_dir), ignore_errors=True)
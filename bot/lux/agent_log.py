@@ -0,0 +1,162 @@
+import atexit
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, TextIO, Tuple
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": OFF}
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+Record = Tuple[int, int, str, Tuple[Any, ...]]  # turn, level, message, args
+
+_logs: Dict[str, "AgentLog"] = {}
+
+
+def discard(message, *args) -> None:
+    """
+    what the methods of disabled levels are bound to
+    """
+
+
+class AgentLog:
+    """
+    A buffered log for the agents. Logging a record only appends (turn, level, message, args) to an in-memory queue:
+    nothing is formatted or written on the caller's path. end_turn hands the queue to a background thread that
+    formats the records as "<turn> <LEVEL> <message % args>" lines and writes them in one call, so the writing happens
+    while the agent waits for its next observation. Without the thread, end_turn writes them itself
+
+    The methods of the levels below level are bound to a shared no-op by set_level, so a disabled call does no work
+    besides the call itself. Arguments are formatted when the records are written, after the turn, so pass values
+    that will not change by then (copy lists and dicts) and guard expensive arguments with enabled_for in hot loops.
+    The file is emptied on the first write rather than when the log is made, then only appended to. Give every agent
+    its own path: agents sharing a process share the log of a path, but two copies of the kit (the "lux" and ".lux"
+    imports of the simulator) do not, and the second one to write would empty the first one's records
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        the file the records are written to
+    level : int
+        the lowest level recorded, one of DEBUG, INFO, WARNING, ERROR or OFF
+    threaded : bool
+        whether a background thread writes the records
+    turn : int
+        the turn records are stamped with, set by begin_turn
+    records : Deque[Record]
+        the records not written yet
+    written : int
+        number of records written so far
+    """
+
+    def __init__(self, path: str, level: int = INFO, threaded: bool = True) -> None:
+        self.path: str = path
+        self.level: int = level
+        self.threaded: bool = threaded
+        self.turn: int = 0
+        self.records: Deque[Record] = deque()
+        self.written: int = 0
+        self.__file: Optional[TextIO] = None
+        self.__lock = threading.Lock()
+        self.__pending = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.set_level(level)
+
+    @classmethod
+    def from_environment(cls, path: str = "agent.log", level: int = INFO, path_variable: str = "LUX_LOG",
+                         level_variable: str = "LUX_LOG_LEVEL") -> "AgentLog":
+        """
+        the log shared by every agent of the process writing to the path named by path_variable, or to path when it
+        is unset, at the level named by level_variable (debug, info, warning, error or off). Setting path_variable to
+        an empty string turns logging off
+        """
+        path = os.environ.get(path_variable, path)
+        log = _logs.get(path)
+        if log is None:
+            level = LEVELS[os.environ[level_variable].lower()] if os.environ.get(level_variable) else level
+            log = _logs[path] = cls(path, level if path else OFF)
+        return log
+
+    # ----------------------------------- Public functions ------------------------------------- #
+
+    def set_level(self, level: int) -> None:
+        self.level = level
+        for name, method_level in (("debug", DEBUG), ("info", INFO), ("warning", WARNING), ("error", ERROR)):
+            if method_level < level:
+                setattr(self, name, discard)
+            else:
+                self.__dict__.pop(name, None)
+
+    def enabled_for(self, level: int) -> bool:
+        return level >= self.level
+
+    def debug(self, message: str, *args) -> None:
+        self.records.append((self.turn, DEBUG, message, args))
+
+    def info(self, message: str, *args) -> None:
+        self.records.append((self.turn, INFO, message, args))
+
+    def warning(self, message: str, *args) -> None:
+        self.records.append((self.turn, WARNING, message, args))
+
+    def error(self, message: str, *args) -> None:
+        self.records.append((self.turn, ERROR, message, args))
+
+    def begin_turn(self, turn: int) -> None:
+        self.turn = turn
+
+    def end_turn(self) -> None:
+        """
+        has the records of the turn written, by the background thread when threaded
+        """
+        if not self.records:
+            return
+        if not self.threaded:
+            self.flush()
+            return
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__write_pending, name=f"log {self.path}", daemon=True)
+            self.__thread.start()
+            atexit.register(self.close)
+        self.__pending.set()
+
+    def flush(self) -> None:
+        """
+        formats and writes every queued record now
+        """
+        with self.__lock:
+            lines = []
+            records = self.records
+            while records:
+                turn, level, message, args = records.popleft()
+                lines.append(f"{turn} {LEVEL_NAMES[level]} {message % args if args else message}\n")
+            if not lines:
+                return
+            if self.__file is None:
+                if not self.written:
+                    open(self.path, "w").close()
+                self.__file = open(self.path, "a")
+            self.__file.write("".join(lines))
+            self.__file.flush()
+            self.written += len(lines)
+
+    def close(self) -> None:
+        self.flush()
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.close()
+                self.__file = None
+
+    # ---------------------------------- Private functions ------------------------------------- #
+
+    def __write_pending(self) -> None:
+        while True:
+            self.__pending.wait()
+            self.__pending.clear()
+            self.flush()
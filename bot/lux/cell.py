@@ -1,20 +1,63 @@
 from typing import Optional
 
 from .citytile import CityTile
+from .constants import Constants
 from .position import Position
 
+RESOURCE_CODES = Constants.RESOURCE_CODES
+
 
 class Cell:
+    """
+    A lazy view onto one square of a GameMap. All state lives in the map's arrays, the cell only knows where it is
+    """
+
+    __slots__ = ("pos", "_map")
+
     class Resource:
+        __slots__ = ("type", "amount")
+
         def __init__(self, r_type: str, amount: int):
             self.type: str = r_type
             self.amount: int = amount
 
-    def __init__(self, x, y):
+    def __init__(self, game_map, x, y):
         self.pos: Position = Position(x, y)
-        self.resource: Optional[Cell.Resource] = None
-        self.citytile: Optional[CityTile] = None
-        self.road: float = 0
+        self._map = game_map
+
+    @property
+    def resource(self) -> Optional['Cell.Resource']:
+        code = self._map.resource_type[self.pos.y, self.pos.x]
+        if code == RESOURCE_CODES.NONE:
+            return None
+        return Cell.Resource(RESOURCE_CODES.TYPES[code], int(self._map.resource_amount[self.pos.y, self.pos.x]))
+
+    @resource.setter
+    def resource(self, resource: Optional['Cell.Resource']) -> None:
+        if resource is None:
+            self._map._setResource(None, self.pos.x, self.pos.y, 0)
+        else:
+            self._map._setResource(resource.type, self.pos.x, self.pos.y, resource.amount)
+
+    @property
+    def citytile(self) -> Optional[CityTile]:
+        return self._map.citytiles.get((self.pos.x, self.pos.y))
+
+    @citytile.setter
+    def citytile(self, citytile: Optional[CityTile]) -> None:
+        if citytile is None:
+            self._map._removeCityTile(self.pos.x, self.pos.y)
+        else:
+            self._map._setCityTile(citytile)
+
+    @property
+    def road(self) -> float:
+        return float(self._map.road[self.pos.y, self.pos.x])
+
+    @road.setter
+    def road(self, road: float) -> None:
+        self._map._setRoad(self.pos.x, self.pos.y, road)
 
     def has_resource(self) -> bool:
-        return self.resource is not None and self.resource.amount > 0
+        return self._map.resource_type[self.pos.y, self.pos.x] != RESOURCE_CODES.NONE and \
+            self._map.resource_amount[self.pos.y, self.pos.x] > 0
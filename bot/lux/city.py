@@ -1,12 +1,11 @@
 from .citytile import CityTile
 from .position import Position
-from .constants import Constants
-
-NIGHT_DURATION = Constants.TIME.NIGHT_DURATION
-NUMBER_OF_NIGHTS_BACKUP = Constants.GAME_PARAMETERS.NUMBER_OF_NIGHTS_BACKUP
+from .tables import CITY_BACKUP_TURNS
 
 
 class City:
+    __slots__ = ("cityid", "team", "fuel", "citytiles", "light_upkeep")
+
     def __init__(self, teamid, cityid, fuel, light_upkeep):
         self.cityid: int = cityid
         self.team: int = teamid
@@ -19,6 +18,19 @@ class City:
         self.citytiles.append(ct)
         return ct
 
+    def _attach_city_tile(self, citytile, cooldown):
+        citytile.cooldown = cooldown
+        self.citytiles.append(citytile)
+        return citytile
+
+    def _update(self, fuel, light_upkeep):
+        """
+        do not use this function, this is for internal tracking of state
+        """
+        self.fuel = fuel
+        self.light_upkeep = light_upkeep
+        self.citytiles = []
+
     def get_light_upkeep(self) -> float:
         return self.light_upkeep
 
@@ -32,5 +44,11 @@ class City:
             citytiles.append(citytile.get_closest_free_adjacent_position(pos, system))
         return pos.get_closest_from_list(citytiles)
 
-    def can_expand(self):
-        return self.fuel > self.light_upkeep * NIGHT_DURATION * NUMBER_OF_NIGHTS_BACKUP
+    def can_expand(self, forecast=None) -> bool:
+        """
+        whether or not the city has fuel to spare for a new city tile, by the turn's FuelForecast when given and
+        otherwise by its fuel against NUMBER_OF_NIGHTS_BACKUP nights of upkeep
+        """
+        if forecast is None:
+            return self.fuel > self.light_upkeep * CITY_BACKUP_TURNS
+        return forecast.can_expand(self.cityid)
@@ -2,6 +2,8 @@ from .position import Position
 
 
 class CityTile:
+    __slots__ = ("cityid", "team", "pos", "cooldown")
+
     def __init__(self, teamid, cityid, x, y, cooldown):
         self.cityid: int = cityid
         self.team: int = teamid
@@ -1,25 +1,50 @@
-from .constants import Constants
+from .tables import DAY_NUMBER, IS_AFTERNOON, IS_MIDDAY, IS_MORNING, IS_NIGHT, NIGHTS_REMAINING, TIME_OF_DAY, \
+    TURNS_UNTIL_NIGHT
 
-TIME = Constants.TIME
 
 class Clock:
+    """
+    The time of one turn, read from the per-turn tables of lux.tables when the clock is made
+
+    ...
+
+    Attributes
+    ----------
+    turn : int
+        the turn
+    time : int
+        turn within the day and night cycle
+    night : bool
+        whether it is night
+    turns_until_night : int
+        turns until the night of the current cycle falls, zero or less once it has
+    nights_remaining : int
+        night turns left in the game, this one included
+    """
+
+    __slots__ = ("turn", "time", "night", "turns_until_night", "nights_remaining")
+
     def __init__(self, turn):
-        self.turn = turn
+        self.turn: int = turn
+        self.time: int = TIME_OF_DAY[turn]
+        self.night: bool = IS_NIGHT[turn]
+        self.turns_until_night: int = TURNS_UNTIL_NIGHT[turn]
+        self.nights_remaining: int = NIGHTS_REMAINING[turn]
 
     def get_day_number(self):
-        return self.turn // TIME.CYCLE_DURATION
+        return DAY_NUMBER[self.turn]
 
     def get_time(self):
-        return self.turn % TIME.CYCLE_DURATION
+        return self.time
 
     def is_morning(self):
-        return self.get_time() < TIME.MORNING_END
+        return IS_MORNING[self.turn]
 
     def is_midday(self):
-        return TIME.MORNING_END < self.get_time() < TIME.MIDDAY_END
+        return IS_MIDDAY[self.turn]
 
     def is_afternoon(self):
-        return TIME.MIDDAY_END < self.get_time() < TIME.AFTERNOON_END
+        return IS_AFTERNOON[self.turn]
 
     def is_night(self):
-        return TIME.AFTERNOON_END < self.get_time() < TIME.NIGHT_END
\ No newline at end of file
+        return self.night
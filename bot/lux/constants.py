@@ -26,6 +26,14 @@ class Constants:
         URANIUM = "uranium"
         COAL = "coal"
 
+    class RESOURCE_CODES:
+        NONE = 0
+        WOOD = 1
+        COAL = 2
+        URANIUM = 3
+        TYPES = [None, "wood", "coal", "uranium"]
+        BY_TYPE = {"wood": WOOD, "coal": COAL, "uranium": URANIUM}
+
     class TIME:
         NIGHT_END = 40
         AFTERNOON_END = 30
@@ -0,0 +1,138 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .constants import Constants
+
+DIRECTIONS = Constants.DIRECTIONS
+
+UNREACHABLE = np.iinfo(np.int32).max
+FIELD_DIRECTIONS = [DIRECTIONS.NORTH, DIRECTIONS.EAST, DIRECTIONS.SOUTH, DIRECTIONS.WEST, DIRECTIONS.CENTER]
+NO_DIRECTION = -1
+
+
+class DistanceField:
+    """
+    Walking distance from every cell to the nearest source cell, computed once with a multi-source BFS that never
+    enters obstacle cells or leaves the board
+
+    The BFS runs on the board as one Python int of width * height bits, bit y * width + x for cell [y, x], so growing
+    the frontier by a step is a few shifts and masks of that int whatever the board size. Every step's frontier is
+    kept and they are unpacked into distances together at the end
+
+    Given labels, an array of one int per source cell such as GameMap.city_index, every cell also gets the label of
+    the source its directions lead to. Each cell points at the cell of its first step and the pointers are followed by
+    doubling, so the whole board is labelled in a few array lookups per doubling of the longest distance
+
+    ...
+
+    Attributes
+    ----------
+    distances : np.ndarray
+        steps from each cell [y, x] to its nearest source, UNREACHABLE where no source can be reached
+    directions : np.ndarray
+        index into FIELD_DIRECTIONS of the first step towards the nearest source, NO_DIRECTION where unreachable.
+        Directions are preferred in the order north, east, south, west like Position.direction_to
+    labels : Optional[np.ndarray]
+        label of the source the directions of each cell [y, x] lead to, -1 where unreachable. None unless labels were
+        given
+    """
+
+    _masks: Dict[Tuple[int, int], Tuple[int, int, int]] = {}
+
+    def __init__(self, sources: np.ndarray, obstacles: np.ndarray, labels: Optional[np.ndarray] = None) -> None:
+        height, width = sources.shape
+        board, not_east_edge, not_west_edge = self.__get_masks(width, height)
+        passable = _to_bits(~obstacles)
+        frontier = _to_bits(sources) & passable
+        visited = frontier
+        steps = [frontier]
+        while frontier:
+            grown = (frontier >> width) | ((frontier << width) & board) | ((frontier >> 1) & not_east_edge) | \
+                    ((frontier << 1) & not_west_edge)
+            frontier = grown & passable & ~visited
+            if frontier:
+                visited |= frontier
+                steps.append(frontier)
+        self.distances: np.ndarray = self.__generate_distances(steps, width, height)
+        self.directions: np.ndarray = self.__generate_directions()
+        self.labels: Optional[np.ndarray] = None if labels is None else self.__generate_labels(labels)
+
+    def distance_at(self, pos) -> Optional[int]:
+        """
+        Returns the number of steps from pos to the nearest source, or None if there is none within reach
+        """
+        distance = int(self.distances[pos.y, pos.x])
+        return None if distance == UNREACHABLE else distance
+
+    def label_at(self, pos) -> Optional[int]:
+        """
+        Returns the label of the source the directions from pos lead to, or None if there is none within reach
+        """
+        label = int(self.labels[pos.y, pos.x])
+        return None if label == -1 else label
+
+    def direction_at(self, pos) -> Optional[DIRECTIONS]:
+        """
+        Returns the direction of the first step from pos towards the nearest source, CENTER when standing on one, or
+        None if there is none within reach
+        """
+        direction = self.directions[pos.y, pos.x]
+        return None if direction == NO_DIRECTION else FIELD_DIRECTIONS[direction]
+
+    @classmethod
+    def __get_masks(cls, width, height) -> Tuple[int, int, int]:
+        """
+        the bits of the whole board, of every column but the east one and of every column but the west one
+        """
+        masks = cls._masks.get((width, height))
+        if masks is None:
+            columns = np.arange(width * height) % width
+            masks = cls._masks[(width, height)] = ((1 << (width * height)) - 1, _to_bits(columns != width - 1),
+                                                   _to_bits(columns != 0))
+        return masks
+
+    @staticmethod
+    def __generate_distances(steps, width, height) -> np.ndarray:
+        size = (width * height + 7) // 8
+        packed = np.frombuffer(b"".join(step.to_bytes(size, "little") for step in steps), dtype=np.uint8)
+        reached = np.unpackbits(packed.reshape(len(steps), size), axis=1, count=width * height, bitorder="little")
+        distances = reached.argmax(axis=0).astype(np.int32)
+        distances[~reached.any(axis=0)] = UNREACHABLE
+        return distances.reshape(height, width)
+
+    def __generate_directions(self) -> np.ndarray:
+        distances = self.distances
+        directions = np.full(distances.shape, NO_DIRECTION, dtype=np.int8)
+        directions[distances == 0] = FIELD_DIRECTIONS.index(DIRECTIONS.CENTER)
+        step_from = np.where(distances == UNREACHABLE, UNREACHABLE, distances - 1)
+        neighbours = {direction: np.full(distances.shape, UNREACHABLE, dtype=np.int32) for direction in
+                      FIELD_DIRECTIONS[:4]}
+        neighbours[DIRECTIONS.NORTH][1:, :] = distances[:-1, :]
+        neighbours[DIRECTIONS.SOUTH][:-1, :] = distances[1:, :]
+        neighbours[DIRECTIONS.WEST][:, 1:] = distances[:, :-1]
+        neighbours[DIRECTIONS.EAST][:, :-1] = distances[:, 1:]
+        for index, direction in enumerate(FIELD_DIRECTIONS[:4]):
+            undecided = (directions == NO_DIRECTION) & (distances != UNREACHABLE)
+            directions[undecided & (neighbours[direction] == step_from)] = index
+        return directions
+
+    def __generate_labels(self, labels) -> np.ndarray:
+        height, width = self.distances.shape
+        cells = np.arange(width * height)
+        # the cell of the first step, by index into FIELD_DIRECTIONS; sources and unreachable cells point at themselves
+        steps = np.array([-width, 1, width, -1, 0, 0])
+        pointers = cells + steps[self.directions.ravel()]
+        longest = int(self.distances[self.distances != UNREACHABLE].max(initial=0))
+        while longest > 0:
+            pointers = pointers[pointers]
+            longest >>= 1
+        reached = (self.distances != UNREACHABLE).ravel()
+        return np.where(reached, labels.ravel()[pointers], -1).reshape(height, width)
+
+
+def _to_bits(mask: np.ndarray) -> int:
+    """
+    the cells of a boolean mask as the bits of an int, bit y * width + x for cell [y, x]
+    """
+    return int.from_bytes(np.packbits(mask, axis=None, bitorder="little").tobytes(), "little")
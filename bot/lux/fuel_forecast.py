@@ -0,0 +1,82 @@
+from typing import Dict, List
+
+import numpy as np
+
+from .tables import CITY_BACKUP_TURNS, MAX_DAYS, NIGHT_TURNS, NIGHTS_REMAINING
+
+NIGHT_TURN_ARRAY = np.array(NIGHT_TURNS)
+
+
+class FuelForecast:
+    """
+    Projects the fuel of all the player's cities over the nights left in the game, as arrays with one row per city in
+    the order of player.cities. A city burns its light upkeep on every night turn, so with fuel f and upkeep u it
+    lasts f // u night turns and falls on the next one. The fuel the player's units carry counts as an expected
+    delivery to the city the map's city distance field leads them to, when that city is within max_distance steps.
+    The field labels every cell with its city, so all the deliveries are read off it in one array lookup
+
+    The expansion budget of a city is the fuel it has, deliveries included, beyond NUMBER_OF_NIGHTS_BACKUP nights of
+    upkeep, or beyond the nights left in the game when there are fewer. A city can expand while its budget is positive
+
+    ...
+
+    Attributes
+    ----------
+    turn : int
+        the turn the forecast was made on
+    city_ids : List[str]
+        the city of every row
+    fuel, upkeep, deliveries : np.ndarray
+        fuel, light upkeep per night turn and fuel expected from the units of every city
+    survives_until : np.ndarray
+        the turn every city falls on, MAX_DAYS for the ones that last the game
+    expansion_budget : np.ndarray
+        fuel every city can spare on top of the nights it must last, zero when it has none
+    """
+
+    def __init__(self, player, game_map, turn) -> None:
+        self.turn: int = turn
+        self.city_ids: List[str] = list(player.cities)
+        self.__rows: Dict[str, int] = {cityid: row for row, cityid in enumerate(self.city_ids)}
+        cities = player.cities.values()
+        self.fuel: np.ndarray = np.fromiter((city.fuel for city in cities), dtype=np.float64, count=len(cities))
+        self.upkeep: np.ndarray = np.fromiter((city.light_upkeep for city in cities), dtype=np.float64,
+                                              count=len(cities))
+        self.deliveries: np.ndarray = self.__expected_deliveries(player, game_map)
+        nights_left = NIGHTS_REMAINING[turn]
+        total = self.fuel + self.deliveries
+        affordable = (total // np.maximum(self.upkeep, 1)).astype(np.int64)
+        first_night = len(NIGHT_TURNS) - nights_left
+        falls_on = NIGHT_TURN_ARRAY[np.minimum(first_night + affordable, len(NIGHT_TURNS) - 1)]
+        self.survives_until: np.ndarray = np.where(affordable >= nights_left, MAX_DAYS, falls_on)
+        self.expansion_budget: np.ndarray = np.maximum(total - self.upkeep * min(CITY_BACKUP_TURNS, nights_left), 0)
+
+    # ----------------------------------- Public functions ------------------------------------- #
+
+    def get_survival_turn(self, cityid) -> int:
+        return int(self.survives_until[self.__rows[cityid]])
+
+    def get_expansion_budget(self, cityid) -> float:
+        return float(self.expansion_budget[self.__rows[cityid]])
+
+    def can_expand(self, cityid) -> bool:
+        return self.expansion_budget[self.__rows[cityid]] > 0
+
+    def any_can_expand(self) -> bool:
+        return bool((self.expansion_budget > 0).any())
+
+    # ---------------------------------- Private functions ------------------------------------- #
+
+    def __expected_deliveries(self, player, game_map) -> np.ndarray:
+        units = player.units
+        xs = np.fromiter((unit.pos.x for unit in units), dtype=np.int64, count=len(units))
+        ys = np.fromiter((unit.pos.y for unit in units), dtype=np.int64, count=len(units))
+        fuel = np.fromiter((unit.get_fuel() for unit in units), dtype=np.float64, count=len(units))
+        city_field = game_map.get_city_distance_field()
+        delivering = (fuel > 0) & (city_field.distances[ys, xs] <= game_map.tables.max_distance)
+        # city_index of the map to row of the forecast
+        rows = np.full(len(game_map.city_ids), -1, dtype=np.int64)
+        for index, cityid in enumerate(game_map.city_ids):
+            rows[index] = self.__rows.get(cityid, -1)
+        return np.bincount(rows[city_field.labels[ys[delivering], xs[delivering]]], weights=fuel[delivering],
+                           minlength=len(self.city_ids))
@@ -1,38 +1,140 @@
-from typing import List, Optional, Set, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
 
 from .cell import Cell
+from .citytile import CityTile
 from .position import Position
+from .spatial_index import SpatialIndex
 from .constants import Constants
+from .distance_field import DistanceField
+from .resource_partition import ResourcePartition
+from .resource_projection import ResourceProjection
+from .tables import MAX_DAYS, UNIT_COOLDOWN, BoardTables
 
-MAX_DISTANCES = Constants.GAME_PARAMETERS.MAX_DISTANCES
+RESOURCE_CODES = Constants.RESOURCE_CODES
+WORKER_COOLDOWN = UNIT_COOLDOWN[Constants.UNIT_TYPES.WORKER]
+RESOURCE_CANDIDATES = 4  # nearest cells of each partition checked against the projection
 
 
 class GameMap:
+    """
+    The board, stored as a structure of arrays indexed [y, x]
+
+    ...
+
+    Attributes
+    ----------
+    resource_type : np.ndarray
+        resource code of each cell (see Constants.RESOURCE_CODES)
+    resource_amount : np.ndarray
+        amount of resource left on each cell
+    road : np.ndarray
+        road level of each cell
+    city_owner : np.ndarray
+        team owning the city tile on each cell, -1 where there is none
+    city_index : np.ndarray
+        index into city_ids of the city owning each cell, -1 where there is none
+    city_cooldown : np.ndarray
+        cooldown of the city tile on each cell
+    map : List[List[Optional[Cell]]]
+        Cell views, created on first access
+    tables : BoardTables
+        lookup tables of the board size, shared by every map of that size
+    """
+
     # ----------------------------------- Public functions ------------------------------------- #
 
     def __init__(self, width, height):
+        Position.intern_board(width, height)
         self.resource_cells: List[Cell] = []
         self.opponent_city_tiles: Set[Tuple[int, int]] = set()
         self.player_city_tiles: Set[Tuple[int, int]] = set()
         self.future_no_go_tiles: Set[Tuple[int, int]] = set()
+        self.resource_partitions: Dict[int, ResourcePartition] = {}
+        self.player_city_index: SpatialIndex = SpatialIndex(width, height)
+        self.distance_fields: Dict[Tuple, DistanceField] = {}
+        self.lasting_distance_fields: Dict[Tuple, DistanceField] = {}
+        self.resource_projection: Optional[ResourceProjection] = None
         self.height: int = height
         self.width: int = width
-        self.map: List[List[Cell]] = [None] * height
-        for y in range(0, self.height):
-            self.map[y] = [None] * width
-            for x in range(0, self.width):
-                self.map[y][x] = Cell(x, y)
+        self.tables: BoardTables = BoardTables.for_size(width, height)
+        self.resource_type: np.ndarray = np.zeros((height, width), dtype=np.int8)
+        self.resource_amount: np.ndarray = np.zeros((height, width), dtype=np.int32)
+        self.road: np.ndarray = np.zeros((height, width), dtype=np.float64)
+        self.city_owner: np.ndarray = np.full((height, width), -1, dtype=np.int8)
+        self.city_index: np.ndarray = np.full((height, width), -1, dtype=np.int32)
+        self.city_cooldown: np.ndarray = np.zeros((height, width), dtype=np.float64)
+        self.city_ids: List[str] = []
+        self.__citytiles: Dict[Tuple[int, int], CityTile] = {}
+        self.__build_citytiles: Optional[Callable[[], None]] = None
+        self.map: List[List[Optional[Cell]]] = [[None] * width for _ in range(height)]
+        self.__city_id_lookup: Dict[str, int] = {}
+        self.__player_team: int = 0
+
+    @property
+    def citytiles(self) -> Dict[Tuple[int, int], CityTile]:
+        """
+        the CityTile on every city tile cell by (x, y), made on first access when Game built the map lazily
+        """
+        if self.__build_citytiles is not None:
+            build, self.__build_citytiles = self.__build_citytiles, None
+            build()
+        return self.__citytiles
+
+    @citytiles.setter
+    def citytiles(self, citytiles: Dict[Tuple[int, int], CityTile]) -> None:
+        self.__citytiles = citytiles
+        self.__build_citytiles = None
 
     def get_cell_by_pos(self, pos) -> Cell:
-        return self.map[pos.y][pos.x]
+        return self.get_cell(pos.x, pos.y)
 
     def get_cell(self, x, y) -> Cell:
-        return self.map[y][x]
+        row = self.map[y]
+        cell = row[x]
+        if cell is None:
+            cell = row[x] = Cell(self, x % self.width, y % self.height)
+        return cell
+
+    def get_resource_mask(self) -> np.ndarray:
+        return (self.resource_type != RESOURCE_CODES.NONE) & (self.resource_amount > 0)
+
+    def get_city_tile_mask(self, team) -> np.ndarray:
+        return self.city_owner == team
 
     def calculate_metrics(self, system) -> None:
+        """
+        Derives the turn's metrics from the arrays. The city tile sets and the player's city tile index only change
+        with the city tiles, so they are kept in system.memory and rebuilt only on turns whose ChangeSet added or
+        removed a city tile. So are the city and safe distance fields, and the safe one is also dropped on turns a
+        resource cell ran out
+        """
         self.resource_cells = self.__generate_resource_cells()
-        self.player_city_tiles = self.__generate_tile_set(system.player)
-        self.opponent_city_tiles = self.__generate_tile_set(system.opponent)
+        changes = system.game.changes
+        city_tiles = system.memory.get("city_tiles")
+        if city_tiles is None or changes.full or changes.citytiles_added or changes.citytiles_removed:
+            player_city_tiles = self.__generate_tile_set(system.player)
+            city_tiles = system.memory["city_tiles"] = (player_city_tiles, self.__generate_tile_set(system.opponent),
+                                                        self.__generate_city_tile_index(player_city_tiles))
+        self.player_city_tiles, self.opponent_city_tiles, self.player_city_index = city_tiles
+        lasting = system.memory.get("distance_fields")
+        if lasting is None or changes.full or changes.citytiles_added or changes.citytiles_removed:
+            lasting = system.memory["distance_fields"] = {}
+        elif any(self.resource_type[y, x] == RESOURCE_CODES.NONE for x, y in changes.resources):
+            lasting.pop(("safe",), None)
+        self.lasting_distance_fields = lasting
+        self.resource_partitions = self.__generate_resource_partitions()
+        self.__player_team = system.player.team
+
+    def reset_turn(self) -> None:
+        """
+        forgets what only held for the last turn: the tiles its moves claimed, its distance fields and its resource
+        projection
+        """
+        self.future_no_go_tiles = set()
+        self.distance_fields = {}
+        self.resource_projection = None
 
     def get_resource_cells(self) -> List[Cell]:
         return self.resource_cells
@@ -59,25 +161,98 @@ class GameMap:
     def is_collision_tile(self, pos) -> bool:
         return ((pos.x, pos.y) in self.opponent_city_tiles) or ((pos.x, pos.y) in self.future_no_go_tiles)
 
+    def get_researched_resource_partitions(self, player) -> List[ResourcePartition]:
+        partitions = [self.resource_partitions[RESOURCE_CODES.WOOD]]
+        if player.researched_coal():
+            partitions.append(self.resource_partitions[RESOURCE_CODES.COAL])
+        if player.researched_uranium():
+            partitions.append(self.resource_partitions[RESOURCE_CODES.URANIUM])
+        return partitions
+
     def get_closest_resource_position(self, pos, system) -> Position:
-        researched_resource_cells = self.resource_cells.copy()
-        if not system.player.researched_uranium():
-            researched_resource_cells = [a for a in researched_resource_cells if
-                                         a.resource.type != Constants.RESOURCE_TYPES.URANIUM]
-        if not system.player.researched_coal():
-            researched_resource_cells = [a for a in researched_resource_cells if
-                                         a.resource.type != Constants.RESOURCE_TYPES.COAL]
-        return pos.get_closest_from_list([a.pos for a in researched_resource_cells if system.player])
+        """
+        The closest researched resource cell that a worker walking there from pos, around opponent city tiles, would
+        still find resource on, going by the resource projection, or the closest one when none of the nearest few would
+        """
+        partitions = self.get_researched_resource_partitions(system.player)
+        candidates = sorted((a for partition in partitions
+                             for a in partition.index.k_nearest(pos, RESOURCE_CANDIDATES)),
+                            key=lambda a: (a.distance_to(pos), a.y, a.x))
+        if not candidates:
+            return None
+        projection = self.get_resource_projection(system)
+        for candidate in candidates:
+            # the walk is never shorter than the Manhattan distance, so only the cells that would last that long and
+            # still run out at some point need the walking distance
+            if not projection.lasts(candidate, candidate.distance_to(pos) * WORKER_COOLDOWN):
+                continue
+            if projection.lasts(candidate, MAX_DAYS):
+                return candidate
+            distance = self.get_distance_field_to(pos).distance_at(candidate)
+            if distance is not None and projection.lasts(candidate, distance * WORKER_COOLDOWN):
+                return candidate
+        return candidates[0]
+
+    def get_resource_projection(self, system) -> ResourceProjection:
+        """
+        How the resources will run out with the workers of both players where they are, made once per turn
+        """
+        if self.resource_projection is None:
+            self.resource_projection = ResourceProjection(self, [system.player, system.opponent], system.step)
+        return self.resource_projection
 
     def get_closest_city_tile(self, pos, system) -> Position:
-        return pos.get_closest_from_list(self.get_player_city_positions())
+        return self.player_city_index.nearest(pos)
 
     def get_closest_safe_tile(self, pos) -> Position:
-        safe_tiles = [a.pos for a in self.resource_cells] + self.get_player_city_positions()
-        return pos.get_closest_from_list(safe_tiles)
+        closest_resource = self.__get_closest_in_partitions(pos, self.resource_partitions.values())
+        closest_city_tile = self.player_city_index.nearest(pos)
+        return pos.get_closest_from_list([a for a in (closest_resource, closest_city_tile) if a is not None])
+
+    def get_distance_to_safe_tile(self, pos) -> Optional[int]:
+        return self.get_safe_distance_field().distance_at(pos)
+
+    def get_resource_distance_field(self, system) -> DistanceField:
+        """
+        Distances to the closest resource the player has researched, walking around opponent city tiles. Cells the
+        resource projection expects to run out before the player's closest worker could walk there are left out,
+        unless that leaves out all of them
+        """
+        partitions = self.get_researched_resource_partitions(system.player)
+        return self.__get_distance_field(("resource",) + tuple(partition.type for partition in partitions),
+                                         lambda: self.__generate_lasting_resource_mask(partitions, system))
+
+    def get_worker_distance_field(self, system) -> DistanceField:
+        """
+        Distances to the closest worker of the player, walking around opponent city tiles
+        """
+        return self.__get_distance_field(("worker",), lambda: self.__generate_worker_mask(system.player))
+
+    def get_distance_field_to(self, pos) -> DistanceField:
+        """
+        Distances to pos, walking around opponent city tiles
+        """
+        def generate_sources():
+            sources = np.zeros((self.height, self.width), dtype=bool)
+            sources[pos.y, pos.x] = True
+            return sources
+
+        return self.__get_distance_field(("to", pos.x, pos.y), generate_sources)
 
-    def get_distance_to_safe_tile(self, pos) -> int:
-        return pos.distance_to(self.get_closest_safe_tile(pos))
+    def get_city_distance_field(self) -> DistanceField:
+        """
+        Distances to the closest player city tile, walking around opponent city tiles. Its labels are the city_index
+        of the tile the directions lead to
+        """
+        return self.__get_distance_field(("city",), lambda: self.get_city_tile_mask(self.__player_team),
+                                         self.lasting_distance_fields, self.city_index)
+
+    def get_safe_distance_field(self) -> DistanceField:
+        """
+        Distances to the closest safe tile (any resource or player city tile), walking around opponent city tiles
+        """
+        return self.__get_distance_field(("safe",), lambda: self.get_resource_mask() |
+                                         self.get_city_tile_mask(self.__player_team), self.lasting_distance_fields)
 
     def get_optimal_build_position(self, pos, closest_function, system) -> Optional[Position]:
         closest = closest_function(pos, system)
@@ -94,32 +269,74 @@ class GameMap:
         return self.get_optimal_build_position(pos, self.get_closest_resource_position, system)
 
     def is_free(self, pos) -> bool:
-        cell = self.get_cell_by_pos(pos)
-        return cell.resource is None and cell.citytile is None
+        return self.resource_type[pos.y, pos.x] == RESOURCE_CODES.NONE and self.city_owner[pos.y, pos.x] == -1
 
     def filter_position_list(self, positions, filter_function) -> List[Position]:
         return [a for a in positions if filter_function(a)]
 
     def city_is_too_far(self, city_pos, unit_pos):
-        return city_pos.distance_to(unit_pos) > MAX_DISTANCES[self.height]
+        return city_pos.distance_to(unit_pos) > self.tables.max_distance
 
     # ---------------------------------- Private functions ------------------------------------- #
 
     def __generate_tile_set(self, player) -> Set[Tuple[int, int]]:
-        tile_set = set()
-        for city in player.cities.values():
-            for city_tile in city.citytiles:
-                tile_set.add((city_tile.pos.x, city_tile.pos.y))
-        return tile_set
-
-    def __generate_resource_cells(self):
-        resource_tiles = []
-        for y in range(self.height):
-            for x in range(self.width):
-                cell = self.get_cell(x, y)
-                if cell.has_resource():
-                    resource_tiles.append(cell)
-        return resource_tiles
+        ys, xs = np.nonzero(self.get_city_tile_mask(player.team))
+        return set(zip(xs.tolist(), ys.tolist()))
+
+    def __generate_resource_cells(self) -> List[Cell]:
+        ys, xs = np.nonzero(self.get_resource_mask())
+        return [self.get_cell(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+
+    def __generate_resource_partitions(self) -> Dict[int, ResourcePartition]:
+        resource_mask = self.get_resource_mask()
+        return {code: ResourcePartition(self, RESOURCE_CODES.TYPES[code], resource_mask & (self.resource_type == code))
+                for code in (RESOURCE_CODES.WOOD, RESOURCE_CODES.COAL, RESOURCE_CODES.URANIUM)}
+
+    def __generate_worker_mask(self, player) -> np.ndarray:
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        for unit in player.units:
+            if unit.is_worker():
+                mask[unit.pos.y, unit.pos.x] = True
+        return mask
+
+    def __generate_lasting_resource_mask(self, partitions, system) -> np.ndarray:
+        resources = np.logical_or.reduce([partition.mask for partition in partitions])
+        arrival = self.get_worker_distance_field(system).distances.astype(np.int64) * WORKER_COOLDOWN
+        lasting = resources & (self.get_resource_projection(system).depleted_in > arrival)
+        return lasting if lasting.any() else resources
+
+    @staticmethod
+    def __get_closest_in_partitions(pos, partitions) -> Optional[Position]:
+        closest = [a for a in (partition.index.nearest(pos) for partition in partitions) if a is not None]
+        if not closest:
+            return None
+        return min(closest, key=lambda a: (a.distance_to(pos), a.y, a.x))
+
+    def __generate_city_tile_index(self, tile_set) -> SpatialIndex:
+        index = SpatialIndex(self.width, self.height)
+        for x, y in sorted(tile_set, key=lambda a: (a[1], a[0])):
+            index.add(self.citytiles[(x, y)].pos)
+        return index
+
+    def __get_distance_field(self, key, generate_sources, fields=None, labels=None) -> DistanceField:
+        """
+        the field of key in fields, the fields of this turn unless given, made from generate_sources() and labels if
+        missing
+        """
+        if fields is None:
+            fields = self.distance_fields
+        distance_field = fields.get(key)
+        if distance_field is None:
+            obstacles = (self.city_owner != -1) & (self.city_owner != self.__player_team)
+            distance_field = fields[key] = DistanceField(generate_sources(), obstacles, labels)
+        return distance_field
+
+    def __get_city_index(self, cityid) -> int:
+        index = self.__city_id_lookup.get(cityid)
+        if index is None:
+            index = self.__city_id_lookup[cityid] = len(self.city_ids)
+            self.city_ids.append(cityid)
+        return index
 
     # --------------------------------------- Do not use --------------------------------------- #
 
@@ -127,5 +344,60 @@ class GameMap:
         """
         do not use this function, this is for internal tracking of state
         """
-        cell = self.get_cell(x, y)
-        cell.resource = Cell.Resource(r_type, amount)
+        self.resource_type[y, x] = RESOURCE_CODES.BY_TYPE.get(r_type, RESOURCE_CODES.NONE)
+        self.resource_amount[y, x] = amount
+
+    def _setRoad(self, x, y, road):
+        """
+        do not use this function, this is for internal tracking of state
+        """
+        self.road[y, x] = road
+
+    def _setCityTile(self, citytile):
+        """
+        do not use this function, this is for internal tracking of state
+        """
+        x, y = citytile.pos.x, citytile.pos.y
+        self.city_owner[y, x] = citytile.team
+        self.city_index[y, x] = self.__get_city_index(citytile.cityid)
+        self.city_cooldown[y, x] = citytile.cooldown
+        self.citytiles[(x, y)] = citytile
+
+    def _setCityTiles(self, citytiles, xs, ys, teams, cityids, cooldowns):
+        """
+        do not use this function, this is for internal tracking of state. Bulk version of _setCityTile taking the
+        tiles' coordinates, teams, city ids and cooldowns as parallel arrays
+        """
+        self._setCityTileArrays(xs, ys, teams, cityids, cooldowns)
+        self._addCityTiles(citytiles, xs, ys)
+
+    def _setCityTileArrays(self, xs, ys, teams, cityids, cooldowns):
+        """
+        do not use this function, this is for internal tracking of state. Fills the city tile arrays only, leaving the
+        CityTile objects to _addCityTiles or _setCityTileBuilder
+        """
+        self.city_owner[ys, xs] = teams
+        self.city_index[ys, xs] = [self.__get_city_index(cityid) for cityid in cityids]
+        self.city_cooldown[ys, xs] = cooldowns
+
+    def _addCityTiles(self, citytiles, xs, ys):
+        """
+        do not use this function, this is for internal tracking of state
+        """
+        self.__citytiles.update(zip(zip(xs.tolist(), ys.tolist()), citytiles))
+
+    def _setCityTileBuilder(self, build):
+        """
+        do not use this function, this is for internal tracking of state. build() is called the first time citytiles
+        is read and must add the CityTile objects through _addCityTiles
+        """
+        self.__build_citytiles = build
+
+    def _removeCityTile(self, x, y):
+        """
+        do not use this function, this is for internal tracking of state
+        """
+        self.city_owner[y, x] = -1
+        self.city_index[y, x] = -1
+        self.city_cooldown[y, x] = 0
+        self.citytiles.pop((x, y), None)
@@ -0,0 +1,63 @@
+from typing import Set, Tuple
+
+
+class ChangeSet:
+    """
+    What changed in the game state during the last Game._update
+
+    ...
+
+    Attributes
+    ----------
+    full : bool
+        the whole state was rebuilt, so every cache should be considered stale
+    resources : Set[Tuple[int, int]]
+        cells whose resource type or amount changed, including depleted ones
+    roads : Set[Tuple[int, int]]
+        cells whose road level changed
+    citytiles_added : Set[Tuple[int, int]]
+        cells that gained a city tile
+    citytiles_removed : Set[Tuple[int, int]]
+        cells that lost a city tile
+    units_added : Set[str]
+        ids of units that appeared this turn
+    units_removed : Set[str]
+        ids of units that disappeared this turn
+    units_moved : Set[str]
+        ids of units that are on a different cell than last turn
+    cities_added : Set[str]
+        ids of cities that were founded this turn
+    cities_removed : Set[str]
+        ids of cities that disappeared this turn
+    """
+
+    def __init__(self, full: bool = False) -> None:
+        self.full: bool = full
+        self.resources: Set[Tuple[int, int]] = set()
+        self.roads: Set[Tuple[int, int]] = set()
+        self.citytiles_added: Set[Tuple[int, int]] = set()
+        self.citytiles_removed: Set[Tuple[int, int]] = set()
+        self.units_added: Set[str] = set()
+        self.units_removed: Set[str] = set()
+        self.units_moved: Set[str] = set()
+        self.cities_added: Set[str] = set()
+        self.cities_removed: Set[str] = set()
+
+    def get_changed_cells(self) -> Set[Tuple[int, int]]:
+        """
+        Returns every cell whose resource, road or city tile changed
+        """
+        return self.resources | self.roads | self.citytiles_added | self.citytiles_removed
+
+    def touches(self, x, y) -> bool:
+        """
+        Whether or not the cell at (x, y) changed. Always true after a full rebuild
+        """
+        cell = (x, y)
+        return self.full or cell in self.resources or cell in self.roads or cell in self.citytiles_added or \
+            cell in self.citytiles_removed
+
+    def is_empty(self) -> bool:
+        return not (self.full or self.resources or self.roads or self.citytiles_added or self.citytiles_removed or
+                    self.units_added or self.units_removed or self.units_moved or self.cities_added or
+                    self.cities_removed)
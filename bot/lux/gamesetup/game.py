@@ -1,13 +1,29 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
 from ..city import City
-from ..constants import Constants
+from ..citytile import CityTile
 from ..game_map import GameMap
 from ..player import Player
 from ..unit import Unit
-
-INPUT_CONSTANTS = Constants.INPUT_CONSTANTS
+from .change_set import ChangeSet
+from .parser import ParsedUpdates, parse_updates
 
 
 class Game:
+    def __init__(self, incremental: bool = False):
+        """
+        incremental: keep the map and entity objects alive across turns and only apply what changed, recording it
+        in self.changes. Otherwise the world is rebuilt from scratch every turn, and only the map arrays are filled
+        right away: the Unit, City and CityTile objects of a player are built from the arrays the first time its units,
+        its cities or the map's citytiles are read. The typed arrays the last turn was built from are kept in
+        self.parsed
+        """
+        self.incremental: bool = incremental
+        self.changes: ChangeSet = ChangeSet(full=True)
+        self.parsed: ParsedUpdates = ParsedUpdates()
+
     def _initialize(self, messages):
         """
         initialize state
@@ -36,53 +52,155 @@ class Game:
         """
         update state
         """
-        self.map = GameMap(self.map_width, self.map_height)
+        self._update_parsed(parse_updates(messages))
+
+    def _update_parsed(self, parsed: ParsedUpdates):
+        """
+        update state from one turn of updates already converted to typed arrays, as built by parse_updates or by an
+        in-process simulator
+        """
         self.turn += 1
+        if self.incremental and self.turn > 0:
+            self._update_incrementally(parsed)
+        else:
+            self.map = GameMap(self.map_width, self.map_height)
+            self._reset_player_states()
+            self.changes = ChangeSet(full=True)
+            self._apply_updates_lazily(parsed)
+
+    def _update_incrementally(self, parsed: ParsedUpdates):
+        """
+        update state in place, reusing every Cell, Unit, City and CityTile that survived the turn
+        """
+        game_map = self.map
+        old_resource_type = game_map.resource_type.copy()
+        old_resource_amount = game_map.resource_amount.copy()
+        old_road = game_map.road.copy()
+        old_citytiles = game_map.citytiles
+        old_units = {unit.id: unit for player in self.players for unit in player.units}
+        old_cities = {cityid: city for player in self.players for cityid, city in player.cities.items()}
+
+        game_map.resource_type.fill(0)
+        game_map.resource_amount.fill(0)
+        game_map.road.fill(0)
+        game_map.city_owner.fill(-1)
+        game_map.city_index.fill(-1)
+        game_map.city_cooldown.fill(0)
+        game_map.citytiles = {}
         self._reset_player_states()
 
-        for update in messages:
-            if update == "D_DONE":
-                break
-            strs = update.split(" ")
-            input_identifier = strs[0]
-            if input_identifier == INPUT_CONSTANTS.RESEARCH_POINTS:
-                team = int(strs[1])
-                self.players[team].research_points = int(strs[2])
-            elif input_identifier == INPUT_CONSTANTS.RESOURCES:
-                r_type = strs[1]
-                x = int(strs[2])
-                y = int(strs[3])
-                amt = int(float(strs[4]))
-                self.map._setResource(r_type, x, y, amt)
-            elif input_identifier == INPUT_CONSTANTS.UNITS:
-                unittype = int(strs[1])
-                team = int(strs[2])
-                unitid = strs[3]
-                x = int(strs[4])
-                y = int(strs[5])
-                cooldown = float(strs[6])
-                wood = int(strs[7])
-                coal = int(strs[8])
-                uranium = int(strs[9])
-                self.players[team].units.append(Unit(team, unittype, unitid, x, y, cooldown, wood, coal, uranium))
-            elif input_identifier == INPUT_CONSTANTS.CITY:
-                team = int(strs[1])
-                cityid = strs[2]
-                fuel = float(strs[3])
-                lightupkeep = float(strs[4])
-                self.players[team].cities[cityid] = City(team, cityid, fuel, lightupkeep)
-            elif input_identifier == INPUT_CONSTANTS.CITY_TILES:
-                team = int(strs[1])
-                cityid = strs[2]
-                x = int(strs[3])
-                y = int(strs[4])
-                cooldown = float(strs[5])
-                city = self.players[team].cities[cityid]
+        changes = ChangeSet()
+        self._apply_updates(parsed, old_units, old_cities, old_citytiles, changes)
+
+        changes.resources = self.__changed_cells((game_map.resource_type != old_resource_type) |
+                                                 (game_map.resource_amount != old_resource_amount))
+        changes.roads = self.__changed_cells(game_map.road != old_road)
+        changes.citytiles_removed = {pos for pos in old_citytiles if pos not in game_map.citytiles}
+        changes.units_removed = old_units.keys() - {unit.id for player in self.players for unit in player.units}
+        changes.cities_removed = old_cities.keys() - {cityid for player in self.players for cityid in player.cities}
+        self.changes = changes
+
+    def _apply_updates(self, parsed: ParsedUpdates, old_units: Dict[str, Unit], old_cities: Dict[str, City],
+                       old_citytiles: Dict[Tuple[int, int], CityTile], changes: ChangeSet):
+        self.parsed = parsed
+        game_map = self.map
+
+        for team, research_points in enumerate(parsed.research_points.tolist()):
+            if research_points >= 0:
+                self.players[team].research_points = research_points
+
+        game_map.resource_type[parsed.resource_y, parsed.resource_x] = parsed.resource_type
+        game_map.resource_amount[parsed.resource_y, parsed.resource_x] = parsed.resource_amount
+        game_map.road[parsed.road_y, parsed.road_x] = parsed.road
+
+        for unittype, team, unitid, x, y, cooldown, wood, coal, uranium in zip(
+                parsed.unit_type.tolist(), parsed.unit_team.tolist(), parsed.unit_ids, parsed.unit_x.tolist(),
+                parsed.unit_y.tolist(), parsed.unit_cooldown.tolist(), parsed.unit_wood.tolist(),
+                parsed.unit_coal.tolist(), parsed.unit_uranium.tolist()):
+            unit = old_units.get(unitid)
+            if unit is None:
+                unit = Unit(team, unittype, unitid, x, y, cooldown, wood, coal, uranium)
+                changes.units_added.add(unitid)
+            elif unit._update(x, y, cooldown, wood, coal, uranium):
+                changes.units_moved.add(unitid)
+            self.players[team].units.append(unit)
+
+        for team, cityid, fuel, lightupkeep in zip(parsed.city_team.tolist(), parsed.city_ids,
+                                                   parsed.city_fuel.tolist(), parsed.city_light_upkeep.tolist()):
+            city = old_cities.get(cityid)
+            if city is None:
+                city = City(team, cityid, fuel, lightupkeep)
+                changes.cities_added.add(cityid)
+            else:
+                city._update(fuel, lightupkeep)
+            self.players[team].cities[cityid] = city
+
+        citytiles = []
+        for team, cityid, x, y, cooldown in zip(parsed.citytile_team.tolist(), parsed.citytile_city_ids,
+                                                parsed.citytile_x.tolist(), parsed.citytile_y.tolist(),
+                                                parsed.citytile_cooldown.tolist()):
+            city = self.players[team].cities[cityid]
+            citytile = old_citytiles.get((x, y))
+            if citytile is not None and citytile.team == team and citytile.cityid == cityid:
+                city._attach_city_tile(citytile, cooldown)
+            else:
                 citytile = city._add_city_tile(x, y, cooldown)
-                self.map.get_cell(x, y).citytile = citytile
-                self.players[team].city_tile_count += 1;
-            elif input_identifier == INPUT_CONSTANTS.ROADS:
-                x = int(strs[1])
-                y = int(strs[2])
-                road = float(strs[3])
-                self.map.get_cell(x, y).road = road
+                changes.citytiles_added.add((x, y))
+            citytiles.append(citytile)
+            self.players[team].city_tile_count += 1
+        game_map._setCityTiles(citytiles, parsed.citytile_x, parsed.citytile_y, parsed.citytile_team,
+                               parsed.citytile_city_ids, parsed.citytile_cooldown)
+
+    def _apply_updates_lazily(self, parsed: ParsedUpdates):
+        """
+        fills the map arrays from parsed and leaves the entity objects to builders, see __init__. Every entity is
+        reported as added, as the eager rebuild does
+        """
+        self.parsed = parsed
+        game_map = self.map
+        self.changes.units_added = set(parsed.unit_ids)
+        self.changes.cities_added = set(parsed.city_ids)
+        self.changes.citytiles_added = set(zip(parsed.citytile_x.tolist(), parsed.citytile_y.tolist()))
+        for team, research_points in enumerate(parsed.research_points.tolist()):
+            if research_points >= 0:
+                self.players[team].research_points = research_points
+        game_map.resource_type[parsed.resource_y, parsed.resource_x] = parsed.resource_type
+        game_map.resource_amount[parsed.resource_y, parsed.resource_x] = parsed.resource_amount
+        game_map.road[parsed.road_y, parsed.road_x] = parsed.road
+        game_map._setCityTileArrays(parsed.citytile_x, parsed.citytile_y, parsed.citytile_team,
+                                    parsed.citytile_city_ids, parsed.citytile_cooldown)
+        tile_counts = np.bincount(parsed.citytile_team, minlength=2).tolist()
+        for player in self.players:
+            player.city_tile_count = tile_counts[player.team]
+            player._set_builders(lambda team=player.team: self.__build_units(parsed, team),
+                                 lambda team=player.team: self.__build_cities(parsed, game_map, team))
+        game_map._setCityTileBuilder(lambda: [player.cities for player in self.players])
+
+    @staticmethod
+    def __build_units(parsed: ParsedUpdates, team: int) -> List[Unit]:
+        return [Unit(team, unittype, unitid, x, y, cooldown, wood, coal, uranium)
+                for unittype, unit_team, unitid, x, y, cooldown, wood, coal, uranium in zip(
+                    parsed.unit_type.tolist(), parsed.unit_team.tolist(), parsed.unit_ids, parsed.unit_x.tolist(),
+                    parsed.unit_y.tolist(), parsed.unit_cooldown.tolist(), parsed.unit_wood.tolist(),
+                    parsed.unit_coal.tolist(), parsed.unit_uranium.tolist()) if unit_team == team]
+
+    @staticmethod
+    def __build_cities(parsed: ParsedUpdates, game_map, team: int) -> Dict[str, City]:
+        """
+        the cities of team and their tiles, which are added to game_map.citytiles as well
+        """
+        cities = {cityid: City(team, cityid, fuel, lightupkeep) for city_team, cityid, fuel, lightupkeep in zip(
+            parsed.city_team.tolist(), parsed.city_ids, parsed.city_fuel.tolist(), parsed.city_light_upkeep.tolist())
+            if city_team == team}
+        mine = parsed.citytile_team == team
+        xs, ys = parsed.citytile_x[mine], parsed.citytile_y[mine]
+        citytiles = [cities[cityid]._add_city_tile(x, y, cooldown) for cityid, x, y, cooldown in zip(
+            [cityid for cityid, tile_team in zip(parsed.citytile_city_ids, parsed.citytile_team.tolist())
+             if tile_team == team], xs.tolist(), ys.tolist(), parsed.citytile_cooldown[mine].tolist())]
+        game_map._addCityTiles(citytiles, xs, ys)
+        return cities
+
+    @staticmethod
+    def __changed_cells(mask) -> set:
+        ys, xs = np.nonzero(mask)
+        return set(zip(xs.tolist(), ys.tolist()))
@@ -1,6 +1,84 @@
-import json
-from os import path
-dir_path = path.dirname(__file__)
-constants_path = path.abspath(path.join(dir_path, "game_constants.json"))
-with open(constants_path) as f:
-    GAME_CONSTANTS = json.load(f)
\ No newline at end of file
+"""
+The game parameters of game_constants.json, precompiled into a literal so that importing them parses no JSON and opens
+no file. After editing the JSON, regenerate this module from the bot directory with:
+python -m lux.gamesetup.game_constants
+"""
+GAME_CONSTANTS = {
+    "UNIT_TYPES": {
+        "WORKER": 0,
+        "CART": 1,
+    },
+    "RESOURCE_TYPES": {
+        "WOOD": "wood",
+        "COAL": "coal",
+        "URANIUM": "uranium",
+    },
+    "DIRECTIONS": {
+        "NORTH": "n",
+        "WEST": "w",
+        "EAST": "e",
+        "SOUTH": "s",
+        "CENTER": "c",
+    },
+    "PARAMETERS": {
+        "DAY_LENGTH": 30,
+        "NIGHT_LENGTH": 10,
+        "MAX_DAYS": 360,
+        "LIGHT_UPKEEP": {
+            "CITY": 23,
+            "WORKER": 4,
+            "CART": 10,
+        },
+        "WOOD_GROWTH_RATE": 1.025,
+        "MAX_WOOD_AMOUNT": 500,
+        "CITY_BUILD_COST": 100,
+        "CITY_ADJACENCY_BONUS": 5,
+        "RESOURCE_CAPACITY": {
+            "WORKER": 100,
+            "CART": 2000,
+        },
+        "WORKER_COLLECTION_RATE": {
+            "WOOD": 20,
+            "COAL": 5,
+            "URANIUM": 2,
+        },
+        "RESOURCE_TO_FUEL_RATE": {
+            "WOOD": 1,
+            "COAL": 10,
+            "URANIUM": 40,
+        },
+        "RESEARCH_REQUIREMENTS": {
+            "COAL": 50,
+            "URANIUM": 200,
+        },
+        "CITY_ACTION_COOLDOWN": 10,
+        "UNIT_ACTION_COOLDOWN": {
+            "CART": 3,
+            "WORKER": 2,
+        },
+        "MAX_ROAD": 6,
+        "MIN_ROAD": 0,
+        "CART_ROAD_DEVELOPMENT_RATE": 0.75,
+        "PILLAGE_RATE": 0.5,
+    },
+}
+
+if __name__ == "__main__":
+    import json
+    from os import path
+
+    def to_literal(value, indent=""):
+        if not isinstance(value, dict):
+            return json.dumps(value) if isinstance(value, str) else repr(value)
+        items = "".join(f"{indent}    {json.dumps(key)}: {to_literal(item, indent + '    ')},\n"
+                        for key, item in value.items())
+        return "{\n" + items + indent + "}"
+
+    dir_path = path.dirname(path.abspath(__file__))
+    with open(path.join(dir_path, "game_constants.json")) as constants_file:
+        constants = json.load(constants_file)
+    with open(__file__) as module_file:
+        header, _, generator = module_file.read().partition("GAME_CONSTANTS = ")
+        generator = generator[generator.index("\n\nif __name__"):]
+    with open(__file__, "w") as module_file:
+        module_file.write(header + "GAME_CONSTANTS = " + to_literal(constants) + generator)
@@ -0,0 +1,213 @@
+from typing import Callable, Dict, List, Set, Tuple
+
+import numpy as np
+
+from ..constants import Constants
+
+INPUT_CONSTANTS = Constants.INPUT_CONSTANTS
+RESOURCE_CODES = Constants.RESOURCE_CODES
+
+
+class ParsedUpdates:
+    """
+    One turn of update lines, grouped by record type and converted column by column into typed arrays
+
+    ...
+
+    Attributes
+    ----------
+    research_points : np.ndarray
+        research points of each team, -1 for a team without an "rp" line
+    resource_type, resource_x, resource_y, resource_amount : np.ndarray
+        one entry per "r" line, resource types as Constants.RESOURCE_CODES
+    unit_type, unit_team, unit_x, unit_y, unit_cooldown, unit_wood, unit_coal, unit_uranium : np.ndarray
+        one entry per "u" line
+    unit_ids : List[str]
+        unit ids in the same order as the unit arrays
+    city_team, city_fuel, city_light_upkeep : np.ndarray
+        one entry per "c" line
+    city_ids : List[str]
+        city ids in the same order as the city arrays
+    citytile_team, citytile_x, citytile_y, citytile_cooldown : np.ndarray
+        one entry per "ct" line
+    citytile_city_ids : List[str]
+        id of the city owning each city tile
+    road_x, road_y, road : np.ndarray
+        one entry per "ccd" line
+    """
+
+    def __init__(self) -> None:
+        self.research_points: np.ndarray = np.full(2, -1, dtype=np.int32)
+        self.resource_type: np.ndarray = np.zeros(0, dtype=np.int8)
+        self.resource_x: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.resource_y: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.resource_amount: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.unit_type: np.ndarray = np.zeros(0, dtype=np.int8)
+        self.unit_team: np.ndarray = np.zeros(0, dtype=np.int8)
+        self.unit_ids: List[str] = []
+        self.unit_x: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.unit_y: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.unit_cooldown: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.unit_wood: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.unit_coal: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.unit_uranium: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.city_team: np.ndarray = np.zeros(0, dtype=np.int8)
+        self.city_ids: List[str] = []
+        self.city_fuel: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.city_light_upkeep: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.citytile_team: np.ndarray = np.zeros(0, dtype=np.int8)
+        self.citytile_city_ids: List[str] = []
+        self.citytile_x: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.citytile_y: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.citytile_cooldown: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.road_x: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.road_y: np.ndarray = np.zeros(0, dtype=np.int32)
+        self.road: np.ndarray = np.zeros(0, dtype=np.float64)
+
+
+class UpdateStream:
+    """
+    Parses the update lines of one turn as they arrive, so that parsing overlaps with the engine writing them
+
+    Lines are grouped by record type as they are fed. The engine writes every record type in one run, so a group is
+    converted through its entry in RECORD_PARSERS as soon as a line of another type follows it. A type that shows up
+    again after that is converted once more, with all its lines, by finish()
+
+    ...
+
+    Attributes
+    ----------
+    parsed : ParsedUpdates
+        the arrays of the groups converted so far
+    done : bool
+        whether the D_DONE line ending the turn was fed
+    """
+
+    def __init__(self) -> None:
+        self.parsed: ParsedUpdates = ParsedUpdates()
+        self.done: bool = False
+        self.__groups: Dict[str, List[str]] = {identifier: [] for identifier in RECORD_PARSERS}
+        self.__pending: Set[str] = set()
+        self.__current: str = ""
+
+    def feed(self, updates: List[str]) -> int:
+        """
+        Groups updates up to D_DONE, converting the groups they leave behind. Returns how many lines were used,
+        D_DONE included. Lines of unknown record types are ignored
+        """
+        groups = self.__groups
+        current = self.__current
+        group = groups.get(current, [])
+        for used, update in enumerate(updates, 1):
+            identifier = update[:update.find(" ")]
+            if identifier != current:
+                self.__convert(current)
+                if update == INPUT_CONSTANTS.DONE:
+                    self.__current = ""
+                    self.done = True
+                    return used
+                current = identifier
+                group = groups.get(identifier)
+                if group is None:
+                    group = []
+                else:
+                    self.__pending.add(identifier)
+            group.append(update)
+        self.__current = current
+        return len(updates)
+
+    def finish(self) -> ParsedUpdates:
+        """
+        converts the groups not converted yet and returns the turn
+        """
+        for identifier in list(self.__pending):
+            self.__convert(identifier)
+        return self.parsed
+
+    def __convert(self, identifier) -> None:
+        if identifier in self.__pending:
+            self.__pending.discard(identifier)
+            RECORD_PARSERS[identifier](self.parsed, self.__groups[identifier])
+
+
+def parse_updates(messages: List[str]) -> ParsedUpdates:
+    """
+    Parses the update lines of one turn in one go, converting every record type in a single pass (see UpdateStream)
+    """
+    stream = UpdateStream()
+    stream.feed(messages)
+    return stream.finish()
+
+
+def _split_fields(lines: List[str], fields: int, text_columns: Tuple[int, ...] = ()) -> Tuple[np.ndarray,
+                                                                                         List[List[str]]]:
+    """
+    Splits every line of one record type at once. Returns the numeric fields as a (len(lines), n) float array, plus one
+    list of strings per text column. Columns are counted after the record identifier
+    """
+    width = fields + 1
+    tokens = " ".join(lines).split(" ")
+    texts = [tokens[column + 1::width] for column in text_columns]
+    for column in sorted(text_columns, reverse=True):
+        del tokens[column + 1::width]
+        width -= 1
+    del tokens[::width]
+    return np.array(list(map(float, tokens))).reshape(len(lines), width - 1), texts
+
+
+def _parse_research_points(parsed: ParsedUpdates, lines: List[str]) -> None:
+    numbers, _ = _split_fields(lines, 2)
+    parsed.research_points[numbers[:, 0].astype(np.intp)] = numbers[:, 1]
+
+
+def _parse_resources(parsed: ParsedUpdates, lines: List[str]) -> None:
+    numbers, (r_types,) = _split_fields(lines, 4, (0,))
+    parsed.resource_type = np.array([RESOURCE_CODES.BY_TYPE.get(r_type, RESOURCE_CODES.NONE) for r_type in r_types],
+                                    dtype=np.int8)
+    parsed.resource_x = numbers[:, 0].astype(np.int32)
+    parsed.resource_y = numbers[:, 1].astype(np.int32)
+    parsed.resource_amount = numbers[:, 2].astype(np.int32)
+
+
+def _parse_units(parsed: ParsedUpdates, lines: List[str]) -> None:
+    numbers, (parsed.unit_ids,) = _split_fields(lines, 9, (2,))
+    parsed.unit_type = numbers[:, 0].astype(np.int8)
+    parsed.unit_team = numbers[:, 1].astype(np.int8)
+    parsed.unit_x = numbers[:, 2].astype(np.int32)
+    parsed.unit_y = numbers[:, 3].astype(np.int32)
+    parsed.unit_cooldown = numbers[:, 4]
+    parsed.unit_wood = numbers[:, 5].astype(np.int32)
+    parsed.unit_coal = numbers[:, 6].astype(np.int32)
+    parsed.unit_uranium = numbers[:, 7].astype(np.int32)
+
+
+def _parse_cities(parsed: ParsedUpdates, lines: List[str]) -> None:
+    numbers, (parsed.city_ids,) = _split_fields(lines, 4, (1,))
+    parsed.city_team = numbers[:, 0].astype(np.int8)
+    parsed.city_fuel = numbers[:, 1]
+    parsed.city_light_upkeep = numbers[:, 2]
+
+
+def _parse_citytiles(parsed: ParsedUpdates, lines: List[str]) -> None:
+    numbers, (parsed.citytile_city_ids,) = _split_fields(lines, 5, (1,))
+    parsed.citytile_team = numbers[:, 0].astype(np.int8)
+    parsed.citytile_x = numbers[:, 1].astype(np.int32)
+    parsed.citytile_y = numbers[:, 2].astype(np.int32)
+    parsed.citytile_cooldown = numbers[:, 3]
+
+
+def _parse_roads(parsed: ParsedUpdates, lines: List[str]) -> None:
+    numbers, _ = _split_fields(lines, 3)
+    parsed.road_x = numbers[:, 0].astype(np.int32)
+    parsed.road_y = numbers[:, 1].astype(np.int32)
+    parsed.road = numbers[:, 2]
+
+
+RECORD_PARSERS: Dict[str, Callable[[ParsedUpdates, List[str]], None]] = {
+    INPUT_CONSTANTS.RESEARCH_POINTS: _parse_research_points,
+    INPUT_CONSTANTS.RESOURCES: _parse_resources,
+    INPUT_CONSTANTS.UNITS: _parse_units,
+    INPUT_CONSTANTS.CITY: _parse_cities,
+    INPUT_CONSTANTS.CITY_TILES: _parse_citytiles,
+    INPUT_CONSTANTS.ROADS: _parse_roads,
+}
@@ -0,0 +1,192 @@
+import math
+from typing import Dict, List, Set, Tuple
+
+from .constants import Constants
+from .position import Position
+from .reservation_table import FREE, OPPONENT, ReservationTable
+from .tables import UNIT_COOLDOWN
+
+DIRECTIONS = Constants.DIRECTIONS
+MOVE_DIRECTIONS = [DIRECTIONS.NORTH, DIRECTIONS.EAST, DIRECTIONS.SOUTH, DIRECTIONS.WEST]
+
+
+class MovePlanner:
+    """
+    Settles the moves of all our units for the turn together instead of one unit at a time
+
+    While the units decide what to do they only ask for a move, giving their candidate directions best first. resolve()
+    then goes over the requests in rounds on a ReservationTable: a unit takes its first candidate whose cell nobody
+    holds next turn, and waits for a later round while an undecided unit of ours still stands on that cell. A round
+    that settles nobody is followed by one in which undecided units count as staying, so each unit is settled after at
+    most a handful of table lookups per round and no unit waits on a random retry. A unit whose candidates were all
+    taken by units moving there steps aside to its first open detour instead, so units heading the same way spread out.
+    Units that found no open cell, or asked for nothing, stay where they are. Our city tiles take any number of units
+    and are never reserved, opponent city tiles are never entered and neither are the cells of opponent units that
+    cannot act this turn
+
+    ...
+
+    Attributes
+    ----------
+    table : ReservationTable
+        owners are indices into units
+    units : List[Unit]
+        the player's units
+    requests : Dict[int, Tuple[List[DIRECTIONS], List[DIRECTIONS]]]
+        candidate directions and detours of every unit that asked to move, by index into units
+    targets : Dict[int, Position]
+        the cell every settled unit will be on next turn
+    """
+
+    def __init__(self, game_map, player, opponent) -> None:
+        self.map = game_map
+        self.table: ReservationTable = ReservationTable(game_map.width, game_map.height)
+        self.units: List = player.units
+        self.requests: Dict[int, Tuple[List[DIRECTIONS], List[DIRECTIONS]]] = {}
+        self.targets: Dict[int, Position] = {}
+        self.__indices: Dict[str, int] = {unit.id: index for index, unit in enumerate(player.units)}
+        self.__moves: Set[Tuple[Position, Position]] = set()
+        for unit in opponent.units:
+            if not unit.can_act():
+                self.table.reserve(unit.pos, 0, math.ceil(unit.cooldown), OPPONENT)
+
+    # ----------------------------------- Public functions ------------------------------------- #
+
+    def request_move(self, unit, directions, detours=()) -> None:
+        """
+        Asks for unit to move in the first of directions that is still open when the moves are resolved. When every one
+        of them was taken by another unit moving there, the first open one of detours is taken instead. Directions
+        after CENTER are never reached
+        """
+        self.requests[self.__indices[unit.id]] = (self.__get_passable(unit, directions),
+                                                   self.__get_passable(unit, detours))
+
+    def request_move_along(self, unit, distance_field) -> None:
+        """
+        Asks for a step down distance_field, preferring the neighbour closest to a source and then the order north,
+        east, south, west like DistanceField.direction_at. The other neighbours are the detours
+        """
+        distance = distance_field.distance_at(unit.pos)
+        if not distance:
+            return self.hold(unit)
+        neighbours = []
+        for direction in MOVE_DIRECTIONS:
+            target = unit.pos.translate(direction, 1)
+            if self.map.is_on_board(target):
+                neighbour_distance = distance_field.distance_at(target)
+                if neighbour_distance is not None:
+                    neighbours.append((neighbour_distance, direction))
+        neighbours.sort(key=lambda a: a[0])
+        self.request_move(unit, [direction for neighbour_distance, direction in neighbours
+                                 if neighbour_distance < distance],
+                          [direction for neighbour_distance, direction in neighbours if neighbour_distance >= distance])
+
+    def request_move_towards(self, unit, destination, avoid_city_tiles=False, preferred=None) -> None:
+        """
+        Asks for a step that brings unit closer to destination, preferred first (by default the direct direction),
+        with the other steps as detours. When every closer step is blocked by city tiles the unit steps around them
+        instead
+        """
+        if preferred is None:
+            preferred = unit.pos.direction_to(destination)
+        distance = unit.pos.distance_to(destination)
+        candidates = []
+        for direction in MOVE_DIRECTIONS:
+            target = unit.pos.translate(direction, 1)
+            if self.is_passable(target) and not (avoid_city_tiles and self.map.is_city_tile(target)):
+                candidates.append((target.distance_to(destination), direction != preferred, direction))
+        candidates.sort(key=lambda a: (a[1], a[0]))
+        closer = [direction for target_distance, _, direction in candidates if target_distance < distance or
+                  direction == preferred]
+        farther = [direction for direction in (a[2] for a in candidates) if direction not in closer]
+        if closer:
+            self.request_move(unit, closer, farther)
+        else:
+            self.request_move(unit, farther)
+
+    def hold(self, unit) -> None:
+        """
+        Keeps unit where it is this turn
+        """
+        self.requests.pop(self.__indices[unit.id], None)
+
+    def is_passable(self, pos) -> bool:
+        return self.map.is_on_board(pos) and (pos.x, pos.y) not in self.map.opponent_city_tiles
+
+    def is_stackable(self, pos) -> bool:
+        return (pos.x, pos.y) in self.map.player_city_tiles
+
+    def resolve(self, system) -> None:
+        """
+        Settles every request and adds the move actions to system
+        """
+        pending = []
+        for index, unit in enumerate(self.units):
+            if index in self.requests:
+                self.__reserve(unit.pos, 0, 0, index)
+                pending.append(index)
+            else:
+                self.__reserve(unit.pos, 0, max(math.ceil(unit.cooldown), 1), index)
+                self.targets[index] = unit.pos
+        forced = False
+        while pending:
+            waiting = [index for index in pending if not self.__settle(index, forced, system)]
+            forced = len(waiting) == len(pending)
+            pending = waiting
+
+    # ---------------------------------- Private functions ------------------------------------- #
+
+    def __settle(self, index, forced, system) -> bool:
+        """
+        Settles the request of the unit at index, or returns False to wait for the undecided unit on its best open
+        cell. Once forced, undecided units count as staying
+        """
+        unit = self.units[index]
+        directions, detours = self.requests[index]
+        contested = False
+        for direction in directions:
+            target = unit.pos.translate(direction, 1)
+            if (target, unit.pos) in self.__moves:
+                continue  # a unit on target is moving here, and units cannot swap cells
+            if not self.is_stackable(target):
+                owner = self.table.get_owner(target, 1)
+                if owner != FREE:
+                    contested = contested or (owner >= 0 and self.units[owner].pos != target)
+                    continue
+                occupant = self.table.get_owner(target, 0)
+                if occupant >= 0 and occupant not in self.targets:
+                    if forced:
+                        continue
+                    return False
+            return self.__move(index, direction, target, system)
+        if contested:
+            for direction in detours:
+                target = unit.pos.translate(direction, 1)
+                if (target, unit.pos) not in self.__moves and (self.is_stackable(target) or (
+                        self.table.is_free(target, 1) and self.table.is_free(target, 0))):
+                    return self.__move(index, direction, target, system)
+        self.__reserve(unit.pos, 1, 1, index)
+        self.targets[index] = unit.pos
+        return True
+
+    def __move(self, index, direction, target, system) -> bool:
+        unit = self.units[index]
+        self.__reserve(target, 1, UNIT_COOLDOWN[unit.type], index)
+        self.targets[index] = target
+        self.__moves.add((unit.pos, target))
+        system.add_action(unit.move(direction))
+        system.map.add_future_no_go_positions(target)
+        return True
+
+    def __get_passable(self, unit, directions) -> List[DIRECTIONS]:
+        passable = []
+        for direction in directions:
+            if direction is None or direction == DIRECTIONS.CENTER:
+                break
+            if self.is_passable(unit.pos.translate(direction, 1)):
+                passable.append(direction)
+        return passable
+
+    def __reserve(self, pos, first, last, index) -> None:
+        if not self.is_stackable(pos):
+            self.table.reserve(pos, first, last, index)
@@ -0,0 +1,186 @@
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .constants import Constants
+from .position import Position
+from .tables import UNIT_COOLDOWN, BoardTables
+
+DIRECTIONS = Constants.DIRECTIONS
+UNIT_TYPES = Constants.UNIT_TYPES
+COOLDOWNS = {UNIT_TYPES.WORKER: UNIT_COOLDOWN[UNIT_TYPES.WORKER], UNIT_TYPES.CART: UNIT_COOLDOWN[UNIT_TYPES.CART]}
+
+
+class Path:
+    """
+    A path cached for one unit: the cells from where it was planned to the goal, and how it was planned
+    """
+
+    __slots__ = ("goal", "u_type", "avoid_city_tiles", "positions", "cells", "step")
+
+    def __init__(self, goal, u_type, avoid_city_tiles, positions) -> None:
+        self.goal: Position = goal
+        self.u_type: int = u_type
+        self.avoid_city_tiles: bool = avoid_city_tiles
+        self.positions: List[Position] = positions
+        self.cells: Set[Tuple[int, int]] = {(pos.x, pos.y) for pos in positions}
+        self.step: int = 0
+
+    def is_for(self, goal, u_type, avoid_city_tiles) -> bool:
+        return self.goal == goal and self.u_type == u_type and self.avoid_city_tiles == avoid_city_tiles
+
+    def advance_to(self, pos) -> bool:
+        """
+        Moves the step to pos, which must be where the unit was last turn or the cell after it. Returns False when the
+        unit left the path
+        """
+        for step in (self.step, self.step + 1):
+            if step < len(self.positions) and self.positions[step] == pos:
+                self.step = step
+                return True
+        return False
+
+
+class PathFinder:
+    """
+    A* over the board where stepping onto a cell costs the turns the unit then waits out its cooldown there: the base
+    cooldown of its type (UNIT_ACTION_COOLDOWN) shortened by the road on the cell, since every turn the cooldown drops
+    by 1 plus the road level. Opponent city tiles are never entered
+
+    Paths are kept per unit id across turns. update() drops the ones the turn's ChangeSet touches, meaning a road or a
+    city tile changed on one of their cells, so a unit that keeps heading to the same goal follows its cached path
+    until then instead of searching again. After a full rebuild the ChangeSet names no cells, so the roads and city
+    tiles are compared with the ones read last turn instead. Resource changes along the way are ignored as they change
+    neither costs nor passability
+
+    ...
+
+    Attributes
+    ----------
+    costs : Dict[int, List[int]]
+        turns spent per step onto each cell, by unit type, indexed y * width + x
+    paths : Dict[str, Path]
+        cached path of every unit id
+    searches, reuses : int
+        number of times a next step came from a new search and from a cached path
+    """
+
+    def __init__(self, width, height) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.costs: Dict[int, List[int]] = {}
+        self.paths: Dict[str, Path] = {}
+        self.searches: int = 0
+        self.reuses: int = 0
+        self.__neighbours: List[Tuple[int, ...]] = BoardTables.for_size(width, height).neighbours
+        self.__opponent_city_tiles: List[bool] = [False] * (width * height)
+        self.__city_tiles: List[bool] = [False] * (width * height)
+        self.__road: Optional[np.ndarray] = None
+        self.__city_owner: Optional[np.ndarray] = None
+
+    # ----------------------------------- Public functions ------------------------------------- #
+
+    def update(self, game_map, changes, team) -> None:
+        """
+        Reads this turn's roads and city tiles, and forgets the paths changes touched
+        """
+        if changes.full:
+            changed = self.__get_changed_cells(game_map)
+        else:
+            changed = changes.roads | changes.citytiles_added | changes.citytiles_removed
+            for unitid in changes.units_removed:
+                self.paths.pop(unitid, None)
+        if changes.full or changes.roads or not self.costs:
+            self.__road = game_map.road.copy()
+            road = self.__road.ravel()
+            self.costs = {u_type: (np.floor((cooldown - 1) / (1 + road)) + 1).astype(np.int32).tolist()
+                          for u_type, cooldown in COOLDOWNS.items()}
+        if changes.full or changes.citytiles_added or changes.citytiles_removed:
+            self.__city_owner = game_map.city_owner.copy()
+            owners = self.__city_owner.ravel()
+            self.__opponent_city_tiles = ((owners != -1) & (owners != team)).tolist()
+            self.__city_tiles = (owners != -1).tolist()
+        if changed is None:
+            self.paths = {}
+        elif changed:
+            self.paths = {unitid: path for unitid, path in self.paths.items() if not (path.cells & changed)}
+
+    def get_goal(self, unit) -> Optional[Position]:
+        """
+        Returns the goal of the unit's cached path, if it has one and is still on it
+        """
+        path = self.paths.get(unit.id)
+        if path is None or not path.advance_to(unit.pos):
+            return None
+        return path.goal
+
+    def get_next_direction(self, unit, goal, avoid_city_tiles=False) -> Optional[DIRECTIONS]:
+        """
+        Returns the direction of the unit's next step on its path to goal, searching for a path only when it has no
+        cached one for this goal, or None if goal cannot be reached
+        """
+        if unit.pos == goal:
+            return None
+        path = self.paths.get(unit.id)
+        if path is not None and path.is_for(goal, unit.type, avoid_city_tiles) and path.advance_to(unit.pos):
+            self.reuses += 1
+        else:
+            self.searches += 1
+            positions = self.find_path(unit.pos, goal, unit.type, avoid_city_tiles)
+            if positions is None:
+                self.paths.pop(unit.id, None)
+                return None
+            path = self.paths[unit.id] = Path(goal, unit.type, avoid_city_tiles, positions)
+        return unit.pos.direction_to(path.positions[path.step + 1])
+
+    def find_path(self, start, goal, u_type, avoid_city_tiles=False) -> Optional[List[Position]]:
+        """
+        Returns the cheapest path from start to goal, both included, or None if there is none. With avoid_city_tiles
+        the path crosses no city tile of either team, although it may end on one
+        """
+        width = self.width
+        costs = self.costs[u_type]
+        blocked = self.__city_tiles if avoid_city_tiles else self.__opponent_city_tiles
+        neighbours = self.__neighbours
+        start_index = start.y * width + start.x
+        goal_index = goal.y * width + goal.x
+        goal_x, goal_y = goal.x, goal.y
+        best = {start_index: 0}
+        came_from = {}
+        frontier = [(start - goal, 0, start_index)]
+        while frontier:
+            _, cost, index = heapq.heappop(frontier)
+            if index == goal_index:
+                return self.__reconstruct(came_from, index)
+            if cost > best[index]:
+                continue
+            for neighbour in neighbours[index]:
+                if blocked[neighbour] and neighbour != goal_index:
+                    continue
+                neighbour_cost = cost + costs[neighbour]
+                if neighbour_cost < best.get(neighbour, neighbour_cost + 1):
+                    best[neighbour] = neighbour_cost
+                    came_from[neighbour] = index
+                    estimate = abs(neighbour % width - goal_x) + abs(neighbour // width - goal_y)
+                    heapq.heappush(frontier, (neighbour_cost + estimate, neighbour_cost, neighbour))
+        return None
+
+    # ---------------------------------- Private functions ------------------------------------- #
+
+    def __get_changed_cells(self, game_map) -> Optional[Set[Tuple[int, int]]]:
+        """
+        cells whose road or city tile differs from the ones read last, or None when nothing was read yet
+        """
+        if self.__road is None or self.__city_owner is None:
+            return None
+        changed = (game_map.road != self.__road) | (game_map.city_owner != self.__city_owner)
+        ys, xs = np.nonzero(changed)
+        return set(zip(xs.tolist(), ys.tolist()))
+
+    def __reconstruct(self, came_from, index) -> List[Position]:
+        indices = [index]
+        while index in came_from:
+            index = came_from[index]
+            indices.append(index)
+        return [Position(index % self.width, index // self.width) for index in reversed(indices)]
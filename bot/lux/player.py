@@ -1,28 +1,77 @@
-from typing import Dict
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
 
 from .city import City
 from .constants import Constants
-from .gamesetup.game_constants import GAME_CONSTANTS
 from .position import Position
+from .tables import COAL_RESEARCH, URANIUM_RESEARCH
 from .unit import Unit
 
 UNIT_TYPES = Constants.UNIT_TYPES
 
 
 class Player:
+    """
+    One side of the game. units and cities may be handed over as builders by Game, in which case the Unit and City
+    objects are only made the first time they are read
+
+    ...
+
+    Attributes
+    ----------
+    units : List[Unit]
+        the player's units
+    cities : Dict[str, City]
+        the player's cities by id
+    """
+
     def __init__(self, team):
         self.team = team
         self.research_points = 0
-        self.units: list[Unit] = []
-        self.cities: Dict[str, City] = {}
+        self.__units: List[Unit] = []
+        self.__cities: Dict[str, City] = {}
+        self.__build_units: Optional[Callable[[], List[Unit]]] = None
+        self.__build_cities: Optional[Callable[[], Dict[str, City]]] = None
         self.city_tile_count = 0
         self.units_plus_added_this_turn = 0
 
+    @property
+    def units(self) -> List[Unit]:
+        if self.__build_units is not None:
+            build, self.__build_units = self.__build_units, None
+            self.__units = build()
+        return self.__units
+
+    @units.setter
+    def units(self, units: List[Unit]) -> None:
+        self.__units = units
+        self.__build_units = None
+
+    @property
+    def cities(self) -> Dict[str, City]:
+        if self.__build_cities is not None:
+            build, self.__build_cities = self.__build_cities, None
+            self.__cities = build()
+        return self.__cities
+
+    @cities.setter
+    def cities(self, cities: Dict[str, City]) -> None:
+        self.__cities = cities
+        self.__build_cities = None
+
+    def _set_builders(self, build_units, build_cities) -> None:
+        """
+        do not use this function, this is for internal tracking of state. units and cities become the results of
+        build_units() and build_cities(), called the first time they are read
+        """
+        self.__build_units = build_units
+        self.__build_cities = build_cities
+
     def researched_coal(self) -> bool:
-        return self.research_points >= GAME_CONSTANTS["PARAMETERS"]["RESEARCH_REQUIREMENTS"]["COAL"]
+        return self.research_points >= COAL_RESEARCH
 
     def researched_uranium(self) -> bool:
-        return self.research_points >= GAME_CONSTANTS["PARAMETERS"]["RESEARCH_REQUIREMENTS"]["URANIUM"]
+        return self.research_points >= URANIUM_RESEARCH
 
     def get_max_units(self) -> int:
         return sum([len(x.citytiles) for x in self.cities.values()])
@@ -36,14 +85,37 @@ class Player:
             city.activate_citytile_actions(system, self)
 
     def activate_unit_actions(self, system) -> None:
-        for unit in self.units:
-            unit.activate_actions(system, self)
+        """
+        Units only ask for their moves, which system.planner then settles for all of them together. With a time
+        budget on the system, units act in priority order and the deadline is checked before each one; once it has
+        passed, every remaining unit takes its fallback action instead
+        """
+        budget = system.budget
+        profiler = system.profiler
+        units = self.units if budget is None else self.get_units_by_priority(system)
+        for index, unit in enumerate(units):
+            if budget is not None and budget.is_expired():
+                system.log.warning("time budget expired with %d of %d units left", len(units) - index, len(units))
+                for remaining_unit in units[index:]:
+                    remaining_unit.activate_fallback_action(system)
+                break
+            if profiler.enabled:
+                start = perf_counter_ns()
+                unit.activate_actions(system, self)
+                profiler.record("unit", start, perf_counter_ns(), {"id": unit.id})
+            else:
+                unit.activate_actions(system, self)
+        with profiler.span("resolve_moves"):
+            system.planner.resolve(system)
 
-    def has_cities_to_expand(self) -> bool:
-        expandable = False
-        for city in self.cities.values():
-            expandable = expandable or city.can_expand()
-        return expandable
+    def get_units_by_priority(self, system) -> List[Unit]:
+        """
+        the units that can act this turn, most urgent first (see Unit.get_priority), otherwise in their usual order
+        """
+        return sorted((unit for unit in self.units if unit.can_act()), key=lambda unit: unit.get_priority(system))
+
+    def has_cities_to_expand(self, system) -> bool:
+        return system.fuel_forecast.any_can_expand()
 
     # def get_optimal_new_build_cell(self, pos, system) -> Position:
     #     closest_from_each_city = []
@@ -1,5 +1,5 @@
 import math
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from .constants import Constants
 
@@ -7,9 +7,59 @@ DIRECTIONS = Constants.DIRECTIONS
 
 
 class Position:
-    def __init__(self, x, y):
-        self.x: int = x
-        self.y: int = y
+    """
+    An immutable board coordinate
+
+    Positions on the current board, and on the one-cell ring around it, are interned: Position(x, y) returns the same
+    object every time, and translate, get_adjacent_positions and direction_to read precomputed tables instead of
+    allocating. Call Position.intern_board(width, height) once the board size is known; tables are cached per size
+    """
+
+    __slots__ = ("x", "y", "_neighbours", "_adjacent")
+
+    _interned: List[List['Position']] = []
+    _boards: Dict[Tuple[int, int], List[List['Position']]] = {}
+
+    def __new__(cls, x, y) -> 'Position':
+        interned = Position._interned
+        if 0 <= y + 1 < len(interned):
+            row = interned[y + 1]
+            if 0 <= x + 1 < len(row):
+                return row[x + 1]
+        return Position._allocate(x, y)
+
+    @staticmethod
+    def _allocate(x, y) -> 'Position':
+        pos = object.__new__(Position)
+        object.__setattr__(pos, "x", x)
+        object.__setattr__(pos, "y", y)
+        object.__setattr__(pos, "_neighbours", None)
+        object.__setattr__(pos, "_adjacent", None)
+        return pos
+
+    @staticmethod
+    def intern_board(width, height) -> None:
+        """
+        Makes the positions of a width x height board, plus a one-cell margin, the interned ones
+        """
+        board = Position._boards.get((width, height))
+        if board is None:
+            board = [[Position._allocate(x, y) for x in range(-1, width + 1)] for y in range(-1, height + 1)]
+            Position._boards[(width, height)] = board
+            Position._interned = board
+            for row in board:
+                for pos in row:
+                    object.__setattr__(pos, "_neighbours", pos.__generate_neighbours())
+                    object.__setattr__(pos, "_adjacent", tuple(pos._neighbours[direction] for direction in
+                                                               (DIRECTIONS.WEST, DIRECTIONS.EAST, DIRECTIONS.NORTH,
+                                                                DIRECTIONS.SOUTH)))
+        Position._interned = board
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError("Position is immutable")
+
+    def __reduce__(self):
+        return Position, (self.x, self.y)
 
     def __sub__(self, pos) -> int:
         return abs(pos.x - self.x) + abs(pos.y - self.y)
@@ -24,12 +74,17 @@ class Position:
         return (self - pos) <= 1
 
     def __eq__(self, pos) -> bool:
-        return self.x == pos.x and self.y == pos.y
+        return self is pos or (self.x == pos.x and self.y == pos.y)
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
 
     def equals(self, pos) -> bool:
         return self == pos
 
     def translate(self, direction, units) -> Optional['Position']:
+        if units == 1 and self._neighbours is not None:
+            return self._neighbours.get(direction)
         if direction == DIRECTIONS.NORTH:
             return Position(self.x, self.y - units)
         elif direction == DIRECTIONS.EAST:
@@ -46,34 +101,18 @@ class Position:
         """
         Return closest position to target_pos from this position
         """
-        check_dirs = [
-            DIRECTIONS.NORTH,
-            DIRECTIONS.EAST,
-            DIRECTIONS.SOUTH,
-            DIRECTIONS.WEST,
-        ]
-        closest_dist = self.distance_to(target_pos)
-        closest_dir = DIRECTIONS.CENTER
-        for direction in check_dirs:
-            newpos = self.translate(direction, 1)
-            dist = target_pos.distance_to(newpos)
-            if dist < closest_dist:
-                closest_dir = direction
-                closest_dist = dist
-        return closest_dir
+        dx = target_pos.x - self.x
+        dy = target_pos.y - self.y
+        return DIRECTION_TABLE[(dy > 0) - (dy < 0) + 1][(dx > 0) - (dx < 0) + 1]
 
     def __str__(self) -> str:
         return f"({self.x}, {self.y})"
 
     def get_adjacent_positions(self) -> List['Position']:
-        result = []
-        xs = [self.x - 1, self.x + 1]
-        ys = [self.y - 1, self.y + 1]
-        for x in xs:
-            result.append(Position(x, self.y))
-        for y in ys:
-            result.append(Position(self.x, y))
-        return result
+        if self._adjacent is not None:
+            return list(self._adjacent)
+        return [Position(self.x - 1, self.y), Position(self.x + 1, self.y), Position(self.x, self.y - 1),
+                Position(self.x, self.y + 1)]
 
     def get_closest_from_list(self, list_of_pos) -> Optional['Position']:
         closest_position = None
@@ -86,3 +125,21 @@ class Position:
                 closest_position = position
                 distance = temp_dist
         return closest_position
+
+    def __generate_neighbours(self) -> Dict[str, 'Position']:
+        return {
+            DIRECTIONS.NORTH: Position(self.x, self.y - 1),
+            DIRECTIONS.EAST: Position(self.x + 1, self.y),
+            DIRECTIONS.SOUTH: Position(self.x, self.y + 1),
+            DIRECTIONS.WEST: Position(self.x - 1, self.y),
+            DIRECTIONS.CENTER: self,
+        }
+
+
+# DIRECTION_TABLE[sign(dy) + 1][sign(dx) + 1] is the first of north, east, south, west that gets closer to a target
+# dx, dy away, matching the order direction_to has always checked them in
+DIRECTION_TABLE = [
+    [DIRECTIONS.NORTH, DIRECTIONS.NORTH, DIRECTIONS.NORTH],
+    [DIRECTIONS.WEST, DIRECTIONS.CENTER, DIRECTIONS.EAST],
+    [DIRECTIONS.SOUTH, DIRECTIONS.SOUTH, DIRECTIONS.EAST],
+]
@@ -0,0 +1,123 @@
+import json
+import os
+from contextlib import nullcontext
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional, Tuple
+
+NULL_SPAN = nullcontext()
+PERCENTILES = (50, 95, 99)
+
+
+class Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args) -> None:
+        self.profiler: TurnProfiler = profiler
+        self.name: str = name
+        self.args: Optional[Dict[str, Any]] = args
+        self.start: int = 0
+
+    def __enter__(self) -> "Span":
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.record(self.name, self.start, perf_counter_ns(), self.args)
+
+
+class TurnProfiler:
+    """
+    Times named spans of each turn. Every turn can be exported as Chrome trace-event JSON (load it in chrome://tracing
+    or Perfetto) and the durations of every span name are summarised as percentiles over all turns so far
+
+    While disabled, span() hands back one shared no-op context manager and nothing is recorded, so instrumented code
+    only pays for an attribute lookup and a call. Hot loops should test enabled once and skip the timing entirely
+
+    ...
+
+    Attributes
+    ----------
+    enabled : bool
+        whether spans are recorded
+    trace_dir : Optional[str]
+        when set, end_turn writes turn_<turn>.json and summary.json there
+    turn : int
+        the turn being recorded
+    events : List[Tuple[str, int, int, Optional[Dict[str, Any]]]]
+        (name, start, duration, args) of every span of the current turn, times in nanoseconds
+    durations : Dict[str, List[int]]
+        duration in nanoseconds of every span recorded so far, by name
+    """
+
+    def __init__(self, enabled: bool = False, trace_dir: Optional[str] = None) -> None:
+        self.enabled: bool = enabled
+        self.trace_dir: Optional[str] = trace_dir
+        self.turn: int = 0
+        self.origin: int = perf_counter_ns()
+        self.events: List[Tuple[str, int, int, Optional[Dict[str, Any]]]] = []
+        self.durations: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_environment(cls, variable: str = "LUX_PROFILE") -> "TurnProfiler":
+        """
+        a profiler writing to the directory named by the environment variable, or a disabled one when it is unset
+        """
+        trace_dir = os.environ.get(variable)
+        return cls(enabled=bool(trace_dir), trace_dir=trace_dir or None)
+
+    # ---------------------------------------- Recording --------------------------------------- #
+
+    def span(self, name: str, args: Optional[Dict[str, Any]] = None):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, args)
+
+    def record(self, name: str, start: int, end: int, args: Optional[Dict[str, Any]] = None) -> None:
+        """
+        records a span timed by the caller with perf_counter_ns
+        """
+        self.events.append((name, start, end - start, args))
+        self.durations.setdefault(name, []).append(end - start)
+
+    def begin_turn(self, turn: int) -> None:
+        self.turn = turn
+        self.events = []
+
+    def end_turn(self) -> None:
+        if not self.enabled or self.trace_dir is None:
+            return
+        os.makedirs(self.trace_dir, exist_ok=True)
+        with open(os.path.join(self.trace_dir, f"turn_{self.turn}.json"), "w") as trace_file:
+            json.dump(self.get_trace(), trace_file)
+        with open(os.path.join(self.trace_dir, "summary.json"), "w") as summary_file:
+            json.dump(self.get_summary(), summary_file, indent=2)
+
+    # ---------------------------------------- Reporting --------------------------------------- #
+
+    def get_trace(self) -> Dict[str, Any]:
+        """
+        the spans of the current turn as complete ("X") trace events, timestamps in microseconds
+        """
+        events = []
+        for name, start, duration, args in self.events:
+            event = {"name": name, "ph": "X", "ts": (start - self.origin) / 1000, "dur": duration / 1000, "pid": 0,
+                     "tid": 0}
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"turn": self.turn}}
+
+    def get_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        count, mean, max and p50 / p95 / p99 in milliseconds of every span name over all turns so far
+        """
+        import numpy as np  # only summaries need it, so the agent does not import it at startup
+
+        summary = {}
+        for name, durations in self.durations.items():
+            milliseconds = np.array(durations) / 1e6
+            summary[name] = {"count": len(durations), "mean": float(milliseconds.mean()),
+                             "max": float(milliseconds.max())}
+            for percentile, value in zip(PERCENTILES, np.percentile(milliseconds, PERCENTILES).tolist()):
+                summary[name][f"p{percentile}"] = value
+        return summary
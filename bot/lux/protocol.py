@@ -0,0 +1,101 @@
+import os
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+FINISH = "D_FINISH"
+CHUNK_SIZE = 1 << 16
+HEADER_LINES = 2  # player id and map size, before the updates of the first turn
+
+Agent = Callable[[Any, Any], List[str]]
+
+
+class Observation(Dict[str, Any]):
+    """
+    What agent(observation, configuration) gets every turn: the turn under "step", its lines under "updates" (the
+    player id and map size first on turn 0) and, when it was read through run_agent, the lines already parsed by an
+    UpdateStream under "parsed"
+    """
+
+    def __init__(self, player=0) -> None:
+        super().__init__()
+        self.player = player
+
+
+class LineReader:
+    """
+    Reads the lines the engine writes from a file descriptor in bulk. Every read takes whatever the pipe holds, up to
+    chunk_size bytes, and hands back all the complete lines in it at once, keeping a trailing partial line for the
+    next read
+    """
+
+    def __init__(self, fd: int, chunk_size: int = CHUNK_SIZE) -> None:
+        self.fd: int = fd
+        self.chunk_size: int = chunk_size
+        self.__partial: bytes = b""
+
+    def read_lines(self) -> List[str]:
+        """
+        the complete lines available, waiting for at least one. Raises EOFError once the input is closed
+        """
+        while True:
+            chunk = os.read(self.fd, self.chunk_size)
+            if not chunk:
+                raise EOFError
+            complete, newline, self.__partial = (self.__partial + chunk).rpartition(b"\n")
+            if newline:
+                if b"\r" in complete:
+                    complete = complete.replace(b"\r", b"")
+                return complete.decode().split("\n")
+
+
+def write_actions(output: BinaryIO, actions: List[str]) -> None:
+    """
+    writes the actions of a turn and D_FINISH in one write, then flushes
+    """
+    output.write(f"{','.join(actions)}\n{FINISH}\n".encode())
+    output.flush()
+
+
+def run_agent(agent: Agent, reader: LineReader, output: BinaryIO,
+              on_turn: Optional[Callable[[int, List[str], List[str]], None]] = None) -> None:
+    """
+    Plays agent over the engine protocol until the input closes. The lines of a turn go to an UpdateStream as each
+    read brings them in, so all but the last record type are parsed by the time D_DONE arrives. on_turn(step,
+    updates, actions) is called after the actions of every turn are written
+    """
+    observation = Observation()
+    step = 0
+    updates: List[str] = []
+    stream = None
+    header = HEADER_LINES
+    while True:
+        try:
+            lines = reader.read_lines()
+        except EOFError:
+            return
+        start = 0
+        while start < len(lines):
+            if header:
+                used = min(header, len(lines) - start)
+                updates.extend(lines[start:start + used])
+                header -= used
+                start += used
+                observation.player = int(updates[0])
+                continue
+            if stream is None:
+                # the parser is backed by numpy, so it is only imported once the first update is in
+                from .gamesetup.parser import UpdateStream
+                stream = UpdateStream()
+            used = stream.feed(lines[start:] if start else lines)
+            updates.extend(lines[start:start + used])
+            start += used
+            if stream.done:
+                observation["step"] = step
+                observation["updates"] = updates
+                observation["parsed"] = stream.finish()
+                actions = agent(observation, None)
+                write_actions(output, actions)
+                if on_turn is not None:
+                    on_turn(step, updates, actions)
+                step += 1
+                updates = []
+                stream = UpdateStream()
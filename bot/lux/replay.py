@@ -0,0 +1,158 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+MAGIC = b"LUXR"
+INDEX_MAGIC = b"LXRI"
+VERSION = 1
+HEADER = struct.Struct("<4sI")  # magic, version
+FRAME = struct.Struct("<II")  # turn, compressed length
+TRAILER = struct.Struct("<QI4s")  # index offset, turns, index magic
+ACTIONS_SEPARATOR = "\x1e"
+COMPRESSION_LEVEL = 1
+KEYFRAME_INTERVAL = 16
+
+Turn = Tuple[List[str], List[str]]
+
+
+class ReplayRecorder:
+    """
+    Writes the update lines and actions of every turn to a compact binary replay
+
+    Every turn is one frame: its turn number, then the update lines and the comma-joined actions compressed with zlib.
+    Every KEYFRAME_INTERVAL-th frame is a keyframe compressed on its own, and the frames after it use it as the preset
+    dictionary, since one turn's updates mostly repeat the last ones. Reading any turn decompresses at most two
+    frames. Each frame is flushed as it is written, so a replay cut short when the process is killed keeps every turn
+    played; close() appends the turn index, and a replay without one is indexed by scanning its frames
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        where the replay is written, created on the first recorded turn
+    offsets : List[int]
+        file offset of the frame of every recorded turn
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.offsets: List[int] = []
+        self.__file = None
+        self.__keyframe: Optional[bytes] = None
+
+    @classmethod
+    def from_environment(cls, player: int, variable: str = "LUX_REPLAY") -> Optional["ReplayRecorder"]:
+        """
+        a recorder writing to the path named by the environment variable, or None when it is unset or empty, so
+        recording is off unless asked for. A {player} field in the path is replaced by the player id, which keeps the
+        two agents of a game apart, e.g. LUX_REPLAY=replay_{player}.lxr
+        """
+        path = os.environ.get(variable, "")
+        return cls(path.format(player=player)) if path else None
+
+    def record(self, turn: int, updates: List[str], actions: List[str]) -> None:
+        payload = ("\n".join(updates) + ACTIONS_SEPARATOR + ",".join(actions)).encode()
+        if self.__file is None:
+            self.__file = open(self.path, "wb")
+            self.__file.write(HEADER.pack(MAGIC, VERSION))
+        if len(self.offsets) % KEYFRAME_INTERVAL == 0:
+            self.__keyframe = payload
+            data = zlib.compress(payload, COMPRESSION_LEVEL)
+        else:
+            compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=self.__keyframe)
+            data = compressor.compress(payload) + compressor.flush()
+        self.offsets.append(self.__file.tell())
+        self.__file.write(FRAME.pack(turn, len(data)) + data)
+        self.__file.flush()
+
+    def close(self) -> None:
+        """
+        writes the turn index and closes the file
+        """
+        if self.__file is None:
+            return
+        index_offset = self.__file.tell()
+        self.__file.write(struct.pack(f"<{len(self.offsets)}Q", *self.offsets))
+        self.__file.write(TRAILER.pack(index_offset, len(self.offsets), INDEX_MAGIC))
+        self.__file.close()
+        self.__file = None
+
+
+class ReplayReader:
+    """
+    Random access to the turns of a replay written by ReplayRecorder, through a memory map of the file. Reading a turn
+    decompresses its frame and, unless it is a keyframe or its keyframe was the last one needed, its keyframe
+
+    ...
+
+    Attributes
+    ----------
+    turns : List[int]
+        turn number of every frame
+    offsets : List[int]
+        file offset of every frame
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        with open(path, "rb") as replay_file:
+            self.__buffer: mmap.mmap = mmap.mmap(replay_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = HEADER.unpack_from(self.__buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a replay")
+        self.offsets: List[int] = self.__read_index()
+        self.turns: List[int] = [FRAME.unpack_from(self.__buffer, offset)[0] for offset in self.offsets]
+        self.__positions = {turn: position for position, turn in enumerate(self.turns)}
+        self.__keyframe: Tuple[int, Optional[bytes]] = (-1, None)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[Turn]:
+        for position in range(len(self.offsets)):
+            yield self.read_frame(position)
+
+    def read_turn(self, turn: int) -> Turn:
+        """
+        the update lines and actions of turn
+        """
+        return self.read_frame(self.__positions[turn])
+
+    def read_frame(self, position: int) -> Turn:
+        payload = self.__decompress(position)
+        updates, actions = payload.decode().split(ACTIONS_SEPARATOR)
+        return updates.split("\n") if updates else [], actions.split(",") if actions else []
+
+    def close(self) -> None:
+        self.__buffer.close()
+
+    def __decompress(self, position) -> bytes:
+        offset = self.offsets[position]
+        _, length = FRAME.unpack_from(self.__buffer, offset)
+        data = self.__buffer[offset + FRAME.size:offset + FRAME.size + length]
+        if position % KEYFRAME_INTERVAL == 0:
+            return zlib.decompress(data)
+        keyframe_position = position - position % KEYFRAME_INTERVAL
+        if self.__keyframe[0] != keyframe_position:
+            self.__keyframe = (keyframe_position, self.__decompress(keyframe_position))
+        decompressor = zlib.decompressobj(zdict=self.__keyframe[1])
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def __read_index(self) -> List[int]:
+        buffer = self.__buffer
+        if len(buffer) >= HEADER.size + TRAILER.size:
+            index_offset, count, magic = TRAILER.unpack_from(buffer, len(buffer) - TRAILER.size)
+            if magic == INDEX_MAGIC and index_offset + count * 8 + TRAILER.size == len(buffer):
+                return list(struct.unpack_from(f"<{count}Q", buffer, index_offset))
+        offsets = []
+        offset = HEADER.size
+        while offset + FRAME.size <= len(buffer):
+            _, length = FRAME.unpack_from(buffer, offset)
+            if offset + FRAME.size + length > len(buffer):
+                break
+            offsets.append(offset)
+            offset += FRAME.size + length
+        return offsets
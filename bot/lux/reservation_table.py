@@ -0,0 +1,39 @@
+import numpy as np
+
+FREE = -1
+OPPONENT = -2
+
+
+class ReservationTable:
+    """
+    Who will stand on each cell over the next few turns, as a (horizon, height, width) array of owner numbers indexed
+    [offset, y, x] where offset 0 is the current turn. Every lookup and reservation is a single array access
+
+    Owners are the index of one of our units in the move planner, OPPONENT for opponent units and FREE where nobody is
+    expected
+
+    ...
+
+    Attributes
+    ----------
+    horizon : int
+        number of turn offsets tracked
+    owners : np.ndarray
+        owner of each cell at each turn offset
+    """
+
+    def __init__(self, width, height, horizon=4) -> None:
+        self.horizon: int = horizon
+        self.owners: np.ndarray = np.full((horizon, height, width), FREE, dtype=np.int32)
+
+    def get_owner(self, pos, offset) -> int:
+        return int(self.owners[offset, pos.y, pos.x])
+
+    def is_free(self, pos, offset) -> bool:
+        return self.owners[offset, pos.y, pos.x] == FREE
+
+    def reserve(self, pos, first, last, owner) -> None:
+        """
+        Reserves pos for owner from turn offset first to last inclusive, cut off at the horizon
+        """
+        self.owners[first:min(last, self.horizon - 1) + 1, pos.y, pos.x] = owner
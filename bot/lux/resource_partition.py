@@ -0,0 +1,46 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .cell import Cell
+from .spatial_index import SpatialIndex
+
+
+class ResourcePartition:
+    """
+    All resource cells of one type, built once per turn
+
+    ...
+
+    Attributes
+    ----------
+    type : str
+        the resource type of every cell in the partition
+    mask : np.ndarray
+        boolean [y, x] mask of the cells
+    cells : List[Cell]
+        the cells, in row-major order
+    count : int
+        number of cells
+    total_amount : int
+        resource left over all cells
+    centroid : Optional[Tuple[float, float]]
+        mean (x, y) of the cells, None when the partition is empty
+    index : SpatialIndex
+        nearest-position index over the cells
+    """
+
+    def __init__(self, game_map, r_type: str, mask: np.ndarray) -> None:
+        ys, xs = np.nonzero(mask)
+        self.type: str = r_type
+        self.mask: np.ndarray = mask
+        self.cells: List[Cell] = [game_map.get_cell(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+        self.count: int = len(self.cells)
+        self.total_amount: int = int(game_map.resource_amount[mask].sum())
+        self.centroid: Optional[Tuple[float, float]] = (float(xs.mean()), float(ys.mean())) if self.count else None
+        self.index: SpatialIndex = SpatialIndex(game_map.width, game_map.height)
+        for cell in self.cells:
+            self.index.add(cell.pos)
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,114 @@
+import math
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+from .constants import Constants
+from .tables import COAL_RESEARCH, COLLECTION_RATE, MAX_DAYS, MAX_WOOD_AMOUNT, URANIUM_RESEARCH, WOOD_GROWTH_RATE
+
+RESOURCE_CODES = Constants.RESOURCE_CODES
+
+NEVER = np.iinfo(np.int32).max
+
+
+class ResourceProjection:
+    """
+    Projects the resources on the board forward in time, assuming every worker stays where it is. Each turn a worker
+    collects its type's WORKER_COLLECTION_RATE from its cell and the four next to it, of the types its team has
+    researched, and then wood below MAX_WOOD_AMOUNT grows back by WOOD_GROWTH_RATE, rounded up, as the engine does
+
+    ...
+
+    Attributes
+    ----------
+    amount : np.ndarray
+        resource left on each cell [y, x] now
+    drain : np.ndarray
+        resource collected from each cell per turn by the workers in reach of it
+    depleted_in : np.ndarray
+        turns until each cell runs out, NEVER for the ones that last the rest of the game
+    """
+
+    def __init__(self, game_map, players: List, turn: int = 0) -> None:
+        self.amount: np.ndarray = np.where(game_map.get_resource_mask(), game_map.resource_amount, 0)
+        self.drain: np.ndarray = np.zeros(self.amount.shape, dtype=np.int32)
+        rates = np.array(COLLECTION_RATE, dtype=np.int32)
+        for player in players:
+            collected = rates * np.array([False, True, player.research_points >= COAL_RESEARCH,
+                                          player.research_points >= URANIUM_RESEARCH])
+            self.drain += collected[game_map.resource_type] * self.__workers_in_reach(player, self.amount.shape)
+        self.drain[self.amount == 0] = 0
+        self.__wood: np.ndarray = game_map.resource_type == RESOURCE_CODES.WOOD
+        self.depleted_in: np.ndarray = self.__generate_depletion(MAX_DAYS - turn)
+
+    # ----------------------------------- Public functions ------------------------------------- #
+
+    def project(self, turns) -> np.ndarray:
+        """
+        resource left on each cell [y, x] in turns turns
+        """
+        amount = self.amount
+        for _ in range(turns):
+            amount = self.__step(amount, self.drain, self.__wood)
+        return amount
+
+    def lasts(self, pos, turns) -> bool:
+        """
+        whether the cell at pos still has resource left in turns turns
+        """
+        return self.depleted_in[pos.y, pos.x] > turns
+
+    # ---------------------------------- Private functions ------------------------------------- #
+
+    @staticmethod
+    def __workers_in_reach(player, shape) -> np.ndarray:
+        """
+        number of the player's workers with cargo space left on or next to each cell
+        """
+        counts = np.zeros((shape[0] + 2, shape[1] + 2), dtype=np.int32)
+        for unit in player.units:
+            if unit.is_worker() and unit.get_cargo_space_left() > 0:
+                counts[unit.pos.y + 1, unit.pos.x + 1] += 1
+        return counts[1:-1, 1:-1] + counts[:-2, 1:-1] + counts[2:, 1:-1] + counts[1:-1, :-2] + counts[1:-1, 2:]
+
+    @staticmethod
+    def __step(amount, drain, wood) -> np.ndarray:
+        amount = np.maximum(amount - drain, 0)
+        growing = wood & (amount > 0) & (amount < MAX_WOOD_AMOUNT)
+        return np.where(growing, np.minimum(np.ceil(amount * WOOD_GROWTH_RATE), MAX_WOOD_AMOUNT), amount)
+
+    def __generate_depletion(self, horizon) -> np.ndarray:
+        """
+        Coal and uranium do not grow back, so a drained cell runs out after amount / drain turns. How long a drained
+        wood cell lasts only depends on its amount and drain, so it is looked up in _wood_depletion
+        """
+        depleted_in = np.full(self.amount.shape, NEVER, dtype=np.int32)
+        drained = self.drain > 0
+        other = drained & ~self.__wood
+        depleted_in[other] = -(-self.amount[other] // self.drain[other])
+        ys, xs = np.nonzero(drained & self.__wood)
+        for y, x, amount, drain in zip(ys.tolist(), xs.tolist(), self.amount[ys, xs].tolist(),
+                                       self.drain[ys, xs].tolist()):
+            depleted_in[y, x] = _wood_depletion(amount, drain)
+        depleted_in[depleted_in > horizon] = NEVER
+        return depleted_in
+
+
+@lru_cache(maxsize=None)
+def _wood_depletion(amount: int, drain: int) -> int:
+    """
+    turns until a wood cell of amount drained by drain every turn runs out, stepped like ResourceProjection.project,
+    or NEVER once it stops shrinking: the step is monotonic, so from then on it never will
+    """
+    turn = 0
+    while True:
+        turn += 1
+        left = amount - drain
+        if left <= 0:
+            return turn
+        if left < MAX_WOOD_AMOUNT:
+            left = min(math.ceil(left * WOOD_GROWTH_RATE), MAX_WOOD_AMOUNT)
+        if left >= amount:
+            return NEVER
+        amount = left
@@ -0,0 +1,94 @@
+from bisect import insort
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+from .position import Position
+
+
+class SpatialIndex:
+    """
+    A bucket grid over the board answering Manhattan nearest and k-nearest queries
+
+    Buckets are searched in square rings around the query's bucket and the search stops as soon as a ring cannot hold
+    anything closer than what was already found, so a query only looks at the buckets near the answer. Among
+    positions at the same distance the one added first wins, like Position.get_closest_from_list
+
+    ...
+
+    Attributes
+    ----------
+    width : int
+        width of the board
+    height : int
+        height of the board
+    bucket_size : int
+        side length of the square buckets
+    """
+
+    def __init__(self, width, height, bucket_size=4) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.bucket_size: int = bucket_size
+        self.columns: int = -(-width // bucket_size)
+        self.rows: int = -(-height // bucket_size)
+        self.buckets: List[List[Tuple[int, Position, Any]]] = [[] for _ in range(self.columns * self.rows)]
+        self.size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, pos, kind=None) -> None:
+        """
+        Adds pos to the index, tagged with kind so queries can filter on it
+        """
+        bucket_x, bucket_y = self.__bucket_of(pos)
+        self.buckets[bucket_y * self.columns + bucket_x].append((self.size, pos, kind))
+        self.size += 1
+
+    def nearest(self, pos, kinds: Optional[Set[Any]] = None) -> Optional[Position]:
+        """
+        Returns the closest position to pos, only considering positions tagged with one of kinds if given
+        """
+        closest = self.k_nearest(pos, 1, kinds)
+        return closest[0] if closest else None
+
+    def k_nearest(self, pos, k, kinds: Optional[Set[Any]] = None) -> List[Position]:
+        """
+        Returns up to k positions closest to pos, closest first, only considering positions tagged with one of kinds if
+        given
+        """
+        if k <= 0 or self.size == 0:
+            return []
+        best: List[Tuple[int, int, Position]] = []
+        bucket_x, bucket_y = self.__bucket_of(pos)
+        last_ring = max(bucket_x, bucket_y, self.columns - 1 - bucket_x, self.rows - 1 - bucket_y)
+        for ring in range(last_ring + 1):
+            if len(best) == k and (ring - 1) * self.bucket_size + 1 > best[-1][0]:
+                break
+            for bucket in self.__ring(bucket_x, bucket_y, ring):
+                for order, item_pos, kind in bucket:
+                    if kinds is not None and kind not in kinds:
+                        continue
+                    distance = abs(item_pos.x - pos.x) + abs(item_pos.y - pos.y)
+                    if len(best) < k or (distance, order) < best[-1][:2]:
+                        insort(best, (distance, order, item_pos))
+                        if len(best) > k:
+                            best.pop()
+        return [item_pos for _, _, item_pos in best]
+
+    def __bucket_of(self, pos) -> Tuple[int, int]:
+        bucket_x = min(max(pos.x, 0), self.width - 1) // self.bucket_size
+        bucket_y = min(max(pos.y, 0), self.height - 1) // self.bucket_size
+        return bucket_x, bucket_y
+
+    def __ring(self, bucket_x, bucket_y, ring) -> Iterator[List[Tuple[int, Position, Any]]]:
+        if ring == 0:
+            yield self.buckets[bucket_y * self.columns + bucket_x]
+            return
+        for y in (bucket_y - ring, bucket_y + ring):
+            if 0 <= y < self.rows:
+                for x in range(max(bucket_x - ring, 0), min(bucket_x + ring, self.columns - 1) + 1):
+                    yield self.buckets[y * self.columns + x]
+        for x in (bucket_x - ring, bucket_x + ring):
+            if 0 <= x < self.columns:
+                for y in range(max(bucket_y - ring + 1, 0), min(bucket_y + ring - 1, self.rows - 1) + 1):
+                    yield self.buckets[y * self.columns + x]
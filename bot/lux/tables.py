@@ -0,0 +1,98 @@
+from typing import Dict, List, Tuple
+
+from .constants import Constants
+from .gamesetup.game_constants import GAME_CONSTANTS
+
+UNIT_TYPES = Constants.UNIT_TYPES
+TIME = Constants.TIME
+PARAMETERS = GAME_CONSTANTS["PARAMETERS"]
+MAX_DISTANCES = Constants.GAME_PARAMETERS.MAX_DISTANCES
+MAX_DAYS = PARAMETERS["MAX_DAYS"]
+
+# ---------------------------------- Tables by unit type ----------------------------------- #
+# indexed by Constants.UNIT_TYPES: WORKER (0), then CART (1)
+
+UNIT_TYPE_NAMES = ("WORKER", "CART")
+CARGO_CAPACITY: Tuple[int, ...] = tuple(PARAMETERS["RESOURCE_CAPACITY"][name] for name in UNIT_TYPE_NAMES)
+UNIT_COOLDOWN: Tuple[int, ...] = tuple(PARAMETERS["UNIT_ACTION_COOLDOWN"][name] for name in UNIT_TYPE_NAMES)
+UNIT_LIGHT_UPKEEP: Tuple[int, ...] = tuple(PARAMETERS["LIGHT_UPKEEP"][name] for name in UNIT_TYPE_NAMES)
+# fuel a unit must carry to last a whole night off the city tiles
+UNIT_NIGHT_FUEL: Tuple[int, ...] = tuple(upkeep * TIME.NIGHT_DURATION for upkeep in UNIT_LIGHT_UPKEEP)
+
+# ------------------------------------ Derived thresholds ---------------------------------- #
+
+COAL_RESEARCH: int = PARAMETERS["RESEARCH_REQUIREMENTS"]["COAL"]
+URANIUM_RESEARCH: int = PARAMETERS["RESEARCH_REQUIREMENTS"]["URANIUM"]
+CITY_BUILD_COST: int = PARAMETERS["CITY_BUILD_COST"]
+# turns of light upkeep a city keeps in fuel before it expands
+CITY_BACKUP_TURNS: int = TIME.NIGHT_DURATION * Constants.GAME_PARAMETERS.NUMBER_OF_NIGHTS_BACKUP
+
+# ------------------------------- Tables by resource code ---------------------------------- #
+# indexed by Constants.RESOURCE_CODES: NONE (0), WOOD, COAL, URANIUM
+
+RESOURCE_NAMES = (None, "WOOD", "COAL", "URANIUM")
+COLLECTION_RATE: Tuple[int, ...] = (0,) + tuple(PARAMETERS["WORKER_COLLECTION_RATE"][name]
+                                               for name in RESOURCE_NAMES[1:])
+WOOD_GROWTH_RATE: float = PARAMETERS["WOOD_GROWTH_RATE"]
+MAX_WOOD_AMOUNT: int = PARAMETERS["MAX_WOOD_AMOUNT"]
+
+# ----------------------------------- Tables by turn --------------------------------------- #
+# indexed by turn, 0 to MAX_DAYS
+
+TIME_OF_DAY: List[int] = [turn % TIME.CYCLE_DURATION for turn in range(MAX_DAYS + 1)]
+DAY_NUMBER: List[int] = [turn // TIME.CYCLE_DURATION for turn in range(MAX_DAYS + 1)]
+IS_MORNING: List[bool] = [time < TIME.MORNING_END for time in TIME_OF_DAY]
+IS_MIDDAY: List[bool] = [TIME.MORNING_END < time < TIME.MIDDAY_END for time in TIME_OF_DAY]
+IS_AFTERNOON: List[bool] = [TIME.MIDDAY_END < time < TIME.AFTERNOON_END for time in TIME_OF_DAY]
+# the agent's night, which leaves out the first turn of the engine's night
+IS_NIGHT: List[bool] = [TIME.AFTERNOON_END < time < TIME.NIGHT_END for time in TIME_OF_DAY]
+# the engine's night, from DAY_DURATION to the end of the cycle: cities and units burn their upkeep from its first
+# turn on
+ENGINE_NIGHT: List[bool] = [time >= TIME.DAY_DURATION for time in TIME_OF_DAY]
+# turns until the night of the current cycle falls, zero or less once it has
+TURNS_UNTIL_NIGHT: List[int] = [TIME.DAY_DURATION - time for time in TIME_OF_DAY]
+# engine night turns from this one to the end of the game, this one included
+NIGHTS_REMAINING: List[int] = [0] * (MAX_DAYS + 1)
+for _turn in reversed(range(MAX_DAYS)):
+    NIGHTS_REMAINING[_turn] = NIGHTS_REMAINING[_turn + 1] + ENGINE_NIGHT[_turn]
+# the engine night turns of the game in order, as a city burns its upkeep on them
+NIGHT_TURNS: List[int] = [turn for turn in range(MAX_DAYS) if ENGINE_NIGHT[turn]]
+
+
+class BoardTables:
+    """
+    Lookup tables of one board size. They only depend on the size, so for_size builds them once per size and every
+    match on that size shares them
+
+    ...
+
+    Attributes
+    ----------
+    width, height : int
+        the board size
+    max_distance : int
+        how far from a city a unit may be to head back to it (Constants.GAME_PARAMETERS.MAX_DISTANCES), a quarter of
+        the height for sizes the constants do not list
+    neighbours : List[Tuple[int, ...]]
+        flat indices y * width + x of the cells next to every cell on the board, in the order north, east, south, west
+    """
+
+    _sizes: Dict[Tuple[int, int], "BoardTables"] = {}
+
+    def __init__(self, width, height) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.max_distance: int = MAX_DISTANCES.get(height, height // 4)
+        self.neighbours: List[Tuple[int, ...]] = [self.__generate_neighbours(x, y) for y in range(height)
+                                                  for x in range(width)]
+
+    @classmethod
+    def for_size(cls, width, height) -> "BoardTables":
+        tables = cls._sizes.get((width, height))
+        if tables is None:
+            tables = cls._sizes[(width, height)] = cls(width, height)
+        return tables
+
+    def __generate_neighbours(self, x, y) -> Tuple[int, ...]:
+        cells = ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y))
+        return tuple(y * self.width + x for x, y in cells if 0 <= x < self.width and 0 <= y < self.height)
@@ -0,0 +1,75 @@
+import os
+from time import perf_counter
+from typing import Optional
+
+MIN_BUDGET = 0.05
+MIN_SCALE = 0.1
+
+
+class TurnBudget:
+    """
+    The time one turn may take before the remaining units fall back to cheap actions
+
+    The environment allows act_timeout seconds per turn and keeps a shared overage pool that pays for turns running
+    over, reporting what is left of it as observation["remainingOverageTime"]. A turn is budgeted the act timeout minus
+    a safety margin plus an even share of the pool over the turns left. When the pool shrank since the last turn, a
+    turn ran over (time spent outside the agent counts too), so the budget is halved and then grows back by 10% a turn
+
+    ...
+
+    Attributes
+    ----------
+    budget : float
+        seconds the current turn may take
+    start, deadline : float
+        perf_counter() values at which the current turn started and must stop
+    scale : float
+        share of the computed budget currently allowed, between MIN_SCALE and 1
+    """
+
+    def __init__(self, act_timeout: float = 3, safety_margin: float = 0.5, episode_steps: int = 361) -> None:
+        self.act_timeout: float = act_timeout
+        self.safety_margin: float = safety_margin
+        self.episode_steps: int = episode_steps
+        self.scale: float = 1
+        self.last_overage: Optional[float] = None
+        self.budget: float = act_timeout - safety_margin
+        self.start: float = perf_counter()
+        self.deadline: float = self.start + self.budget
+
+    @classmethod
+    def from_environment(cls, configuration=None, variable: str = "LUX_TURN_BUDGET") -> Optional["TurnBudget"]:
+        """
+        a budget when the environment variable is set to anything but "off", none when it is "off", and otherwise one
+        only when configuration carries the competition's actTimeout, as it does on Kaggle. Local matches then play
+        every unit in full whatever the load of the machine
+        """
+        value = os.environ.get(variable)
+        if value:
+            return None if value.lower() == "off" else cls()
+        if configuration is not None and configuration.get("actTimeout") is not None:
+            return cls()
+        return None
+
+    def start_turn(self, observation, configuration=None) -> None:
+        self.start = perf_counter()
+        if configuration is not None:
+            self.act_timeout = configuration.get("actTimeout", self.act_timeout)
+            self.episode_steps = configuration.get("episodeSteps", self.episode_steps)
+        overage = observation.get("remainingOverageTime")
+        share = 0
+        if overage is not None:
+            if self.last_overage is not None and overage < self.last_overage:
+                self.scale = max(self.scale / 2, MIN_SCALE)
+            else:
+                self.scale = min(self.scale * 1.1, 1)
+            self.last_overage = overage
+            share = overage / max(self.episode_steps - observation["step"], 1)
+        self.budget = max((self.act_timeout - self.safety_margin + share) * self.scale, MIN_BUDGET)
+        self.deadline = self.start + self.budget
+
+    def is_expired(self) -> bool:
+        return perf_counter() >= self.deadline
+
+    def get_remaining(self) -> float:
+        return max(self.deadline - perf_counter(), 0)
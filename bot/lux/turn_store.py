@@ -0,0 +1,160 @@
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b"LUXT"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIQ")  # magic, version, record size, capacity, records appended
+
+STATE_FIELDS: List[Tuple[str, str]] = [
+    ("turn", "i"),
+    ("team", "i"),
+    ("research_points", "i"),
+    ("units", "i"),
+    ("cities", "i"),
+    ("city_tiles", "i"),
+    ("fuel", "d"),
+    ("opponent_units", "i"),
+    ("opponent_city_tiles", "i"),
+    ("actions", "i"),
+]
+
+
+class TurnStore:
+    """
+    An append-only store of one fixed-size record per turn, kept in a memory-mapped ring buffer, backed by a file or
+    by anonymous memory
+
+    The buffer is a header followed by capacity slots of record_format. Appending writes one slot and bumps the record
+    count in the header, and reading a turn unpacks one slot, so neither depends on how many turns were stored. Once
+    the ring is full the oldest turns are overwritten
+
+    ...
+
+    Attributes
+    ----------
+    path : Optional[str]
+        the file backing the store, None when it lives in memory only
+    fields : List[str]
+        names of the record fields, in storage order. The first one must be the turn
+    record : struct.Struct
+        layout of one record
+    capacity : int
+        number of turns kept
+    count : int
+        number of records appended since the file was created
+    """
+
+    def __init__(self, path: Optional[str], fields: List[Tuple[str, str]] = STATE_FIELDS, capacity: int = 512) -> None:
+        self.path: Optional[str] = path
+        self.fields: List[str] = [name for name, _ in fields]
+        self.record: struct.Struct = struct.Struct("<" + "".join(code for _, code in fields))
+        self.capacity: int = capacity
+        self.count: int = 0
+        self.__file = None
+        self.__buffer: Optional[mmap.mmap] = None
+
+    @classmethod
+    def create(cls, path: str, fields: List[Tuple[str, str]] = STATE_FIELDS, capacity: int = 512) -> "TurnStore":
+        """
+        a new empty store at path, replacing any file there. The new file is moved into place rather than the old
+        one truncated, as another agent process writing the same path may still have the old one mapped. It is mapped
+        through its own descriptor before the move, so the store keeps writing to the file it made even when another
+        process moves a file of its own to the same path right after
+        """
+        store = cls(path, fields, capacity)
+        staging = f"{path}.{os.getpid()}.tmp"
+        store_file = open(staging, "w+b")
+        store_file.write(HEADER.pack(MAGIC, VERSION, store.record.size, capacity, 0))
+        store_file.truncate(HEADER.size + capacity * store.record.size)
+        store_file.flush()
+        store.__map(store_file)
+        os.replace(staging, path)
+        return store
+
+    @classmethod
+    def anonymous(cls, fields: List[Tuple[str, str]] = STATE_FIELDS, capacity: int = 512) -> "TurnStore":
+        """
+        a new empty store in anonymous memory, gone once it is closed
+        """
+        store = cls(None, fields, capacity)
+        store.__buffer = mmap.mmap(-1, HEADER.size + capacity * store.record.size)
+        HEADER.pack_into(store.__buffer, 0, MAGIC, VERSION, store.record.size, capacity, 0)
+        return store
+
+    @classmethod
+    def from_environment(cls, player: int, variable: str = "LUX_HISTORY", fields: List[Tuple[str, str]] = STATE_FIELDS,
+                         capacity: int = 512) -> "TurnStore":
+        """
+        a new store at the path named by the environment variable, or in anonymous memory when it is unset or empty,
+        so nothing is written to disk unless asked for. A {player} field in the path is replaced by the player id,
+        e.g. LUX_HISTORY=history_{player}.bin
+        """
+        path = os.environ.get(variable, "")
+        if path:
+            return cls.create(path.format(player=player), fields, capacity)
+        return cls.anonymous(fields, capacity)
+
+    @classmethod
+    def open(cls, path: str, fields: List[Tuple[str, str]] = STATE_FIELDS) -> "TurnStore":
+        """
+        the existing store at path, which must have been created with the same fields
+        """
+        with open(path, "rb") as store_file:
+            magic, version, record_size, capacity, count = HEADER.unpack(store_file.read(HEADER.size))
+        store = cls(path, fields, capacity)
+        if magic != MAGIC or version != VERSION or record_size != store.record.size:
+            raise ValueError(f"{path} is not a turn store with these fields")
+        store.count = count
+        store.__map(open(path, "r+b"))
+        return store
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, state: Dict[str, float]) -> None:
+        """
+        stores state, which holds a value for every field, in the next slot
+        """
+        offset = HEADER.size + (self.count % self.capacity) * self.record.size
+        self.record.pack_into(self.__buffer, offset, *(state[name] for name in self.fields))
+        self.count += 1
+        struct.pack_into("<Q", self.__buffer, HEADER.size - 8, self.count)
+
+    def read(self, turn: int) -> Optional[Dict[str, float]]:
+        """
+        the state stored for turn, or None if it was never stored or has been overwritten. Turns are stored one
+        record per turn in order, so the slot of a turn follows from the last record
+        """
+        if self.count == 0:
+            return None
+        last = self.read_last()
+        index = self.count - 1 - (last["turn"] - turn)
+        if index < 0 or index >= self.count or index < self.count - self.capacity:
+            return None
+        state = self.__read_slot(index % self.capacity)
+        return state if state["turn"] == turn else None
+
+    def read_last(self) -> Optional[Dict[str, float]]:
+        if self.count == 0:
+            return None
+        return self.__read_slot((self.count - 1) % self.capacity)
+
+    def close(self) -> None:
+        if self.__buffer is not None:
+            self.__buffer.close()
+            self.__buffer = None
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __read_slot(self, slot) -> Dict[str, float]:
+        values = self.record.unpack_from(self.__buffer, HEADER.size + slot * self.record.size)
+        return dict(zip(self.fields, values))
+
+    def __map(self, store_file) -> None:
+        self.__file = store_file
+        self.__buffer = mmap.mmap(store_file.fileno(), 0)
+        if os.fstat(store_file.fileno()).st_size < HEADER.size + self.capacity * self.record.size:
+            raise ValueError(f"{self.path} is shorter than its header says")
@@ -1,17 +1,23 @@
 import re
-from typing import Optional
 
 from .constants import Constants
 from .gamesetup.game_constants import GAME_CONSTANTS
 from .position import Position
-from .constants_helpers import rotate_90_degrees, random_direction
+from .constants_helpers import random_direction
+from .tables import CARGO_CAPACITY, CITY_BUILD_COST, UNIT_COOLDOWN, UNIT_NIGHT_FUEL
 
 UNIT_TYPES = Constants.UNIT_TYPES
 DIRECTIONS = Constants.DIRECTIONS
+PARAMETERS = GAME_CONSTANTS["PARAMETERS"]
+FUEL_RATES = PARAMETERS["RESOURCE_TO_FUEL_RATE"]
 
 
 class Unit:
+    __slots__ = ("pos", "team", "id", "type", "cooldown", "cargo")
+
     class Cargo:
+        __slots__ = ("wood", "coal", "uranium")
+
         def __init__(self):
             self.wood: int = 0
             self.coal: int = 0
@@ -31,6 +37,19 @@ class Unit:
         self.cargo.coal = coal
         self.cargo.uranium = uranium
 
+    def _update(self, x, y, cooldown, wood, coal, uranium) -> bool:
+        """
+        do not use this function, this is for internal tracking of state. Returns whether or not the unit moved
+        """
+        moved = self.pos.x != x or self.pos.y != y
+        if moved:
+            self.pos = Position(x, y)
+        self.cooldown = cooldown
+        self.cargo.wood = wood
+        self.cargo.coal = coal
+        self.cargo.uranium = uranium
+        return moved
+
     def is_worker(self) -> bool:
         return self.type == UNIT_TYPES.WORKER
 
@@ -41,11 +60,7 @@ class Unit:
         """
         get cargo space left in this unit
         """
-        spaceused = self.cargo.wood + self.cargo.coal + self.cargo.uranium
-        if self.type == UNIT_TYPES.WORKER:
-            return GAME_CONSTANTS["PARAMETERS"]["RESOURCE_CAPACITY"]["WORKER"] - spaceused
-        else:
-            return GAME_CONSTANTS["PARAMETERS"]["RESOURCE_CAPACITY"]["CART"] - spaceused
+        return CARGO_CAPACITY[self.type] - (self.cargo.wood + self.cargo.coal + self.cargo.uranium)
 
     def can_build(self, game_map) -> bool:
         """
@@ -54,7 +69,7 @@ class Unit:
         """
         cell = game_map.get_cell_by_pos(self.pos)
         if not cell.has_resource() and self.can_act() and (self.cargo.wood + self.cargo.coal + self.cargo.uranium) >= \
-                GAME_CONSTANTS["PARAMETERS"]["CITY_BUILD_COST"]:
+                CITY_BUILD_COST:
             return True
         return False
 
@@ -88,13 +103,53 @@ class Unit:
         """
         return "p {}".format(self.id)
 
+    def get_fuel(self) -> int:
+        """
+        fuel value of the cargo
+        """
+        return self.cargo.wood * FUEL_RATES["WOOD"] + self.cargo.coal * FUEL_RATES["COAL"] + \
+            self.cargo.uranium * FUEL_RATES["URANIUM"]
+
+    def is_at_risk_of_freezing(self, system) -> bool:
+        """
+        whether the unit is off the player's city tiles, may not walk back to one before night falls, and carries too
+        little fuel to last the night outside
+        """
+        distance = system.map.get_city_distance_field().distance_at(self.pos)
+        if distance == 0:
+            return False
+        if self.get_fuel() >= UNIT_NIGHT_FUEL[self.type]:
+            return False
+        return distance is None or system.clock.turns_until_night <= distance * UNIT_COOLDOWN[self.type]
+
+    def get_priority(self, system) -> int:
+        """
+        0 for units at risk of freezing at night, 1 for units with a full cargo, 2 for the rest
+        """
+        if self.is_at_risk_of_freezing(system):
+            return 0
+        return 1 if self.get_cargo_space_left() == 0 else 2
+
+    def activate_fallback_action(self, system) -> None:
+        """
+        A cheap stand-in for activate_actions once the turn's time budget has run out: one step along the distance
+        field to a city tile when the cargo is full or night is coming, towards resources otherwise. The fields are
+        computed during setup in anytime mode, so this costs a few lookups
+        """
+        if not self.can_act() or system.clock.is_night():
+            return
+        if self.get_cargo_space_left() == 0 or self.is_at_risk_of_freezing(system):
+            self.__move_along(system.map.get_city_distance_field(), system)
+        else:
+            self.__move_along(system.map.get_resource_distance_field(system), system)
+
     def activate_actions(self, system, player) -> None:
         if self.can_act():
             if system.clock.is_night():
                 return None
             if system.player.cities == 0 and self.can_build(system.map):
                 self.__build_city_here(system)
-            elif self.get_cargo_space_left() == 0 and player.has_cities_to_expand():
+            elif self.get_cargo_space_left() == 0 and player.has_cities_to_expand(system):
                 self.__try_to_build(system)
             elif self.get_cargo_space_left() > 0:
                 self.__collect_resources(system)
@@ -106,6 +161,10 @@ class Unit:
         system.map.add_future_no_go_positions(self.pos)
 
     def __try_to_build(self, system) -> None:
+        destination = system.path_finder.get_goal(self)
+        if destination is not None and system.map.is_free(destination):
+            # keep heading where the cached path leads while the cell is still free to build on
+            return self.try_to_build_at(destination, system)
         destination = system.map.get_optimal_position_to_expand(self.pos, system)
         if (destination is None) or system.map.city_is_too_far(destination, self.pos):
             destination = system.map.get_optimal_position_to_build_new_city(self.pos, system)
@@ -113,39 +172,22 @@ class Unit:
 
     def try_to_build_at(self, pos, system) -> None:
         if pos is None:
-            self.__safe_move(random_direction(), system)
+            system.planner.request_move(self, [random_direction()])
         elif pos.equals(self.pos):
             self.__build_city_here(system)
         else:
-            direction = self.__direction_without_collision(pos, system.map.is_city_tile)
-            self.__safe_move(direction, system)
+            # walking over a city tile would deposit the cargo meant for the new one
+            direction = system.path_finder.get_next_direction(self, pos, avoid_city_tiles=True)
+            system.planner.request_move_towards(self, pos, avoid_city_tiles=True, preferred=direction)
 
-    def __move_towards_closest(self, get_closest_tile_function, system):
-        closest_tile = get_closest_tile_function(self.pos, system)
-        direction = self.__direction_without_collision(closest_tile, system.map.is_collision_tile)
-        self.__safe_move(direction, system)
+    def __move_along(self, distance_field, system):
+        system.planner.request_move_along(self, distance_field)
 
     def __collect_resources(self, system) -> None:
-        self.__move_towards_closest(system.map.get_closest_resource_position, system)
+        self.__move_along(system.map.get_resource_distance_field(system), system)
 
     def __deposit_resources_in_city(self, system) -> None:
-        self.__move_towards_closest(system.map.get_closest_city_tile, system)
-
-    def __direction_without_collision(self, destination, collision_function) -> Optional[DIRECTIONS]:
-        if destination is not None:
-            move_direction = self.pos.direction_to(destination)
-            c = 0
-            new_position = self.pos.translate(move_direction, 1)
-            while collision_function(new_position) and c < 5:
-                move_direction = rotate_90_degrees(move_direction)
-                new_position = self.pos.translate(move_direction, 1)
-                c += 1
-            return move_direction
-        return None
-
-    def __safe_move(self, direction, system) -> None:
-        system.add_action(self.move(direction))
-        system.map.add_future_no_go_positions(self.pos.translate(direction, 1))
+        self.__move_along(system.map.get_city_distance_field(), system)
 
     def get_id_value(self):
         number_string = re.findall(r'\d+', self.id)
@@ -167,7 +209,7 @@ class Unit:
     def activate_builder_actions(self, system, player):
         if self.get_cargo_space_left() > 0:
             self.__collect_resources(system)
-        elif player.has_cities_to_expand():
+        elif player.has_cities_to_expand(system):
             self.__try_to_build(system)
         else:
             self.activate_maintainer_actions(system)
@@ -1,44 +1,25 @@
-from typing import Dict
+import sys
+
+from lux.protocol import LineReader, run_agent
+from lux.replay import ReplayRecorder
 from ooagent import agent
 
 if __name__ == "__main__":
+    recorder = None
 
-    def read_input():
+    def record(step, updates, actions):
         """
-        Reads input from stdin
+        Records every turn to the replay named by LUX_REPLAY, when it is set, once the actions are out
         """
-        try:
-            return input()
-        except EOFError as eof:
-            raise SystemExit(eof)
-
-
-    step = 0
-
-
-    class Observation(Dict[str, any]):
-        def __init__(self, player=0) -> None:
-            self.player = player
-            # self.updates = []
-            # self.step = 0
-
-
-    observation = Observation()
-    observation["updates"] = []
-    observation["step"] = 0
-    player_id = 0
-    while True:
-        inputs = read_input()
-        observation["updates"].append(inputs)
-
+        global recorder
         if step == 0:
-            player_id = int(observation["updates"][0])
-            observation.player = player_id
-        if inputs == "D_DONE":
-            actions = agent(observation, None)
-            observation["updates"] = []
-            step += 1
-            observation["step"] = step
+            recorder = ReplayRecorder.from_environment(int(updates[0]))
+        if recorder is not None:
+            recorder.record(step, updates, actions)
+
 
-            print(",".join(actions))
-            print("D_FINISH")
+    try:
+        run_agent(agent, LineReader(sys.stdin.fileno()), sys.stdout.buffer, record)
+    finally:
+        if recorder is not None:
+            recorder.close()
@@ -1,30 +1,45 @@
-import json
 import random
-from typing import List, Optional, Dict
+from typing import TYPE_CHECKING, List, Optional, Dict
 
 from lux.clock import Clock
-from lux.gamesetup.game import GameMap
 from lux.player import Player
+from lux.agent_log import AgentLog
 from lux.constants import Constants
-from lux.gamesetup.game import Game
+from lux.profiler import TurnProfiler
+from lux.time_budget import TurnBudget
+from lux.turn_store import TurnStore
+
+if TYPE_CHECKING:
+    # backed by numpy: GameSystem imports them when the first observation comes in, so importing the agent stays cheap
+    from lux.fuel_forecast import FuelForecast
+    from lux.gamesetup.game import Game
+    from lux.game_map import GameMap
+    from lux.move_planner import MovePlanner
+    from lux.pathfinder import PathFinder
 
 DIRECTIONS = Constants.DIRECTIONS
-game_state = None
-
-logfile = "agent.log"
-open(logfile, "w")
+system = None
+profiler = TurnProfiler.from_environment()
+# off unless LUX_OOAGENT_LOG names a file, its own variable so it never shares a path with the agent.py log
+log = AgentLog.from_environment("", path_variable="LUX_OOAGENT_LOG")
 
 
 class GameSystem:
     """
     A class to control the game progression
 
+    One GameSystem plays the whole match: setup starts the game on turn 0 and updates it in place every turn after,
+    so the game state and everything derived from it live as long as the match. begin_turn is the reset point of the
+    state that only holds for one turn; anything else set on the system, the map or memory is still there next turn
+
     ...
 
     Attributes
     ----------
     actions : List[str]
-        instructions to feed to the next round
+        instructions to feed to the next round, reset every turn
+    game : Game
+        the game state, updated in place from turn to turn
     player : Player
         the current player
     opponent : Player
@@ -33,6 +48,27 @@ class GameSystem:
         the map of the game
     step : int
         the turn of the game (0 - 360)
+    profiler : TurnProfiler
+        times the phases of the turn: setup (parse and calculate_metrics), city actions, unit actions and each unit
+    log : AgentLog
+        buffered log of the agent, written after the turn
+    budget : Optional[TurnBudget]
+        when set, the turn runs in anytime mode: units act in priority order until the budget runs out and the rest
+        take a cheap fallback action. Set on Kaggle or through LUX_TURN_BUDGET (see TurnBudget.from_environment)
+    planner : Optional["MovePlanner"]
+        settles the moves the units ask for this turn together, made anew every turn
+    path_finder : Optional["PathFinder"]
+        paths of the units towards where they build, kept across turns
+    fuel_forecast : Optional["FuelForecast"]
+        the fuel of the player's cities projected over the nights left, made anew every turn
+    turn_store : Optional[TurnStore]
+        the state of every turn of the game so far, one fixed-size record per turn, kept in memory unless
+        LUX_HISTORY names a file
+    history : Dict[str, any]
+        the state stored for the last turn under "last_turn", None on the first turn
+    memory : Dict[str, any]
+        derived data kept for the rest of the match, for the lux modules to memoize across turns, such as the city
+        tile sets GameMap.calculate_metrics only rebuilds when city tiles change. Emptied when a new game starts
 
     Methods
     -------
@@ -40,58 +76,129 @@ class GameSystem:
         initiates the game state for the new turn
     run() -> List[str]:
         activates city and unit actions and returns a record of them
-    rotate_90_degrees(direction: DIRECTIONS) -> DIRECTIONS: @staticmethod
-        returns a random cardinal directions 90 degrees from the input direction
     """
 
-    HISTORY: str = "lux/history.json"
-
-    def __init__(self) -> None:
+    def __init__(self, turn_profiler: Optional[TurnProfiler] = None, turn_budget: Optional[TurnBudget] = None,
+                 turn_log: Optional[AgentLog] = None) -> None:
+        self.profiler: TurnProfiler = turn_profiler or profiler
+        self.log: AgentLog = turn_log or log
+        self.budget: Optional[TurnBudget] = turn_budget
         self.actions: List[str] = []
+        self.game: Optional["Game"] = None
         self.player: Optional[Player] = None
         self.opponent: Optional[Player] = None
-        self.map: Optional[GameMap] = None
+        self.map: Optional["GameMap"] = None
         self.step: int = 0
         self.clock: Optional[Clock] = None
+        self.planner: Optional["MovePlanner"] = None
+        self.path_finder: Optional["PathFinder"] = None
+        self.fuel_forecast: Optional["FuelForecast"] = None
+        self.turn_store: Optional[TurnStore] = None
         self.history: Dict[str, any] = {}
+        self.memory: Dict[str, any] = {}
 
     def setup(self, observation) -> None:
-        global game_state
-        if observation["step"] == 0:
-            game_state = Game()
-            game_state._initialize(observation["updates"])
-            game_state._update(observation["updates"][2:])
-            game_state.id = observation.player
+        from lux.fuel_forecast import FuelForecast
+        from lux.move_planner import MovePlanner
+
+        with self.profiler.span("setup"):
+            with self.profiler.span("parse"):
+                if observation["step"] == 0 or self.game is None:
+                    self.start_game(observation)
+                elif "parsed" in observation:
+                    self.game._update_parsed(observation["parsed"])
+                else:
+                    self.game._update(observation["updates"])
+            self.player = self.game.players[observation.player]
+            self.opponent = self.game.players[(observation.player + 1) % 2]
+            self.map = self.game.map
+            self.begin_turn(observation["step"])
+            with self.profiler.span("calculate_metrics"):
+                self.map.calculate_metrics(self)
+                if self.budget is not None:
+                    # the fields every fallback action walks along
+                    self.map.get_resource_distance_field(self)
+                    self.map.get_city_distance_field()
+            with self.profiler.span("forecast_fuel"):
+                self.fuel_forecast = FuelForecast(self.player, self.map, self.step)
+            self.planner = MovePlanner(self.map, self.player, self.opponent)
+            self.path_finder.update(self.map, self.game.changes, self.player.team)
+        self.read_history()
+
+    def start_game(self, observation) -> None:
+        """
+        Builds the game from the first turn's observation and starts over everything kept across turns
+        """
+        from lux.gamesetup.game import Game
+        from lux.pathfinder import PathFinder
+
+        self.game = Game(incremental=True)
+        self.game._initialize(observation["updates"])
+        if "parsed" in observation:
+            self.game._update_parsed(observation["parsed"])
         else:
-            game_state._update(observation["updates"])
-        self.player = game_state.players[observation.player]
-        self.opponent = game_state.players[(observation.player + 1) % 2]
-        self.map = game_state.map
-        self.step = observation["step"]
-        self.clock = Clock(self.step)
-        self.map.calculate_metrics(self)
-        # self.read_history()
+            self.game._update(observation["updates"][2:])
+        self.game.id = observation.player
+        self.path_finder = PathFinder(self.game.map.width, self.game.map.height)
+        if self.turn_store is not None:
+            self.turn_store.close()
+        self.turn_store = TurnStore.from_environment(observation.player)
+        self.memory = {}
+
+    def begin_turn(self, step) -> None:
+        """
+        The per-turn reset point: forgets the actions, the tiles claimed by this turn's moves and the distance fields
+        of the last turn
+        """
+        self.step = step
+        self.clock = Clock(step)
+        self.actions = []
+        self.map.reset_turn()
 
     def run(self) -> List[str]:
-        self.player.activate_city_actions(self)
-        self.player.activate_unit_actions(self)
-        # self.write_history()
+        with self.profiler.span("activate_city_actions"):
+            self.player.activate_city_actions(self)
+        with self.profiler.span("activate_unit_actions"):
+            self.player.activate_unit_actions(self)
+        self.write_history()
         return self.actions
 
     def add_action(self, action: str) -> None:
         if action is not None:
             self.actions.append(action)
 
-    def read_history(self):
-        with open(self.HISTORY, "r") as json_file:
-            last_turn = json.load(json_file)
-        self.history = {"last_turn": last_turn}
+    def read_history(self) -> None:
+        self.history = {"last_turn": self.turn_store.read(self.step - 1)}
+
+    def write_history(self) -> None:
+        self.turn_store.append(self.get_state())
+
+    def get_state(self) -> Dict[str, any]:
+        """
+        what the turn store keeps of this turn, one value per field of lux.turn_store.STATE_FIELDS
+        """
+        return dict(turn=self.step, team=self.player.team, research_points=self.player.research_points,
+                    units=len(self.player.units), cities=len(self.player.cities),
+                    city_tiles=self.player.city_tile_count,
+                    fuel=sum(city.fuel for city in self.player.cities.values()),
+                    opponent_units=len(self.opponent.units),
+                    opponent_city_tiles=self.opponent.city_tile_count,
+                    actions=len(self.actions))
 
-    def write_history(self):
-        with open(self.HISTORY, "w") as json_file:
-            json.dump(self.history, json_file)
 
 def agent(observation, configuration):
-    system = GameSystem()
-    system.setup(observation)
-    return system.run()
+    global system
+    if system is None:
+        system = GameSystem(turn_budget=TurnBudget.from_environment(configuration))
+    if system.budget is not None:
+        system.budget.start_turn(observation, configuration)
+    profiler.begin_turn(observation["step"])
+    log.begin_turn(observation["step"])
+    with profiler.span("turn", {"step": observation["step"]}):
+        system.setup(observation)
+        actions = system.run()
+    profiler.end_turn()
+    log.info("%d units, %d city tiles, %d actions", len(system.player.units), system.player.city_tile_count,
+             len(actions))
+    log.end_turn()
+    return actions
@@ -3,7 +3,7 @@ from .lux.cell import Cell
 from .lux.constants import Constants
 from .lux.gamesetup import annotate
 import math
-import numpy as np
+import random
 
 
 ### Define helper function
@@ -53,7 +53,7 @@ game_state = None
 
 
 def get_random_step():
-    return np.random.choice(['s', 'n', 'w', 'e'])
+    return random.choice(['s', 'n', 'w', 'e'])
 
 
 def agent(observation, configuration):
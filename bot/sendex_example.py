@@ -3,13 +3,11 @@ import math
 from .lux.gamesetup.game import Game
 from .lux.cell import Cell
 from .lux.constants import Constants
-import numpy as np
+from .lux.agent_log import AgentLog, DEBUG
 from collections import deque
 import random
 
-logfile = "agent.log"
-
-open(logfile, "w")
+log = AgentLog.from_environment()
 
 DIRECTIONS = Constants.DIRECTIONS
 game_state = None
@@ -22,6 +20,10 @@ worker_positions = {}
 statsfile = "agent.txt"
 
 
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
 def get_resource_tiles(game_state, width, height):
     resource_tiles: list[Cell] = []
     for y in range(height):
@@ -71,16 +73,13 @@ def find_empty_tile_near(near_what, game_state, observation):
             # logging.INFO(f"{observation['step']}: Checking:{possible_empty_tile.pos}")
             if possible_empty_tile.resource == None and possible_empty_tile.road == 0 and possible_empty_tile.citytile == None:
                 build_location = possible_empty_tile
-                with open(logfile, "a") as f:
-                    f.write(f"{observation['step']}: Found build location:{build_location.pos}\n")
+                log.info("Found build location: %s", build_location.pos)
 
                 return build_location
         except Exception as e:
-            with open(logfile, "a") as f:
-                f.write(f"{observation['step']}: While searching for empty tiles:{str(e)}\n")
+            log.warning("While searching for empty tiles: %s", str(e))
 
-    with open(logfile, "a") as f:
-        f.write(f"{observation['step']}: Couldn't find a tile next to, checking diagonals instead...\n")
+    log.info("Couldn't find a tile next to, checking diagonals instead...")
 
     dirs = [(1, -1), (-1, 1), (-1, -1), (1, 1)]
     # may later need to try: dirs = [(1,-1), (-1,1), (-1,-1), (1,1)] too.
@@ -90,19 +89,16 @@ def find_empty_tile_near(near_what, game_state, observation):
             # logging.INFO(f"{observation['step']}: Checking:{possible_empty_tile.pos}")
             if possible_empty_tile.resource == None and possible_empty_tile.road == 0 and possible_empty_tile.citytile == None:
                 build_location = possible_empty_tile
-                with open(logfile, "a") as f:
-                    f.write(f"{observation['step']}: Found build location:{build_location.pos}\n")
+                log.info("Found build location: %s", build_location.pos)
 
                 return build_location
         except Exception as e:
-            with open(logfile, "a") as f:
-                f.write(f"{observation['step']}: While searching for empty tiles:{str(e)}\n")
+            log.warning("While searching for empty tiles: %s", str(e))
 
     # PROBABLY should continue our search out with something like dirs = [(2,0), (0,2), (-2,0), (0,-2)]...
     # and so on
 
-    with open(logfile, "a") as f:
-        f.write(f"{observation['step']}: Something likely went wrong, couldn't find any empty tile\n")
+    log.warning("Something likely went wrong, couldn't find any empty tile")
     return None
 
 
@@ -114,6 +110,7 @@ def agent(observation, configuration):
     global worker_positions
 
     ### Do not edit ###
+    log.begin_turn(observation["step"])
     if observation["step"] == 0:
         game_state = Game()
         game_state._initialize(observation["updates"])
@@ -140,18 +137,16 @@ def agent(observation, configuration):
             worker_positions[w.id].append((w.pos.x, w.pos.y))
 
         if w.id not in unit_to_city_dict:
-            with open(logfile, "a") as f:
-                f.write(f"{observation['step']} Found worker unaccounted for {w.id}\n")
+            log.debug("Found worker unaccounted for %s", w.id)
             city_assignment = get_close_city(player, w)
             unit_to_city_dict[w.id] = city_assignment
 
-    with open(logfile, "a") as f:
-        f.write(f"{observation['step']} Worker Positions {worker_positions}\n")
+    if log.enabled_for(DEBUG):
+        log.debug("Worker Positions %s", str(worker_positions))
 
     for w in workers:
         if w.id not in unit_to_resource_dict:
-            with open(logfile, "a") as f:
-                f.write(f"{observation['step']} Found worker w/o resource {w.id}\n")
+            log.debug("Found worker w/o resource %s", w.id)
 
             resource_assignment = get_close_resource(w, resource_tiles, player)
             unit_to_resource_dict[w.id] = resource_assignment
@@ -180,8 +175,7 @@ def agent(observation, configuration):
                 if len(last_positions) >= 2:
                     hm_positions = set(last_positions)
                     if len(list(hm_positions)) == 1:
-                        with open(logfile, "a") as f:
-                            f.write(f"{observation['step']} Looks like a stuck worker {unit.id} - {last_positions}\n")
+                        log.debug("Looks like a stuck worker %s - %s", unit.id, list(last_positions))
 
                         actions.append(unit.move(random.choice(["n", "s", "e", "w"])))
                         continue
@@ -215,13 +209,11 @@ def agent(observation, configuration):
                         except:
                             continue
 
-                        with open(logfile, "a") as f:
-                            f.write(
-                                f"{observation['step']} Build city stuff: {associated_city_id}, fuel {unit_city_fuel}, size {unit_city_size}, enough fuel {enough_fuel}\n")
+                        log.debug("Build city stuff: %s, fuel %s, size %s, enough fuel %s", associated_city_id,
+                                  unit_city_fuel, unit_city_size, enough_fuel)
 
                         if enough_fuel:
-                            with open(logfile, "a") as f:
-                                f.write(f"{observation['step']} We want to build a city!\n")
+                            log.debug("We want to build a city!")
                             if build_location is None:
                                 empty_near = get_close_city(player, unit)
                                 build_location = find_empty_tile_near(empty_near, game_state, observation)
@@ -232,13 +224,11 @@ def agent(observation, configuration):
 
                                 build_city = False
                                 build_location = None
-                                with open(logfile, "a") as f:
-                                    f.write(f"{observation['step']} Built the city!\n")
+                                log.info("Built the city!")
                                 continue
 
                             else:
-                                with open(logfile, "a") as f:
-                                    f.write(f"{observation['step']}: Navigating to where we wish to build!\n")
+                                log.debug("Navigating to where we wish to build!")
 
                                 # actions.append(unit.move(unit.pos.direction_to(build_location.pos)))
                                 dir_diff = (build_location.pos.x - unit.pos.x, build_location.pos.y - unit.pos.y)
@@ -252,32 +242,32 @@ def agent(observation, configuration):
 
                                 if abs(ydiff) > abs(xdiff):
                                     # if the move is greater in the y axis, then lets consider moving once in that dir
-                                    check_tile = game_state.map.get_cell(unit.pos.x, unit.pos.y + np.sign(ydiff))
+                                    check_tile = game_state.map.get_cell(unit.pos.x, unit.pos.y + sign(ydiff))
                                     if check_tile.citytile == None:
-                                        if np.sign(ydiff) == 1:
+                                        if sign(ydiff) == 1:
                                             actions.append(unit.move("s"))
                                         else:
                                             actions.append(unit.move("n"))
 
                                     else:
                                         # there's a city tile, so we want to move in the other direction that we overall want to move
-                                        if np.sign(xdiff) == 1:
+                                        if sign(xdiff) == 1:
                                             actions.append(unit.move("e"))
                                         else:
                                             actions.append(unit.move("w"))
 
                                 else:
                                     # if the move is greater in the y axis, then lets consider moving once in that dir
-                                    check_tile = game_state.map.get_cell(unit.pos.x + np.sign(xdiff), unit.pos.y)
+                                    check_tile = game_state.map.get_cell(unit.pos.x + sign(xdiff), unit.pos.y)
                                     if check_tile.citytile == None:
-                                        if np.sign(xdiff) == 1:
+                                        if sign(xdiff) == 1:
                                             actions.append(unit.move("e"))
                                         else:
                                             actions.append(unit.move("w"))
 
                                     else:
                                         # there's a city tile, so we want to move in the other direction that we overall want to move
-                                        if np.sign(ydiff) == 1:
+                                        if sign(ydiff) == 1:
                                             actions.append(unit.move("s"))
                                         else:
                                             actions.append(unit.move("n"))
@@ -308,8 +298,7 @@ def agent(observation, configuration):
                             move_dir = unit.pos.direction_to(unit_to_city_dict[unit.id].pos)
                             actions.append(unit.move(move_dir))
             except Exception as e:
-                with open(logfile, "a") as f:
-                    f.write(f"{observation['step']}: Unit error {str(e)} \n")
+                log.error("Unit error %s", str(e))
 
     can_create = len(city_tiles) - len(workers)
 
@@ -319,15 +308,14 @@ def agent(observation, configuration):
                 if can_create > 0:
                     actions.append(city_tile.build_worker())
                     can_create -= 1
-                    with open(logfile, "a") as f:
-                        f.write(f"{observation['step']}: Created and worker \n")
+                    log.debug("Created and worker")
                 else:
                     actions.append(city_tile.research())
-                    with open(logfile, "a") as f:
-                        f.write(f"{observation['step']}: Doing research! \n")
+                    log.debug("Doing research!")
 
     if observation["step"] == 359:
         with open(statsfile, "a") as f:
             f.write(f"{len(city_tiles)}\n")
 
+    log.end_turn()
     return actions
@@ -0,0 +1,31 @@
+"""
+Plays one match between two agent files on the local simulator
+
+Run from the bot directory with: python -m simulator ooagent.py risk_averse_baseline.py --size 16 --seed 3
+Add --games N to play N matches on seeds seed .. seed + N - 1 at once on the batched environment
+"""
+import argparse
+import json
+
+from .batch import run_batch
+from .match import load_agent, run_match
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("agents", nargs=2, help="python files defining agent(observation, configuration)")
+    arg_parser.add_argument("--size", type=int, default=12, choices=[12, 16, 24, 32])
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--games", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    if args.games > 1:
+        results = run_batch(args.agents, args.size, range(args.seed, args.seed + args.games))
+        print(json.dumps([result.to_dict() for result in results], indent=2))
+    else:
+        result = run_match([load_agent(path) for path in args.agents], args.size, args.seed)
+        print(json.dumps(result.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,672 @@
+import random
+import time
+import traceback
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lux.constants import Constants
+from lux.gamesetup.game import Game
+from lux.gamesetup.parser import ParsedUpdates
+
+from .engine import (COLLECTION_OFFSETS, CYCLE_LENGTH, FUEL_RATES, MAX_TURNS, MOVES, PARAMETERS, RESOURCE_NAMES,
+                     RESOURCE_ORDER, UNIT_ACTION_ORDER, format_number)
+from .mapgen import generate_map
+from .match import MatchResult, Observation, load_agent
+
+RESOURCE_CODES = Constants.RESOURCE_CODES
+UNIT_TYPES = Constants.UNIT_TYPES
+DIRECTIONS = Constants.DIRECTIONS
+
+NEIGHBOUR_OFFSETS = [offset for offset in MOVES.values() if offset != (0, 0)]
+CAPACITIES = np.array([PARAMETERS["RESOURCE_CAPACITY"]["WORKER"], PARAMETERS["RESOURCE_CAPACITY"]["CART"]])
+BASE_COOLDOWNS = np.array([PARAMETERS["UNIT_ACTION_COOLDOWN"]["WORKER"], PARAMETERS["UNIT_ACTION_COOLDOWN"]["CART"]])
+UNIT_UPKEEPS = np.array([PARAMETERS["LIGHT_UPKEEP"]["WORKER"], PARAMETERS["LIGHT_UPKEEP"]["CART"]], dtype=np.float64)
+
+UNIT_ARRAYS = ("unit_alive", "unit_team", "unit_type", "unit_x", "unit_y", "unit_cooldown", "unit_cargo")
+CITY_ARRAYS = ("city_alive", "city_team", "city_fuel")
+
+
+class BatchEnv:
+    """
+    Plays N games of the same board size at once. Every game lives in one slice of stacked NumPy arrays, so each
+    per-turn phase of LuxEngine (moves, collection, deposits, roads, wood regrowth, night upkeep and cooldowns) runs
+    once for the whole batch. Only the actions themselves, which arrive as strings, and the rare structural events they
+    cause (spawning a unit, building or merging a city, a transfer) are handled one at a time.
+
+    Given the same seed and the same actions, game n follows exactly the turns a LuxEngine would play.
+
+    Units and cities are stored at slot number - 1 of their game, so u_7 of game n is unit slot 6 and slots keep
+    creation order. Dead units and cities keep their slot with the alive flag cleared.
+
+    ...
+
+    Attributes
+    ----------
+    size : int
+        board size shared by every game
+    seeds : List[int]
+        seed each game was last reset with
+    turn : np.ndarray
+        (N,) turns played so far in each game
+    resource_type, resource_amount, road : np.ndarray
+        (N, size, size) board state indexed [n, y, x], resource types as Constants.RESOURCE_CODES
+    tile_team, tile_city, tile_cooldown, tile_sequence : np.ndarray
+        (N, size, size) city tiles: owning team and city slot (-1 without a tile), cooldown and build order
+    unit_alive, unit_team, unit_type, unit_x, unit_y, unit_cooldown : np.ndarray
+        (N, unit capacity) unit state by slot
+    unit_cargo : np.ndarray
+        (N, unit capacity, 3) wood, coal and uranium carried by each unit
+    city_alive, city_team, city_fuel : np.ndarray
+        (N, city capacity) city state by slot
+    research_points : np.ndarray
+        (N, 2) research points of each team
+
+    Methods
+    -------
+    reset(n: int, seed: int) -> None:
+        starts game n over on the map generated from seed
+    step(actions: List[Optional[List[List[str]]]]) -> None:
+        plays one turn in every game that is not over and has actions (None skips a game)
+    is_done() -> np.ndarray:
+        (N,) whether each game is over
+    get_parsed_updates(n: int) -> ParsedUpdates:
+        the current state of game n as the typed arrays Game._update_parsed consumes
+    get_updates(n: int) -> List[str]:
+        the update lines of game n, identical to LuxEngine.get_updates
+    get_observation(n: int, team: int) -> Observation:
+        the observation an agent of that team receives for game n this turn
+    get_game(n: int, team: int) -> Game:
+        a Game kept up to date with game n from the arrays directly, without going through update lines
+    """
+
+    def __init__(self, size: int = 12, seeds: Sequence[int] = (0,)) -> None:
+        games = len(seeds)
+        shape = (games, size, size)
+        self.size: int = size
+        self.seeds: List[int] = list(seeds)
+        self.turn: np.ndarray = np.zeros(games, dtype=np.int32)
+        self.resource_type: np.ndarray = np.zeros(shape, dtype=np.int8)
+        self.resource_amount: np.ndarray = np.zeros(shape, dtype=np.int32)
+        self.road: np.ndarray = np.zeros(shape, dtype=np.float64)
+        self.tile_team: np.ndarray = np.full(shape, -1, dtype=np.int8)
+        self.tile_city: np.ndarray = np.full(shape, -1, dtype=np.int32)
+        self.tile_cooldown: np.ndarray = np.zeros(shape, dtype=np.float64)
+        self.tile_sequence: np.ndarray = np.zeros(shape, dtype=np.int32)
+        self.research_points: np.ndarray = np.zeros((games, 2), dtype=np.int32)
+
+        self.unit_alive: np.ndarray = np.zeros((games, 0), dtype=bool)
+        self.unit_team: np.ndarray = np.zeros((games, 0), dtype=np.int8)
+        self.unit_type: np.ndarray = np.zeros((games, 0), dtype=np.int8)
+        self.unit_x: np.ndarray = np.zeros((games, 0), dtype=np.int32)
+        self.unit_y: np.ndarray = np.zeros((games, 0), dtype=np.int32)
+        self.unit_cooldown: np.ndarray = np.zeros((games, 0), dtype=np.float64)
+        self.unit_cargo: np.ndarray = np.zeros((games, 0, 3), dtype=np.int32)
+        self.city_alive: np.ndarray = np.zeros((games, 0), dtype=bool)
+        self.city_team: np.ndarray = np.zeros((games, 0), dtype=np.int8)
+        self.city_fuel: np.ndarray = np.zeros((games, 0), dtype=np.float64)
+
+        self.unit_count: np.ndarray = np.zeros(games, dtype=np.int32)
+        self.city_count: np.ndarray = np.zeros(games, dtype=np.int32)
+        self.city_tile_count: np.ndarray = np.zeros(games, dtype=np.int32)
+        self.views: Dict[Tuple[int, int], Game] = {}
+        self.__reserve(UNIT_ARRAYS, 64)
+        self.__reserve(CITY_ARRAYS, 16)
+        for n, seed in enumerate(seeds):
+            self.reset(n, seed)
+
+    # ----------------------------------- Public functions ------------------------------------- #
+
+    def __len__(self) -> int:
+        return len(self.seeds)
+
+    def reset(self, n: int, seed: int) -> None:
+        resource_type, resource_amount, starts = generate_map(self.size, random.Random(seed))
+        self.seeds[n] = seed
+        self.turn[n] = 0
+        self.resource_type[n] = resource_type
+        self.resource_amount[n] = resource_amount
+        self.road[n] = 0
+        self.tile_team[n] = -1
+        self.tile_city[n] = -1
+        self.tile_cooldown[n] = 0
+        self.tile_sequence[n] = 0
+        self.research_points[n] = 0
+        self.unit_alive[n] = False
+        self.city_alive[n] = False
+        self.unit_count[n] = 0
+        self.city_count[n] = 0
+        self.city_tile_count[n] = 0
+        self.views.pop((n, 0), None)
+        self.views.pop((n, 1), None)
+        for team, (x, y) in enumerate(starts):
+            self.__build_city_tile(n, team, x, y)
+            self.__spawn_unit(n, team, UNIT_TYPES.WORKER, x, y)
+
+    def count_city_tiles(self) -> np.ndarray:
+        """
+        (N, 2) city tiles of each team in each game
+        """
+        return np.stack([np.count_nonzero(self.tile_team == team, axis=(1, 2)) for team in (0, 1)], axis=1)
+
+    def count_units(self) -> np.ndarray:
+        """
+        (N, 2) units of each team in each game
+        """
+        return np.stack([np.count_nonzero(self.unit_alive & (self.unit_team == team), axis=1) for team in (0, 1)],
+                        axis=1)
+
+    def is_done(self) -> np.ndarray:
+        eliminated = (self.count_city_tiles() == 0) & (self.count_units() == 0)
+        return (self.turn >= MAX_TURNS) | eliminated.any(axis=1)
+
+    def get_winner(self, n: int) -> Optional[int]:
+        """
+        The team of game n with more city tiles, then more units, or None on a draw
+        """
+        tiles, units = self.count_city_tiles()[n], self.count_units()[n]
+        scores = [(tiles[team], units[team]) for team in (0, 1)]
+        if scores[0] == scores[1]:
+            return None
+        return 0 if scores[0] > scores[1] else 1
+
+    def step(self, actions: List[Optional[List[List[str]]]]) -> None:
+        """
+        Plays one turn in every game that is not over. actions[n] holds the actions of each team in game n, or None
+        to leave game n where it is
+        """
+        active = ~self.is_done() & np.array([game_actions is not None for game_actions in actions])
+        self.__handle_moves(*self.__handle_actions(actions, active))
+
+        self.__collect_resources(active)
+        self.__deposit_resources(active)
+        self.__develop_roads(active)
+        self.__regrow_wood(active)
+        self.__consume_night_upkeep(active & (self.turn % CYCLE_LENGTH >= PARAMETERS["DAY_LENGTH"]))
+        self.__cool_down(active)
+        self.turn[active] += 1
+
+    def get_parsed_updates(self, n: int) -> ParsedUpdates:
+        parsed = ParsedUpdates()
+        parsed.research_points = self.research_points[n].copy()
+
+        ys, xs = np.nonzero(self.resource_type[n] != RESOURCE_CODES.NONE)
+        parsed.resource_type = self.resource_type[n, ys, xs]
+        parsed.resource_x, parsed.resource_y = xs.astype(np.int32), ys.astype(np.int32)
+        parsed.resource_amount = self.resource_amount[n, ys, xs]
+
+        slots = np.flatnonzero(self.unit_alive[n])
+        parsed.unit_type = self.unit_type[n, slots]
+        parsed.unit_team = self.unit_team[n, slots]
+        parsed.unit_ids = [f"u_{slot + 1}" for slot in slots.tolist()]
+        parsed.unit_x, parsed.unit_y = self.unit_x[n, slots], self.unit_y[n, slots]
+        parsed.unit_cooldown = self.unit_cooldown[n, slots]
+        parsed.unit_wood, parsed.unit_coal, parsed.unit_uranium = self.unit_cargo[n, slots].T
+
+        slots = np.flatnonzero(self.city_alive[n])
+        parsed.city_team = self.city_team[n, slots]
+        parsed.city_ids = [f"c_{slot + 1}" for slot in slots.tolist()]
+        parsed.city_fuel = self.city_fuel[n, slots]
+        parsed.city_light_upkeep = self.__get_light_upkeep(np.array([n]))[0, slots]
+
+        ys, xs = np.nonzero(self.tile_city[n] >= 0)
+        order = np.lexsort((self.tile_sequence[n, ys, xs], self.tile_city[n, ys, xs]))
+        ys, xs = ys[order], xs[order]
+        parsed.citytile_team = self.tile_team[n, ys, xs]
+        parsed.citytile_city_ids = [f"c_{slot + 1}" for slot in self.tile_city[n, ys, xs].tolist()]
+        parsed.citytile_x, parsed.citytile_y = xs.astype(np.int32), ys.astype(np.int32)
+        parsed.citytile_cooldown = self.tile_cooldown[n, ys, xs]
+
+        ys, xs = np.nonzero(self.road[n] > 0)
+        parsed.road_x, parsed.road_y = xs.astype(np.int32), ys.astype(np.int32)
+        parsed.road = self.road[n, ys, xs]
+        return parsed
+
+    def get_updates(self, n: int) -> List[str]:
+        parsed = self.get_parsed_updates(n)
+        updates = [f"rp {team} {points}" for team, points in enumerate(parsed.research_points.tolist())]
+        for r_type, x, y, amount in zip(parsed.resource_type.tolist(), parsed.resource_x.tolist(),
+                                        parsed.resource_y.tolist(), parsed.resource_amount.tolist()):
+            updates.append(f"r {RESOURCE_CODES.TYPES[r_type]} {x} {y} {amount}")
+        for u_type, team, unitid, x, y, cooldown, wood, coal, uranium in zip(
+                parsed.unit_type.tolist(), parsed.unit_team.tolist(), parsed.unit_ids, parsed.unit_x.tolist(),
+                parsed.unit_y.tolist(), parsed.unit_cooldown.tolist(), parsed.unit_wood.tolist(),
+                parsed.unit_coal.tolist(), parsed.unit_uranium.tolist()):
+            updates.append(f"u {u_type} {team} {unitid} {x} {y} {format_number(cooldown)} {wood} {coal} {uranium}")
+        tiles: Dict[str, List[Tuple[int, int, float]]] = {}
+        for cityid, x, y, cooldown in zip(parsed.citytile_city_ids, parsed.citytile_x.tolist(),
+                                          parsed.citytile_y.tolist(), parsed.citytile_cooldown.tolist()):
+            tiles.setdefault(cityid, []).append((x, y, cooldown))
+        for team, cityid, fuel, upkeep in zip(parsed.city_team.tolist(), parsed.city_ids, parsed.city_fuel.tolist(),
+                                              parsed.city_light_upkeep.tolist()):
+            updates.append(f"c {team} {cityid} {format_number(fuel)} {format_number(upkeep)}")
+            for x, y, cooldown in tiles[cityid]:
+                updates.append(f"ct {team} {cityid} {x} {y} {format_number(cooldown)}")
+        for x, y, road in zip(parsed.road_x.tolist(), parsed.road_y.tolist(), parsed.road.tolist()):
+            updates.append(f"ccd {x} {y} {format_number(road)}")
+        updates.append(Constants.INPUT_CONSTANTS.DONE)
+        return updates
+
+    def get_initial_messages(self, n: int, team: int) -> List[str]:
+        return [str(team), f"{self.size} {self.size}"] + self.get_updates(n)
+
+    def get_observation(self, n: int, team: int) -> Observation:
+        observation = Observation(team)
+        observation["step"] = int(self.turn[n])
+        observation["updates"] = self.get_initial_messages(n, team) if self.turn[n] == 0 else self.get_updates(n)
+        observation["remainingOverageTime"] = 60
+        return observation
+
+    def get_game(self, n: int, team: int) -> Game:
+        """
+        The Game seen by team in game n, updated incrementally from the arrays of this environment. The same object is
+        returned every turn until game n is reset
+        """
+        game = self.views.get((n, team))
+        if game is None:
+            game = self.views[(n, team)] = Game(incremental=True)
+            game._initialize([str(team), f"{self.size} {self.size}"])
+        if game.turn < self.turn[n]:
+            game._update_parsed(self.get_parsed_updates(n))
+            game.turn = int(self.turn[n])
+        return game
+
+    # ---------------------------------- Private functions ------------------------------------- #
+
+    def __reserve(self, names: Tuple[str, ...], capacity: int) -> None:
+        """
+        grows the per-slot arrays named in names to hold at least capacity slots per game
+        """
+        current = getattr(self, names[0]).shape[1]
+        if capacity <= current:
+            return
+        capacity = max(capacity, 2 * current)
+        for name in names:
+            array = getattr(self, name)
+            grown = np.zeros((array.shape[0], capacity) + array.shape[2:], dtype=array.dtype)
+            grown[:, :current] = array
+            setattr(self, name, grown)
+
+    def __spawn_unit(self, n, team, u_type, x, y) -> None:
+        slot = int(self.unit_count[n])
+        self.unit_count[n] += 1
+        self.__reserve(UNIT_ARRAYS, slot + 1)
+        self.unit_alive[n, slot] = True
+        self.unit_team[n, slot] = team
+        self.unit_type[n, slot] = u_type
+        self.unit_x[n, slot], self.unit_y[n, slot] = x, y
+        self.unit_cooldown[n, slot] = 0
+        self.unit_cargo[n, slot] = 0
+
+    def __build_city_tile(self, n, team, x, y) -> None:
+        adjacent = []
+        for dx, dy in NEIGHBOUR_OFFSETS:
+            if self.__is_on_board(x + dx, y + dy) and self.tile_team[n, y + dy, x + dx] == team:
+                slot = int(self.tile_city[n, y + dy, x + dx])
+                if slot not in adjacent:
+                    adjacent.append(slot)
+        if adjacent:
+            slot = adjacent[0]
+            for merged in adjacent[1:]:
+                self.city_fuel[n, slot] += self.city_fuel[n, merged]
+                self.city_alive[n, merged] = False
+                self.tile_city[n][self.tile_city[n] == merged] = slot
+        else:
+            slot = int(self.city_count[n])
+            self.city_count[n] += 1
+            self.__reserve(CITY_ARRAYS, slot + 1)
+            self.city_alive[n, slot] = True
+            self.city_team[n, slot] = team
+            self.city_fuel[n, slot] = 0
+        self.city_tile_count[n] += 1
+        self.tile_team[n, y, x] = team
+        self.tile_city[n, y, x] = slot
+        self.tile_cooldown[n, y, x] = 0
+        self.tile_sequence[n, y, x] = self.city_tile_count[n]
+        self.road[n, y, x] = PARAMETERS["MAX_ROAD"]
+
+    def __is_on_board(self, x, y) -> bool:
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def __get_unit_slot(self, n, unitid) -> Optional[int]:
+        slot = self.__parse_unit_slot(unitid)
+        if slot is None or slot >= self.unit_count[n] or not self.unit_alive[n, slot]:
+            return None
+        return slot
+
+    @staticmethod
+    def __parse_unit_slot(unitid) -> Optional[int]:
+        """
+        the slot a unit id refers to, or None when it is not the id of any unit. Ids are only ever written as u_
+        followed by the number without leading zeros
+        """
+        number = unitid[2:]
+        if not unitid.startswith("u_") or not number.isdigit() or number[0] == "0" or len(number) > 9:
+            return None
+        return int(number) - 1
+
+    @staticmethod
+    def __first_valid(keys, valid) -> np.ndarray:
+        """
+        indices of the valid records, keeping only the first valid record for each key, in record order
+        """
+        candidates = np.flatnonzero(valid)
+        _, first = np.unique(keys[candidates], return_index=True)
+        return np.sort(candidates[first])
+
+    def __get_light_upkeep(self, games) -> np.ndarray:
+        """
+        (len(games), city capacity) light upkeep of every city slot of the given games: each tile costs the city upkeep
+        minus the adjacency bonus for every neighbouring tile of the same city
+        """
+        tile_city = self.tile_city[games]
+        padded = np.full((len(games), self.size + 2, self.size + 2), -1, dtype=np.int32)
+        padded[:, 1:-1, 1:-1] = tile_city
+        neighbours = np.zeros(tile_city.shape, dtype=np.int32)
+        for dx, dy in NEIGHBOUR_OFFSETS:
+            neighbours += padded[:, 1 + dy:self.size + 1 + dy, 1 + dx:self.size + 1 + dx] == tile_city
+        indices, ys, xs = np.nonzero(tile_city >= 0)
+        upkeep = PARAMETERS["LIGHT_UPKEEP"]["CITY"] - PARAMETERS["CITY_ADJACENCY_BONUS"] * neighbours[indices, ys, xs]
+        capacity = self.city_alive.shape[1]
+        return np.bincount(indices * capacity + tile_city[indices, ys, xs], weights=upkeep,
+                           minlength=len(games) * capacity).reshape(len(games), capacity)
+
+    def __handle_actions(self, actions, active) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Validates the actions of every active game like LuxEngine.step, then applies the city tile actions and the
+        unit actions. The strings are decoded one by one, but checked against the state of every game at once.
+        Returns the accepted moves as games, slots, dxs and dys
+        """
+        city_records, unit_records = [], []
+        for n in np.flatnonzero(active).tolist():
+            for team, team_actions in enumerate(actions[n]):
+                for action in team_actions:
+                    self.__decode_action(n, team, action.split(" "), city_records, unit_records)
+        # units are checked before city tiles act, so units spawned this turn cannot act yet
+        unit_records = [unit_records[i] for i in self.__accept_unit_actions(unit_records).tolist()]
+        self.__handle_city_actions(city_records)
+
+        moves = [(n, slot) + MOVES[strs[2]] for n, _, slot, strs in unit_records if strs[0] == "m"]
+        others = sorted((record for record in unit_records if record[3][0] != "m"),
+                        key=lambda record: (record[0], UNIT_ACTION_ORDER.index(record[3][0])))
+        for n, team, slot, strs in others:
+            self.__handle_unit_action(n, team, slot, strs)
+        return tuple(np.array(moves, dtype=np.int64).reshape(-1, 4).T)
+
+    def __decode_action(self, n, team, strs, city_records, unit_records) -> None:
+        """
+        appends the action to city_records as (game, team, x, y, kind) or to unit_records as (game, team, slot, strs),
+        unless it is malformed
+        """
+        try:
+            if strs[0] in ("r", "bw", "bc"):
+                x, y = int(strs[1]), int(strs[2])
+                if self.__is_on_board(x, y):
+                    city_records.append((n, team, x, y, strs[0]))
+            elif strs[0] in ("m", "bcity", "p", "t"):
+                slot = self.__parse_unit_slot(strs[1])
+                if slot is None:
+                    return
+                if strs[0] == "m":
+                    if strs[2] not in MOVES or strs[2] == DIRECTIONS.CENTER:
+                        return
+                elif strs[0] == "t" and int(strs[4]) <= 0:
+                    return
+                unit_records.append((n, team, slot, strs))
+        except (IndexError, ValueError):
+            return
+
+    def __accept_unit_actions(self, records) -> np.ndarray:
+        """
+        indices of the unit records that act: the unit is alive, belongs to the team, has no cooldown and has not acted
+        earlier this turn
+        """
+        if not records:
+            return np.zeros(0, dtype=np.intp)
+        games, teams, slots = (np.array(column) for column in list(zip(*records))[:3])
+        known = slots < self.unit_count[games]
+        slots = np.where(known, slots, 0)
+        valid = known & self.unit_alive[games, slots] & (self.unit_team[games, slots] == teams) & \
+            (self.unit_cooldown[games, slots] < 1)
+        return self.__first_valid(games * self.unit_alive.shape[1] + slots, valid)
+
+    def __handle_city_actions(self, records) -> None:
+        if not records:
+            return
+        games, teams, xs, ys = (np.array(column) for column in list(zip(*records))[:4])
+        kinds = [record[4] for record in records]
+        valid = (self.tile_team[games, ys, xs] == teams) & (self.tile_cooldown[games, ys, xs] < 1)
+        accepted = self.__first_valid((games * self.size + ys) * self.size + xs, valid).tolist()
+
+        research = np.array([i for i in accepted if kinds[i] == "r"], dtype=np.intp)
+        np.add.at(self.research_points, (games[research], teams[research]), 1)
+        self.tile_cooldown[games[research], ys[research], xs[research]] = PARAMETERS["CITY_ACTION_COOLDOWN"]
+
+        units, tiles = self.count_units(), self.count_city_tiles()
+        for n, team, x, y, kind in (records[i] for i in accepted if kinds[i] != "r"):
+            if units[n, team] >= tiles[n, team]:
+                continue
+            units[n, team] += 1
+            self.__spawn_unit(n, team, UNIT_TYPES.WORKER if kind == "bw" else UNIT_TYPES.CART, x, y)
+            self.tile_cooldown[n, y, x] = PARAMETERS["CITY_ACTION_COOLDOWN"]
+
+    def __handle_unit_action(self, n, team, slot, strs) -> None:
+        x, y = int(self.unit_x[n, slot]), int(self.unit_y[n, slot])
+        is_worker = self.unit_type[n, slot] == UNIT_TYPES.WORKER
+        cargo = self.unit_cargo[n, slot]
+        if strs[0] == "bcity":
+            if not is_worker or cargo.sum() < PARAMETERS["CITY_BUILD_COST"] or \
+                    self.resource_type[n, y, x] != RESOURCE_CODES.NONE or self.tile_team[n, y, x] >= 0:
+                return
+            cost = PARAMETERS["CITY_BUILD_COST"]
+            for index in range(3):
+                spent = min(int(cargo[index]), cost)
+                cargo[index] -= spent
+                cost -= spent
+            self.__build_city_tile(n, team, x, y)
+        elif strs[0] == "p":
+            if not is_worker or self.tile_team[n, y, x] >= 0:
+                return
+            self.road[n, y, x] = max(self.road[n, y, x] - PARAMETERS["PILLAGE_RATE"], PARAMETERS["MIN_ROAD"])
+        elif strs[0] == "t":
+            destination = self.__get_unit_slot(n, strs[2])
+            resource = RESOURCE_CODES.BY_TYPE.get(strs[3])
+            if destination is None or self.unit_team[n, destination] != team or resource is None or \
+                    abs(int(self.unit_x[n, destination]) - x) + abs(int(self.unit_y[n, destination]) - y) != 1:
+                return
+            index = resource - 1
+            space = CAPACITIES[self.unit_type[n, destination]] - self.unit_cargo[n, destination].sum()
+            amount = min(int(strs[4]), int(cargo[index]), int(space))
+            if amount <= 0:
+                return
+            cargo[index] -= amount
+            self.unit_cargo[n, destination, index] += amount
+        self.unit_cooldown[n, slot] += BASE_COOLDOWNS[self.unit_type[n, slot]]
+
+    def __handle_moves(self, games, slots, dxs, dys) -> None:
+        """
+        Moves units in every game at once, cancelling every move that would leave two units on one cell outside a
+        city tile or swap two units outside city tiles, until no conflict is left. Cells are numbered across the
+        whole batch so one bincount finds the crowded cells of every game
+        """
+        if not len(games):
+            return
+        area = self.size * self.size
+        cells = len(self) * area
+        xs, ys = self.unit_x[games, slots] + dxs, self.unit_y[games, slots] + dys
+        on_board = (xs >= 0) & (xs < self.size) & (ys >= 0) & (ys < self.size)
+        games, slots, xs, ys = games[on_board], slots[on_board], xs[on_board], ys[on_board]
+        team_at = self.tile_team[games, ys, xs]
+        allowed = (team_at < 0) | (team_at == self.unit_team[games, slots])
+        games, slots, xs, ys = games[allowed], slots[allowed], xs[allowed], ys[allowed]
+
+        is_city = (self.tile_team >= 0).reshape(-1)
+        alive_games, alive_slots = np.nonzero(self.unit_alive)
+        occupied = alive_games * area + self.unit_y[alive_games, alive_slots] * self.size + \
+            self.unit_x[alive_games, alive_slots]
+        index = np.zeros(self.unit_alive.shape, dtype=np.intp)
+        index[alive_games, alive_slots] = np.arange(len(alive_games))
+        moving = index[games, slots]
+        starts = occupied[moving]
+        targets = games * area + ys * self.size + xs
+        while True:
+            final = occupied.copy()
+            final[moving] = targets
+            crowded = (np.bincount(final, minlength=cells)[targets] > 1) & ~is_city[targets]
+            pairs = np.sort(starts * cells + targets)
+            reversed_pairs = targets * cells + starts
+            found = pairs[np.minimum(np.searchsorted(pairs, reversed_pairs), len(pairs) - 1)]
+            swapped = (found == reversed_pairs) & ~(is_city[targets] & is_city[starts])
+            kept = ~(crowded | swapped)
+            if kept.all():
+                break
+            games, slots, moving, starts, targets = (games[kept], slots[kept], moving[kept], starts[kept],
+                                                     targets[kept])
+        self.unit_x[games, slots] = targets % self.size
+        self.unit_y[games, slots] = targets % area // self.size
+        self.unit_cooldown[games, slots] += BASE_COOLDOWNS[self.unit_type[games, slots]]
+
+    def __collect_resources(self, active) -> None:
+        """
+        Runs the collection passes of LuxEngine for every worker of the batch at once. The cell each worker reaches at
+        each offset is looked up once, so passes where no worker touches the resource cost almost nothing
+        """
+        games, slots = np.nonzero(self.unit_alive & (self.unit_type == UNIT_TYPES.WORKER) & active[:, None])
+        if not len(games):
+            return
+        cells = len(self) * self.size * self.size
+        resource_type = self.resource_type.reshape(-1)
+        resource_amount = self.resource_amount.reshape(-1)
+        keys = np.zeros((len(games), len(COLLECTION_OFFSETS)), dtype=np.int64)
+        types = np.zeros(keys.shape, dtype=np.int8)
+        for offset, (dx, dy) in enumerate(COLLECTION_OFFSETS):
+            xs, ys = self.unit_x[games, slots] + dx, self.unit_y[games, slots] + dy
+            on_board = (xs >= 0) & (xs < self.size) & (ys >= 0) & (ys < self.size)
+            keys[on_board, offset] = (games[on_board] * self.size + ys[on_board]) * self.size + xs[on_board]
+            types[on_board, offset] = resource_type[keys[on_board, offset]]
+
+        teams = self.unit_team[games, slots]
+        for code in RESOURCE_ORDER:
+            name = RESOURCE_NAMES[code]
+            researched = self.research_points[games, teams] >= PARAMETERS["RESEARCH_REQUIREMENTS"].get(name, 0)
+            reachable = (types == code) & researched[:, None]
+            rate = PARAMETERS["WORKER_COLLECTION_RATE"][name]
+            for offset in np.flatnonzero(reachable.any(axis=0)).tolist():
+                candidates = np.flatnonzero(reachable[:, offset])
+                space = CAPACITIES[UNIT_TYPES.WORKER] - self.unit_cargo[games[candidates], slots[candidates]].sum(axis=1)
+                asking = (space > 0) & (resource_type[keys[candidates, offset]] == code)
+                candidates, space = candidates[asking], space[asking]
+                if not len(candidates):
+                    continue
+                cell_keys = keys[candidates, offset]
+                requests = np.minimum(rate, space)
+                available = resource_amount[cell_keys]
+                oversubscribed = np.bincount(cell_keys, weights=requests, minlength=cells)[cell_keys] > available
+                shares = available // np.bincount(cell_keys, minlength=cells)[cell_keys]
+                requests = np.where(oversubscribed, np.minimum(requests, shares), requests)
+                self.unit_cargo[games[candidates], slots[candidates], code - 1] += requests
+                np.subtract.at(resource_amount, cell_keys, requests)
+                depleted = cell_keys[resource_amount[cell_keys] <= 0]
+                resource_type[depleted] = RESOURCE_CODES.NONE
+                resource_amount[depleted] = 0
+
+    def __deposit_resources(self, active) -> None:
+        games, slots = np.nonzero(self.unit_alive & active[:, None])
+        xs, ys = self.unit_x[games, slots], self.unit_y[games, slots]
+        cargo = self.unit_cargo[games, slots]
+        depositing = (self.tile_team[games, ys, xs] == self.unit_team[games, slots]) & cargo.any(axis=1)
+        games, slots, xs, ys = games[depositing], slots[depositing], xs[depositing], ys[depositing]
+        np.add.at(self.city_fuel, (games, self.tile_city[games, ys, xs]), cargo[depositing] @ FUEL_RATES)
+        self.unit_cargo[games, slots] = 0
+
+    def __develop_roads(self, active) -> None:
+        games, slots = np.nonzero(self.unit_alive & (self.unit_type == UNIT_TYPES.CART) & active[:, None])
+        xs, ys = self.unit_x[games, slots], self.unit_y[games, slots]
+        off_city = self.tile_team[games, ys, xs] < 0
+        np.add.at(self.road, (games[off_city], ys[off_city], xs[off_city]), PARAMETERS["CART_ROAD_DEVELOPMENT_RATE"])
+        np.minimum(self.road, PARAMETERS["MAX_ROAD"], out=self.road)
+
+    def __regrow_wood(self, active) -> None:
+        growing = (self.resource_type == RESOURCE_CODES.WOOD) & \
+                  (self.resource_amount < PARAMETERS["MAX_WOOD_AMOUNT"]) & active[:, None, None]
+        self.resource_amount[growing] = np.minimum(np.ceil(self.resource_amount[growing] *
+                                                           PARAMETERS["WOOD_GROWTH_RATE"]),
+                                                   PARAMETERS["MAX_WOOD_AMOUNT"])
+
+    def __consume_night_upkeep(self, night) -> None:
+        if not night.any():
+            return
+        upkeep = np.zeros(self.city_fuel.shape, dtype=np.float64)
+        upkeep[night] = self.__get_light_upkeep(np.flatnonzero(night))
+        paying = self.city_alive & night[:, None]
+        dying = paying & (self.city_fuel < upkeep)
+        self.city_fuel[paying & ~dying] -= upkeep[paying & ~dying]
+        self.city_alive &= ~dying
+        games, ys, xs = np.nonzero(self.tile_city >= 0)
+        removed = dying[games, self.tile_city[games, ys, xs]]
+        games, ys, xs = games[removed], ys[removed], xs[removed]
+        self.tile_team[games, ys, xs] = -1
+        self.tile_city[games, ys, xs] = -1
+        self.tile_cooldown[games, ys, xs] = 0
+        self.road[games, ys, xs] = PARAMETERS["MIN_ROAD"]
+
+        games, slots = np.nonzero(self.unit_alive & night[:, None])
+        exposed = self.tile_team[games, self.unit_y[games, slots], self.unit_x[games, slots]] < 0
+        games, slots = games[exposed], slots[exposed]
+        cargo = self.unit_cargo[games, slots]
+        needed = UNIT_UPKEEPS[self.unit_type[games, slots]]
+        for index, rate in enumerate(FUEL_RATES):
+            used = np.where(needed > 0, np.minimum(cargo[:, index], np.ceil(needed / rate)), 0).astype(np.int32)
+            cargo[:, index] -= used
+            needed -= used * rate
+        self.unit_cargo[games, slots] = cargo
+        self.unit_alive[games[needed > 0], slots[needed > 0]] = False
+
+    def __cool_down(self, active) -> None:
+        games, slots = np.nonzero(self.unit_alive & active[:, None])
+        road = self.road[games, self.unit_y[games, slots], self.unit_x[games, slots]]
+        self.unit_cooldown[games, slots] = np.maximum(self.unit_cooldown[games, slots] - 1 - road, 0)
+        self.tile_cooldown[active] = np.maximum(self.tile_cooldown[active] - 1, 0)
+
+
+def run_batch(agent_paths: List[str], size: int = 12, seeds: Sequence[int] = (0,),
+              configuration: Optional[Dict] = None) -> List[MatchResult]:
+    """
+    Plays one match per seed between the agents in agent_paths (team 0 against team 1), all on one BatchEnv. Every
+    game gets its own copy of each agent module, so agents that keep global state do not share it across games. An
+    agent that raises loses its match
+    """
+    env = BatchEnv(size, seeds)
+    games = len(env)
+    agents = [[load_agent(path) for path in agent_paths] for _ in range(games)]
+    errors: List[List[Optional[str]]] = [[None, None] for _ in range(games)]
+    agent_time = [[0.0, 0.0] for _ in range(games)]
+    while True:
+        failed = np.array([any(game_errors) for game_errors in errors])
+        playing = ~env.is_done() & ~failed
+        if not playing.any():
+            break
+        actions: List[Optional[List[List[str]]]] = [None] * games
+        for n in np.flatnonzero(playing).tolist():
+            actions[n] = []
+            for team, agent in enumerate(agents[n]):
+                start = time.perf_counter()
+                try:
+                    actions[n].append(list(agent(env.get_observation(n, team), configuration)))
+                except Exception:
+                    errors[n][team] = traceback.format_exc()
+                    actions[n].append([])
+                agent_time[n][team] += time.perf_counter() - start
+            if any(errors[n]):
+                actions[n] = None
+        env.step(actions)
+
+    tiles, units = env.count_city_tiles(), env.count_units()
+    results = []
+    for n in range(games):
+        winner = env.get_winner(n)
+        if any(errors[n]):
+            winner = None if all(errors[n]) else errors[n].index(None)
+        results.append(MatchResult(winner, int(env.turn[n]), tiles[n].tolist(), units[n].tolist(), errors[n],
+                                   agent_time[n]))
+    return results
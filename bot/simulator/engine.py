@@ -0,0 +1,440 @@
+import math
+import random
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from lux.constants import Constants
+from lux.gamesetup.game_constants import GAME_CONSTANTS
+
+from .mapgen import generate_map
+
+PARAMETERS = GAME_CONSTANTS["PARAMETERS"]
+RESOURCE_CODES = Constants.RESOURCE_CODES
+UNIT_TYPES = Constants.UNIT_TYPES
+DIRECTIONS = Constants.DIRECTIONS
+
+UNIT_TYPE_NAMES = {UNIT_TYPES.WORKER: "WORKER", UNIT_TYPES.CART: "CART"}
+RESOURCE_NAMES = {RESOURCE_CODES.WOOD: "WOOD", RESOURCE_CODES.COAL: "COAL", RESOURCE_CODES.URANIUM: "URANIUM"}
+RESOURCE_ORDER = [RESOURCE_CODES.URANIUM, RESOURCE_CODES.COAL, RESOURCE_CODES.WOOD]
+UNIT_ACTION_ORDER = ["t", "bcity", "p"]
+COLLECTION_OFFSETS = [(0, 0), (0, -1), (1, 0), (0, 1), (-1, 0)]
+MOVES = {DIRECTIONS.NORTH: (0, -1), DIRECTIONS.EAST: (1, 0), DIRECTIONS.SOUTH: (0, 1), DIRECTIONS.WEST: (-1, 0),
+         DIRECTIONS.CENTER: (0, 0)}
+FUEL_RATES = [PARAMETERS["RESOURCE_TO_FUEL_RATE"][name] for name in ("WOOD", "COAL", "URANIUM")]
+CYCLE_LENGTH = PARAMETERS["DAY_LENGTH"] + PARAMETERS["NIGHT_LENGTH"]
+MAX_TURNS = PARAMETERS["MAX_DAYS"]
+
+
+def format_number(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class SimUnit:
+    __slots__ = ("id", "team", "type", "x", "y", "cooldown", "cargo")
+
+    def __init__(self, unitid, team, u_type, x, y) -> None:
+        self.id: str = unitid
+        self.team: int = team
+        self.type: int = u_type
+        self.x: int = x
+        self.y: int = y
+        self.cooldown: float = 0
+        self.cargo: List[int] = [0, 0, 0]
+
+    def is_worker(self) -> bool:
+        return self.type == UNIT_TYPES.WORKER
+
+    def get_capacity(self) -> int:
+        return PARAMETERS["RESOURCE_CAPACITY"][UNIT_TYPE_NAMES[self.type]]
+
+    def get_cargo_space_left(self) -> int:
+        return self.get_capacity() - sum(self.cargo)
+
+    def get_base_cooldown(self) -> int:
+        return PARAMETERS["UNIT_ACTION_COOLDOWN"][UNIT_TYPE_NAMES[self.type]]
+
+    def spend(self, amount) -> None:
+        """
+        removes amount resources from the cargo, wood first, then coal, then uranium
+        """
+        for index in range(3):
+            spent = min(self.cargo[index], amount)
+            self.cargo[index] -= spent
+            amount -= spent
+
+    def spend_fuel_to_survive(self, upkeep) -> bool:
+        for index, rate in enumerate(FUEL_RATES):
+            if upkeep <= 0:
+                break
+            used = min(self.cargo[index], math.ceil(upkeep / rate))
+            self.cargo[index] -= used
+            upkeep -= used * rate
+        return upkeep <= 0
+
+
+class SimCity:
+    __slots__ = ("id", "team", "fuel", "tiles")
+
+    def __init__(self, cityid, team) -> None:
+        self.id: str = cityid
+        self.team: int = team
+        self.fuel: float = 0
+        self.tiles: List[Tuple[int, int]] = []
+
+
+class SimCityTile:
+    __slots__ = ("team", "cityid", "cooldown", "sequence")
+
+    def __init__(self, team, cityid, sequence) -> None:
+        self.team: int = team
+        self.cityid: str = cityid
+        self.cooldown: float = 0
+        self.sequence: int = sequence
+
+
+class LuxEngine:
+    """
+    A headless implementation of the Lux AI 2021 rules, driven by the parameters in game_constants.json
+
+    Each turn applies city tile actions, then transfers, city builds and pillages, then moves, then resource
+    collection, deposits into city tiles, cart road development, wood regrowth, night upkeep for cities and for units
+    outside city tiles, and finally cooldowns: units lose 1 + the road level of their cell, city tiles lose 1.
+    Workers collect uranium, then coal, then wood, in five passes per resource (own cell, then north, east, south and
+    west); a cell asked for more than it holds splits what it has evenly between the workers of that pass
+
+    ...
+
+    Attributes
+    ----------
+    width, height : int
+        board size
+    turn : int
+        number of turns played so far
+    resource_type, resource_amount, road : np.ndarray
+        board state indexed [y, x], resource types as Constants.RESOURCE_CODES
+    units : Dict[str, SimUnit]
+        every unit alive, in creation order
+    cities : Dict[str, SimCity]
+        every city alive, in creation order
+    city_tiles : Dict[Tuple[int, int], SimCityTile]
+        every city tile by position
+    research_points : List[int]
+        research points of each team
+
+    Methods
+    -------
+    get_updates() -> List[str]:
+        the update lines describing the current state, as consumed by Game._update
+    get_initial_messages(team: int) -> List[str]:
+        the first observation a team receives, with the player id and map size header
+    step(actions: List[List[str]]) -> None:
+        plays one turn with the actions of each team
+    """
+
+    def __init__(self, size: int = 12, seed: int = 0) -> None:
+        self.width: int = size
+        self.height: int = size
+        self.turn: int = 0
+        self.rng: random.Random = random.Random(seed)
+        self.resource_type, self.resource_amount, starts = generate_map(size, self.rng)
+        self.road: np.ndarray = np.zeros((size, size), dtype=np.float64)
+        self.units: Dict[str, SimUnit] = {}
+        self.cities: Dict[str, SimCity] = {}
+        self.city_tiles: Dict[Tuple[int, int], SimCityTile] = {}
+        self.research_points: List[int] = [0, 0]
+        self.unit_count: int = 0
+        self.city_count: int = 0
+        self.city_tile_count: int = 0
+        for team, (x, y) in enumerate(starts):
+            self.__build_city_tile(team, x, y)
+            self.__spawn_unit(team, UNIT_TYPES.WORKER, x, y)
+
+    # ----------------------------------- Public functions ------------------------------------- #
+
+    def get_updates(self) -> List[str]:
+        updates = [f"rp {team} {points}" for team, points in enumerate(self.research_points)]
+        for y, x in np.argwhere(self.resource_type != RESOURCE_CODES.NONE).tolist():
+            updates.append(f"r {RESOURCE_CODES.TYPES[self.resource_type[y, x]]} {x} {y} "
+                           f"{self.resource_amount[y, x]}")
+        for unit in self.units.values():
+            updates.append(f"u {unit.type} {unit.team} {unit.id} {unit.x} {unit.y} {format_number(unit.cooldown)} "
+                           f"{unit.cargo[0]} {unit.cargo[1]} {unit.cargo[2]}")
+        for city in self.cities.values():
+            updates.append(f"c {city.team} {city.id} {format_number(city.fuel)} "
+                           f"{format_number(self.get_light_upkeep(city))}")
+            for x, y in city.tiles:
+                updates.append(f"ct {city.team} {city.id} {x} {y} "
+                               f"{format_number(self.city_tiles[(x, y)].cooldown)}")
+        for y, x in np.argwhere(self.road > 0).tolist():
+            updates.append(f"ccd {x} {y} {format_number(self.road[y, x])}")
+        updates.append(Constants.INPUT_CONSTANTS.DONE)
+        return updates
+
+    def get_initial_messages(self, team) -> List[str]:
+        return [str(team), f"{self.width} {self.height}"] + self.get_updates()
+
+    def is_night(self) -> bool:
+        return self.turn % CYCLE_LENGTH >= PARAMETERS["DAY_LENGTH"]
+
+    def is_done(self) -> bool:
+        if self.turn >= MAX_TURNS:
+            return True
+        return any(self.count_city_tiles(team) == 0 and self.count_units(team) == 0 for team in (0, 1))
+
+    def count_city_tiles(self, team) -> int:
+        return sum(1 for tile in self.city_tiles.values() if tile.team == team)
+
+    def count_units(self, team) -> int:
+        return sum(1 for unit in self.units.values() if unit.team == team)
+
+    def get_winner(self) -> Optional[int]:
+        """
+        The team with more city tiles, then more units, or None on a draw
+        """
+        scores = [(self.count_city_tiles(team), self.count_units(team)) for team in (0, 1)]
+        if scores[0] == scores[1]:
+            return None
+        return 0 if scores[0] > scores[1] else 1
+
+    def get_light_upkeep(self, city) -> float:
+        upkeep = 0
+        for x, y in city.tiles:
+            neighbours = sum(1 for dx, dy in MOVES.values() if (dx or dy) and
+                             self.__same_city(city.id, x + dx, y + dy))
+            upkeep += PARAMETERS["LIGHT_UPKEEP"]["CITY"] - PARAMETERS["CITY_ADJACENCY_BONUS"] * neighbours
+        return upkeep
+
+    def step(self, actions: List[List[str]]) -> None:
+        """
+        Plays one turn. Invalid actions are dropped, and each unit and city tile acts at most once
+        """
+        acted = set()
+        city_actions, unit_actions, moves = [], [], {}
+        for team, team_actions in enumerate(actions):
+            for action in team_actions:
+                self.__sort_action(team, action.split(" "), acted, city_actions, unit_actions, moves)
+
+        for team, strs in city_actions:
+            self.__handle_city_action(team, strs)
+        unit_actions.sort(key=lambda action: UNIT_ACTION_ORDER.index(action[1][0]))
+        for team, strs in unit_actions:
+            self.__handle_unit_action(team, strs)
+        self.__handle_moves(moves)
+
+        self.__collect_resources()
+        self.__deposit_resources()
+        self.__develop_roads()
+        self.__regrow_wood()
+        if self.is_night():
+            self.__consume_night_upkeep()
+        self.__cool_down()
+        self.turn += 1
+
+    # ---------------------------------- Private functions ------------------------------------- #
+
+    def __is_on_board(self, x, y) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def __same_city(self, cityid, x, y) -> bool:
+        tile = self.city_tiles.get((x, y))
+        return tile is not None and tile.cityid == cityid
+
+    def __spawn_unit(self, team, u_type, x, y) -> SimUnit:
+        self.unit_count += 1
+        unit = SimUnit(f"u_{self.unit_count}", team, u_type, x, y)
+        self.units[unit.id] = unit
+        return unit
+
+    def __build_city_tile(self, team, x, y) -> None:
+        adjacent = []
+        for dx, dy in MOVES.values():
+            tile = self.city_tiles.get((x + dx, y + dy))
+            if (dx or dy) and tile is not None and tile.team == team and tile.cityid not in adjacent:
+                adjacent.append(tile.cityid)
+        if adjacent:
+            city = self.cities[adjacent[0]]
+            for cityid in adjacent[1:]:
+                merged = self.cities.pop(cityid)
+                city.fuel += merged.fuel
+                for pos in merged.tiles:
+                    self.city_tiles[pos].cityid = city.id
+                    city.tiles.append(pos)
+            city.tiles.sort(key=lambda pos: self.city_tiles[pos].sequence)
+        else:
+            self.city_count += 1
+            city = SimCity(f"c_{self.city_count}", team)
+            self.cities[city.id] = city
+        city.tiles.append((x, y))
+        self.city_tile_count += 1
+        self.city_tiles[(x, y)] = SimCityTile(team, city.id, self.city_tile_count)
+        self.road[y, x] = PARAMETERS["MAX_ROAD"]
+
+    def __sort_action(self, team, strs, acted, city_actions, unit_actions, moves) -> None:
+        try:
+            if strs[0] in ("r", "bw", "bc"):
+                key = (int(strs[1]), int(strs[2]))
+                tile = self.city_tiles.get(key)
+                if tile is None or tile.team != team or tile.cooldown >= 1 or key in acted:
+                    return
+                acted.add(key)
+                city_actions.append((team, strs))
+            elif strs[0] in ("m", "bcity", "p", "t"):
+                unit = self.units.get(strs[1])
+                if unit is None or unit.team != team or unit.cooldown >= 1 or unit.id in acted:
+                    return
+                if strs[0] == "m":
+                    if strs[2] not in MOVES or strs[2] == DIRECTIONS.CENTER:
+                        return
+                    moves[unit.id] = strs[2]
+                elif strs[0] == "t" and int(strs[4]) <= 0:
+                    return
+                else:
+                    unit_actions.append((team, strs))
+                acted.add(unit.id)
+        except (IndexError, ValueError):
+            return
+
+    def __handle_city_action(self, team, strs) -> None:
+        x, y = int(strs[1]), int(strs[2])
+        tile = self.city_tiles[(x, y)]
+        if strs[0] == "r":
+            self.research_points[team] += 1
+        else:
+            if self.count_units(team) >= self.count_city_tiles(team):
+                return
+            self.__spawn_unit(team, UNIT_TYPES.WORKER if strs[0] == "bw" else UNIT_TYPES.CART, x, y)
+        tile.cooldown = PARAMETERS["CITY_ACTION_COOLDOWN"]
+
+    def __handle_unit_action(self, team, strs) -> None:
+        unit = self.units[strs[1]]
+        if strs[0] == "bcity":
+            if not unit.is_worker() or sum(unit.cargo) < PARAMETERS["CITY_BUILD_COST"] or \
+                    self.resource_type[unit.y, unit.x] != RESOURCE_CODES.NONE or (unit.x, unit.y) in self.city_tiles:
+                return
+            unit.spend(PARAMETERS["CITY_BUILD_COST"])
+            self.__build_city_tile(team, unit.x, unit.y)
+        elif strs[0] == "p":
+            if not unit.is_worker() or (unit.x, unit.y) in self.city_tiles:
+                return
+            self.road[unit.y, unit.x] = max(self.road[unit.y, unit.x] - PARAMETERS["PILLAGE_RATE"],
+                                            PARAMETERS["MIN_ROAD"])
+        elif strs[0] == "t":
+            destination = self.units.get(strs[2])
+            resource = RESOURCE_CODES.BY_TYPE.get(strs[3])
+            if destination is None or destination.team != team or resource is None or \
+                    abs(destination.x - unit.x) + abs(destination.y - unit.y) != 1:
+                return
+            index = resource - 1
+            amount = min(int(strs[4]), unit.cargo[index], destination.get_cargo_space_left())
+            if amount <= 0:
+                return
+            unit.cargo[index] -= amount
+            destination.cargo[index] += amount
+        unit.cooldown += unit.get_base_cooldown()
+
+    def __handle_moves(self, moves: Dict[str, str]) -> None:
+        """
+        Moves units, cancelling every move that would leave two units on one cell outside a city tile or swap two
+        units outside city tiles, until no conflict is left
+        """
+        targets = {}
+        for unitid, direction in moves.items():
+            unit = self.units[unitid]
+            dx, dy = MOVES[direction]
+            x, y = unit.x + dx, unit.y + dy
+            tile = self.city_tiles.get((x, y))
+            if self.__is_on_board(x, y) and (tile is None or tile.team == unit.team):
+                targets[unitid] = (x, y)
+        starts: Dict[Tuple[int, int], List[str]] = {}
+        for unit in self.units.values():
+            starts.setdefault((unit.x, unit.y), []).append(unit.id)
+        while True:
+            occupants: Dict[Tuple[int, int], List[str]] = {}
+            for unit in self.units.values():
+                occupants.setdefault(targets.get(unit.id, (unit.x, unit.y)), []).append(unit.id)
+            reverted = set()
+            for pos, unitids in occupants.items():
+                if len(unitids) > 1 and pos not in self.city_tiles:
+                    reverted.update(unitid for unitid in unitids if unitid in targets)
+            for unitid, pos in targets.items():
+                start = (self.units[unitid].x, self.units[unitid].y)
+                if pos in self.city_tiles and start in self.city_tiles:
+                    continue
+                if any(targets.get(other) == start for other in starts.get(pos, [])):
+                    reverted.add(unitid)
+            if not reverted:
+                break
+            for unitid in reverted:
+                del targets[unitid]
+        for unitid, (x, y) in targets.items():
+            unit = self.units[unitid]
+            unit.x, unit.y = x, y
+            unit.cooldown += unit.get_base_cooldown()
+
+    def __collect_resources(self) -> None:
+        workers = [unit for unit in self.units.values() if unit.is_worker()]
+        for code in RESOURCE_ORDER:
+            name = RESOURCE_NAMES[code]
+            requirement = PARAMETERS["RESEARCH_REQUIREMENTS"].get(name, 0)
+            rate = PARAMETERS["WORKER_COLLECTION_RATE"][name]
+            for dx, dy in COLLECTION_OFFSETS:
+                requests: Dict[Tuple[int, int], List[Tuple[SimUnit, int]]] = {}
+                for unit in workers:
+                    x, y = unit.x + dx, unit.y + dy
+                    if self.__is_on_board(x, y) and self.resource_type[y, x] == code and \
+                            self.research_points[unit.team] >= requirement and unit.get_cargo_space_left() > 0:
+                        requests.setdefault((x, y), []).append((unit, min(rate, unit.get_cargo_space_left())))
+                for (x, y), cell_requests in requests.items():
+                    amount = int(self.resource_amount[y, x])
+                    if sum(request for _, request in cell_requests) > amount:
+                        share = amount // len(cell_requests)
+                        cell_requests = [(unit, min(request, share)) for unit, request in cell_requests]
+                    for unit, request in cell_requests:
+                        unit.cargo[code - 1] += request
+                        amount -= request
+                    self.resource_amount[y, x] = amount
+                    if amount <= 0:
+                        self.resource_type[y, x] = RESOURCE_CODES.NONE
+                        self.resource_amount[y, x] = 0
+
+    def __deposit_resources(self) -> None:
+        for unit in self.units.values():
+            tile = self.city_tiles.get((unit.x, unit.y))
+            if tile is not None and tile.team == unit.team and any(unit.cargo):
+                self.cities[tile.cityid].fuel += sum(amount * rate for amount, rate in zip(unit.cargo, FUEL_RATES))
+                unit.cargo = [0, 0, 0]
+
+    def __develop_roads(self) -> None:
+        for unit in self.units.values():
+            if not unit.is_worker() and (unit.x, unit.y) not in self.city_tiles:
+                self.road[unit.y, unit.x] = min(self.road[unit.y, unit.x] + PARAMETERS["CART_ROAD_DEVELOPMENT_RATE"],
+                                                PARAMETERS["MAX_ROAD"])
+
+    def __regrow_wood(self) -> None:
+        growing = (self.resource_type == RESOURCE_CODES.WOOD) & (self.resource_amount < PARAMETERS["MAX_WOOD_AMOUNT"])
+        self.resource_amount[growing] = np.minimum(np.ceil(self.resource_amount[growing] *
+                                                           PARAMETERS["WOOD_GROWTH_RATE"]),
+                                                   PARAMETERS["MAX_WOOD_AMOUNT"])
+
+    def __consume_night_upkeep(self) -> None:
+        for city in list(self.cities.values()):
+            upkeep = self.get_light_upkeep(city)
+            if city.fuel < upkeep:
+                del self.cities[city.id]
+                for x, y in city.tiles:
+                    del self.city_tiles[(x, y)]
+                    self.road[y, x] = PARAMETERS["MIN_ROAD"]
+            else:
+                city.fuel -= upkeep
+        for unit in list(self.units.values()):
+            if (unit.x, unit.y) in self.city_tiles:
+                continue
+            if not unit.spend_fuel_to_survive(PARAMETERS["LIGHT_UPKEEP"][UNIT_TYPE_NAMES[unit.type]]):
+                del self.units[unit.id]
+
+    def __cool_down(self) -> None:
+        for unit in self.units.values():
+            unit.cooldown = max(unit.cooldown - 1 - self.road[unit.y, unit.x], 0)
+        for tile in self.city_tiles.values():
+            tile.cooldown = max(tile.cooldown - 1, 0)
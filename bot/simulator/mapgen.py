@@ -0,0 +1,44 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+from lux.constants import Constants
+
+RESOURCE_CODES = Constants.RESOURCE_CODES
+
+# (resource code, clusters per 12 columns, cluster size range, amount range)
+CLUSTERS = [
+    (RESOURCE_CODES.WOOD, 4, (3, 8), (300, 500)),
+    (RESOURCE_CODES.COAL, 1, (2, 6), (300, 400)),
+    (RESOURCE_CODES.URANIUM, 1, (1, 4), (300, 350)),
+]
+
+
+def generate_map(size: int, rng: random.Random) -> Tuple[np.ndarray, np.ndarray, List[Tuple[int, int]]]:
+    """
+    Generates a board mirrored left to right, like the official maps. Returns the resource type codes, the resource
+    amounts (both indexed [y, x]) and the starting city tile of each team
+    """
+    resource_type = np.zeros((size, size), dtype=np.int8)
+    resource_amount = np.zeros((size, size), dtype=np.int32)
+    half = size // 2
+    for code, per_12_columns, (min_cells, max_cells), (min_amount, max_amount) in CLUSTERS:
+        for _ in range(max(1, per_12_columns * size // 12)):
+            x, y = rng.randrange(half), rng.randrange(size)
+            for _ in range(rng.randint(min_cells, max_cells)):
+                if resource_type[y, x] == RESOURCE_CODES.NONE:
+                    resource_type[y, x] = code
+                    resource_amount[y, x] = rng.randint(min_amount, max_amount)
+                dx, dy = rng.choice([(0, 1), (1, 0), (0, -1), (-1, 0)])
+                x, y = min(max(x + dx, 0), half - 1), min(max(y + dy, 0), size - 1)
+    resource_type[:, size - half:] = resource_type[:, half - 1::-1]
+    resource_amount[:, size - half:] = resource_amount[:, half - 1::-1]
+
+    wood = np.argwhere(resource_type[:, :half] == RESOURCE_CODES.WOOD)
+    candidates = [(x, y) for y in range(size) for x in range(1, half) if resource_type[y, x] == RESOURCE_CODES.NONE
+                  and any(abs(x - wx) + abs(y - wy) <= 3 for wy, wx in wood)]
+    if not candidates:
+        candidates = [(x, y) for y in range(size) for x in range(half) if resource_type[y, x] == RESOURCE_CODES.NONE]
+    x, y = rng.choice(candidates)
+    return resource_type, resource_amount, [(x, y), (size - 1 - x, y)]
@@ -0,0 +1,169 @@
+import hashlib
+import importlib.util
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+from lux.protocol import Observation
+
+from .engine import LuxEngine
+
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BOT_DIR)
+
+Agent = Callable[[Any, Any], List[str]]
+
+_loaded = itertools.count()
+
+
+class MatchResult:
+    def __init__(self, winner: Optional[int], turns: int, city_tiles: List[int], units: List[int],
+                 errors: List[Optional[str]], agent_time: List[float]) -> None:
+        self.winner: Optional[int] = winner
+        self.turns: int = turns
+        self.city_tiles: List[int] = city_tiles
+        self.units: List[int] = units
+        self.errors: List[Optional[str]] = errors
+        self.agent_time: List[float] = agent_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(winner=self.winner, turns=self.turns, city_tiles=self.city_tiles, units=self.units,
+                    errors=self.errors, agent_time=self.agent_time)
+
+
+class ProcessAgent:
+    """
+    A packaged bot (a directory holding main.py) running in its own python process and speaking the stdin/stdout
+    protocol of the Lux runner: the update lines of a turn go in, one line of comma separated actions followed by
+    D_FINISH comes out. Packaged bots ship their own copy of the lux kit, which could not share one interpreter with
+    ours. The process runs in a scratch directory so the log files bots write do not collide
+    """
+
+    def __init__(self, directory: str, entry: str = "main.py") -> None:
+        self.scratch: str = tempfile.mkdtemp(prefix="lux-agent-")
+        self.process: subprocess.Popen = subprocess.Popen(
+            [sys.executable, os.path.join(directory, entry)], cwd=self.scratch, stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1)
+
+    def __call__(self, observation, configuration) -> List[str]:
+        self.process.stdin.write("\n".join(observation["updates"]) + "\n")
+        self.process.stdin.flush()
+        actions = []
+        for line in self.process.stdout:
+            line = line.rstrip("\n")
+            if line == "D_FINISH":
+                return actions
+            actions.extend(action for action in line.split(",") if action)
+        raise RuntimeError(f"agent process exited with code {self.process.wait()}")
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except BrokenPipeError:
+                pass
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+
+def extract_package(path: str) -> str:
+    """
+    Extracts a submission tarball once into the temporary directory and returns where it lives. The directory name
+    carries a hash of the tarball, so a rebuilt tarball is extracted again, and the extraction is renamed into place so
+    concurrent callers never see half of it
+    """
+    with open(path, "rb") as tarball:
+        digest = hashlib.sha1(tarball.read()).hexdigest()[:12]
+    stem = os.path.basename(path).split(".")[0]
+    directory = os.path.join(tempfile.gettempdir(), "lux-packages", f"{stem}-{digest}")
+    if not os.path.isdir(directory):
+        os.makedirs(os.path.dirname(directory), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f"{stem}-", dir=os.path.dirname(directory))
+        with tarfile.open(path) as tarball:
+            tarball.extractall(staging)
+        try:
+            os.rename(staging, directory)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+    return directory
+
+
+def close_agent(agent: Agent) -> None:
+    """
+    Releases what an agent from load_agent holds: the process of a packaged bot. Agent functions hold nothing
+    """
+    if isinstance(agent, ProcessAgent):
+        agent.close()
+
+
+def load_agent(path: str) -> Agent:
+    """
+    Loads the agent function from a python file as a fresh module, so two copies of the same bot keep separate global
+    state. Files inside the bot directory are loaded as part of the bot package, so both the "from lux..." and the
+    "from .lux..." import styles used by the agents resolve. Submission tarballs (.tar.gz) are extracted and run as a
+    ProcessAgent instead
+    """
+    path = os.path.abspath(path)
+    if path.endswith(".tar.gz"):
+        return ProcessAgent(extract_package(path))
+    for directory in (BOT_DIR, REPO_DIR):
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = f"_simulated_agent_{next(_loaded)}_{stem}"
+    if os.path.dirname(path) == BOT_DIR:
+        name = f"bot.{name}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module.agent
+
+
+def run_match(agents: List[Agent], size: int = 12, seed: int = 0, configuration: Optional[Dict[str, Any]] = None,
+              on_turn: Optional[Callable[[int, List[List[str]], List[List[str]]], None]] = None) -> MatchResult:
+    """
+    Plays agents[0] (team 0) against agents[1] (team 1) on a fresh board until the game ends. An agent that raises
+    loses the match. on_turn(turn, updates, actions) is called after every turn with each team's observation lines
+    and actions
+    """
+    engine = LuxEngine(size, seed)
+    observations = [Observation(team) for team in (0, 1)]
+    errors: List[Optional[str]] = [None, None]
+    agent_time = [0.0, 0.0]
+    while not engine.is_done():
+        updates = []
+        actions = []
+        for team, agent in enumerate(agents):
+            observation = observations[team]
+            observation["step"] = engine.turn
+            observation["updates"] = engine.get_initial_messages(team) if engine.turn == 0 else engine.get_updates()
+            observation["remainingOverageTime"] = 60
+            updates.append(observation["updates"])
+            start = time.perf_counter()
+            try:
+                actions.append(list(agent(observation, configuration)))
+            except Exception:
+                errors[team] = traceback.format_exc()
+                actions.append([])
+            agent_time[team] += time.perf_counter() - start
+        if any(errors):
+            break
+        if on_turn is not None:
+            on_turn(engine.turn, updates, actions)
+        engine.step(actions)
+
+    winner = engine.get_winner()
+    if any(errors):
+        winner = None if all(errors) else errors.index(None)
+    return MatchResult(winner, engine.turn, [engine.count_city_tiles(team) for team in (0, 1)],
+                       [engine.count_units(team) for team in (0, 1)], errors, agent_time)
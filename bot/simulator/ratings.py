@@ -0,0 +1,96 @@
+import math
+from statistics import NormalDist
+from typing import Dict, List, Optional
+
+NORMAL = NormalDist()
+
+
+class Elo:
+    """
+    Elo ratings, updated one game at a time
+
+    ...
+
+    Attributes
+    ----------
+    ratings : Dict[str, float]
+        rating of every player seen so far
+    k : float
+        largest change a single game can make
+    """
+
+    def __init__(self, initial: float = 1500, k: float = 16) -> None:
+        self.initial: float = initial
+        self.k: float = k
+        self.ratings: Dict[str, float] = {}
+
+    def expected_score(self, player: str, opponent: str) -> float:
+        difference = self.ratings.get(opponent, self.initial) - self.ratings.get(player, self.initial)
+        return 1 / (1 + 10 ** (difference / 400))
+
+    def update(self, first: str, second: str, winner: Optional[int]) -> None:
+        """
+        winner is 0 when first won, 1 when second won and None on a draw
+        """
+        score = 0.5 if winner is None else 1 - winner
+        change = self.k * (score - self.expected_score(first, second))
+        self.ratings[first] = self.ratings.get(first, self.initial) + change
+        self.ratings[second] = self.ratings.get(second, self.initial) - change
+
+
+class TrueSkill:
+    """
+    TrueSkill ratings for two player games with draws, updated one game at a time. Every player is a Gaussian belief
+    over its skill, and players are ranked by the conservative estimate mu - 3 * sigma
+
+    ...
+
+    Attributes
+    ----------
+    mu, sigma : Dict[str, float]
+        skill belief of every player seen so far
+    """
+
+    def __init__(self, mu: float = 25, sigma: float = 25 / 3, draw_probability: float = 0.1) -> None:
+        self.initial_mu: float = mu
+        self.initial_sigma: float = sigma
+        self.beta: float = sigma / 2
+        self.tau: float = sigma / 100
+        self.draw_margin: float = NORMAL.inv_cdf((draw_probability + 1) / 2) * math.sqrt(2) * self.beta
+        self.mu: Dict[str, float] = {}
+        self.sigma: Dict[str, float] = {}
+
+    def get_rating(self, player: str) -> float:
+        return self.mu.get(player, self.initial_mu) - 3 * self.sigma.get(player, self.initial_sigma)
+
+    def update(self, first: str, second: str, winner: Optional[int]) -> None:
+        """
+        winner is 0 when first won, 1 when second won and None on a draw
+        """
+        if winner == 1:
+            first, second = second, first
+        mus = [self.mu.get(player, self.initial_mu) for player in (first, second)]
+        variances = [self.sigma.get(player, self.initial_sigma) ** 2 + self.tau ** 2 for player in (first, second)]
+        c = math.sqrt(2 * self.beta ** 2 + sum(variances))
+        t = (mus[0] - mus[1]) / c
+        epsilon = self.draw_margin / c
+        if winner is None:
+            v, w = self.__draw_corrections(t, epsilon)
+        else:
+            v, w = self.__win_corrections(t, epsilon)
+        for index, (player, sign) in enumerate(((first, 1), (second, -1))):
+            self.mu[player] = mus[index] + sign * variances[index] / c * v
+            self.sigma[player] = math.sqrt(variances[index] * max(1 - variances[index] / c ** 2 * w, 1e-9))
+
+    @staticmethod
+    def __win_corrections(t, epsilon) -> List[float]:
+        x = t - epsilon
+        v = NORMAL.pdf(x) / max(NORMAL.cdf(x), 1e-12)
+        return [v, v * (v + x)]
+
+    @staticmethod
+    def __draw_corrections(t, epsilon) -> List[float]:
+        mass = max(NORMAL.cdf(epsilon - t) - NORMAL.cdf(-epsilon - t), 1e-12)
+        v = (NORMAL.pdf(-epsilon - t) - NORMAL.pdf(epsilon - t)) / mass
+        w = v ** 2 + ((epsilon - t) * NORMAL.pdf(epsilon - t) + (epsilon + t) * NORMAL.pdf(epsilon + t)) / mass
+        return [v, w]
@@ -0,0 +1,173 @@
+"""
+Round-robin tournament between agents on the local simulator, played on every core
+
+Run from the bot directory with: python -m simulator.tournament --sizes 12 16 24 32 --seeds 0 1 2
+Every pair of agents meets on every size and seed in both seats. Each finished match is appended to
+<out>/results.jsonl and the ratings table in <out>/ratings.json is rewritten, so running the same command again
+resumes the tournament without replaying finished matches
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from .match import BOT_DIR, close_agent, load_agent, run_match
+from .ratings import Elo, TrueSkill
+
+DEFAULT_AGENTS = ["agent.py", "ooagent.py", "risk_averse_baseline.py", "sendex_example.py", "first_oo_agent.tar.gz",
+                  "greedy_bot.tar.gz", "oosubmission.tar.gz"]
+
+Fixture = Dict[str, Any]
+
+
+def get_name(path: str) -> str:
+    return os.path.basename(path)
+
+
+def schedule(agents: List[str], sizes: List[int], seeds: List[int]) -> List[Fixture]:
+    """
+    Every ordered pair of distinct agents on every size and seed. The key identifies a match across runs
+    """
+    return [dict(key=f"{size}:{seed}:{get_name(first)}:{get_name(second)}", agents=[first, second], size=size,
+                 seed=seed)
+            for size in sizes for seed in seeds for first, second in itertools.permutations(agents, 2)]
+
+
+def play(fixture: Fixture) -> Dict[str, Any]:
+    """
+    Plays one fixture with fresh copies of both agents. Runs in a pool worker
+    """
+    agents = [load_agent(path) for path in fixture["agents"]]
+    try:
+        result = run_match(agents, fixture["size"], fixture["seed"]).to_dict()
+    finally:
+        for agent in agents:
+            close_agent(agent)
+    result["errors"] = [error.strip().splitlines()[-1] if error else None for error in result["errors"]]
+    return dict(key=fixture["key"], agents=[get_name(path) for path in fixture["agents"]], size=fixture["size"],
+                seed=fixture["seed"], **result)
+
+
+def read_results(path: str) -> List[Dict[str, Any]]:
+    """
+    The results recorded so far. A line cut short by an interruption is ignored, so its match is played again
+    """
+    if not os.path.exists(path):
+        return []
+    results = []
+    with open(path) as results_file:
+        for line in results_file:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return results
+
+
+class Standings:
+    """
+    Elo and TrueSkill ratings plus the win, draw and loss record of every agent, updated one result at a time in the
+    order results arrive
+    """
+
+    def __init__(self) -> None:
+        self.elo: Elo = Elo()
+        self.trueskill: TrueSkill = TrueSkill()
+        self.records: Dict[str, List[int]] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        first, second = result["agents"]
+        winner: Optional[int] = result["winner"]
+        self.elo.update(first, second, winner)
+        self.trueskill.update(first, second, winner)
+        for team, name in enumerate((first, second)):
+            record = self.records.setdefault(name, [0, 0, 0])
+            record[0 if winner == team else 1 if winner is None else 2] += 1
+
+    def get_table(self) -> List[Dict[str, Any]]:
+        rows = [dict(agent=name, trueskill=round(self.trueskill.get_rating(name), 2),
+                     mu=round(self.trueskill.mu[name], 2), sigma=round(self.trueskill.sigma[name], 2),
+                     elo=round(self.elo.ratings[name], 1), games=sum(record), wins=record[0], draws=record[1],
+                     losses=record[2])
+                for name, record in self.records.items()]
+        return sorted(rows, key=lambda row: row["trueskill"], reverse=True)
+
+    def write(self, path: str) -> None:
+        """
+        replaces the ratings file in one step, so readers never see half a table
+        """
+        staging = f"{path}.tmp"
+        with open(staging, "w") as ratings_file:
+            json.dump(self.get_table(), ratings_file, indent=2)
+        os.replace(staging, path)
+
+    def format(self) -> str:
+        lines = [f"{'agent':<26}{'trueskill':>10}{'mu':>8}{'sigma':>8}{'elo':>8}{'W':>6}{'D':>6}{'L':>6}"]
+        for row in self.get_table():
+            lines.append(f"{row['agent']:<26}{row['trueskill']:>10.2f}{row['mu']:>8.2f}{row['sigma']:>8.2f}"
+                         f"{row['elo']:>8.1f}{row['wins']:>6}{row['draws']:>6}{row['losses']:>6}")
+        return "\n".join(lines)
+
+
+def run_tournament(agents: List[str], sizes: List[int], seeds: List[int], out: str,
+                   workers: Optional[int] = None) -> Standings:
+    os.makedirs(out, exist_ok=True)
+    results_path = os.path.join(out, "results.jsonl")
+    ratings_path = os.path.join(out, "ratings.json")
+    standings = Standings()
+    finished = set()
+    for result in read_results(results_path):
+        standings.add(result)
+        finished.add(result["key"])
+    fixtures = [fixture for fixture in schedule(agents, sizes, seeds) if fixture["key"] not in finished]
+    print(f"{len(finished)} matches already played, {len(fixtures)} to go", file=sys.stderr)
+
+    with multiprocessing.Pool(workers, initializer=_initialize_worker, maxtasksperchild=20) as pool, \
+            open(results_path, "a+") as results_file:
+        if results_file.tell() > 0:
+            results_file.seek(results_file.tell() - 1)
+            if results_file.read(1) != "\n":
+                results_file.write("\n")  # ends a line cut short by an interruption
+        for count, result in enumerate(pool.imap_unordered(play, fixtures), 1):
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+            standings.add(result)
+            standings.write(ratings_path)
+            first, second = result["agents"]
+            winner = "draw" if result["winner"] is None else result["agents"][result["winner"]]
+            print(f"[{count}/{len(fixtures)}] {first} vs {second} on {result['size']}x{result['size']} seed "
+                  f"{result['seed']}: {winner}", file=sys.stderr)
+    standings.write(ratings_path)
+    return standings
+
+
+def _initialize_worker() -> None:
+    """
+    Agents write their log files to the working directory, so every worker gets its own. Output the agents print is
+    dropped so it does not interleave with the progress lines
+    """
+    os.chdir(tempfile.mkdtemp(prefix="lux-tournament-"))
+    sys.stdout = open(os.devnull, "w")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--agents", nargs="+", default=[os.path.join(BOT_DIR, name) for name in DEFAULT_AGENTS],
+                            help="python files defining agent(observation, configuration) or submission tarballs")
+    arg_parser.add_argument("--sizes", nargs="+", type=int, default=[12, 16, 24, 32], choices=[12, 16, 24, 32])
+    arg_parser.add_argument("--seeds", nargs="+", type=int, default=[0, 1, 2])
+    arg_parser.add_argument("--out", default="tournament", help="directory for results.jsonl and ratings.json")
+    arg_parser.add_argument("--workers", type=int, default=None, help="processes to play on, all cores by default")
+    args = arg_parser.parse_args()
+
+    standings = run_tournament([os.path.abspath(path) for path in args.agents], args.sizes, args.seeds, args.out,
+                               args.workers)
+    print(standings.format())
+
+
+if __name__ == "__main__":
+    main()
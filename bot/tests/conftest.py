@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the tests import the bot's packages the way the agents and benchmarks do, from the bot directory
+BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BOT_DIR not in sys.path:
+    sys.path.insert(0, BOT_DIR)
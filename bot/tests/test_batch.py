@@ -0,0 +1,48 @@
+"""
+BatchEnv must play exactly the turns LuxEngine plays. Games are recorded through run_match with the baseline agent on
+both sides, then replayed side by side in one BatchEnv with the same actions, comparing the update lines every turn
+"""
+import os
+import random
+from typing import List, Tuple
+
+import pytest
+
+from simulator.batch import BatchEnv
+from simulator.match import BOT_DIR, load_agent, run_match
+
+SIZES = [12, 16, 24]
+SEEDS = [1, 2, 3]
+BASELINE = os.path.join(BOT_DIR, "risk_averse_baseline.py")
+
+
+def record_game(size, seed) -> Tuple[List[List[str]], List[List[List[str]]], object]:
+    """
+    the update lines team 0 saw and the actions of both teams on every turn of one LuxEngine game, and its result
+    """
+    random.seed(seed)
+    updates = []
+    actions = []
+
+    def on_turn(turn, turn_updates, turn_actions):
+        updates.append(turn_updates[0])
+        actions.append(turn_actions)
+
+    result = run_match([load_agent(BASELINE), load_agent(BASELINE)], size, seed, on_turn=on_turn)
+    return updates, actions, result
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_batch_env_replays_engine_games(size):
+    games = [record_game(size, seed) for seed in SEEDS]
+    env = BatchEnv(size, SEEDS)
+    for turn in range(max(len(updates) for updates, _, _ in games)):
+        for n, (updates, _, _) in enumerate(games):
+            if turn < len(updates):
+                lines = env.get_initial_messages(n, 0) if turn == 0 else env.get_updates(n)
+                assert lines == updates[turn], f"game {n} (seed {SEEDS[n]}) differs on turn {turn}"
+        env.step([actions[turn] if turn < len(actions) else None for _, actions, _ in games])
+    for n, (updates, _, result) in enumerate(games):
+        assert env.turn[n] == result.turns
+        assert env.get_winner(n) == result.winner
+        assert env.count_city_tiles()[n].tolist() == result.city_tiles
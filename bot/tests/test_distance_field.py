@@ -0,0 +1,92 @@
+"""
+DistanceField against a plain breadth-first search from every source, on random boards with obstacles
+"""
+from collections import deque
+
+import numpy as np
+import pytest
+
+from lux.constants import Constants
+from lux.distance_field import FIELD_DIRECTIONS, NO_DIRECTION, UNREACHABLE, DistanceField
+from lux.position import Position
+
+DIRECTIONS = Constants.DIRECTIONS
+STEPS = [(DIRECTIONS.NORTH, 0, -1), (DIRECTIONS.EAST, 1, 0), (DIRECTIONS.SOUTH, 0, 1), (DIRECTIONS.WEST, -1, 0)]
+
+
+def reference_distances(sources, obstacles) -> np.ndarray:
+    height, width = sources.shape
+    distances = np.full(sources.shape, UNREACHABLE, dtype=np.int64)
+    queue = deque()
+    for y, x in zip(*np.nonzero(sources & ~obstacles)):
+        distances[y, x] = 0
+        queue.append((x, y))
+    while queue:
+        x, y = queue.popleft()
+        for _, dx, dy in STEPS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and not obstacles[ny, nx] and distances[ny, nx] == UNREACHABLE:
+                distances[ny, nx] = distances[y, x] + 1
+                queue.append((nx, ny))
+    return distances
+
+
+def random_board(width, height, seed):
+    rng = np.random.default_rng(seed)
+    obstacles = rng.random((height, width)) < rng.uniform(0, 0.4)
+    sources = rng.random((height, width)) < rng.uniform(0, 0.05)
+    return sources, obstacles
+
+
+@pytest.mark.parametrize("width, height", [(12, 12), (16, 16), (24, 24), (32, 32), (5, 9), (1, 1), (1, 7)])
+def test_distances_match_a_breadth_first_search(width, height):
+    for seed in range(25):
+        sources, obstacles = random_board(width, height, seed)
+        field = DistanceField(sources, obstacles)
+        assert field.distances.dtype == np.int32
+        assert (field.distances == reference_distances(sources, obstacles)).all(), f"seed {seed}"
+
+
+def test_no_sources_leaves_everything_unreachable():
+    field = DistanceField(np.zeros((8, 8), dtype=bool), np.zeros((8, 8), dtype=bool))
+    assert (field.distances == UNREACHABLE).all() and (field.directions == NO_DIRECTION).all()
+    assert field.distance_at(Position(3, 3)) is None and field.direction_at(Position(3, 3)) is None
+
+
+@pytest.mark.parametrize("size", [12, 32])
+def test_directions_take_the_first_shortest_step(size):
+    for seed in range(10):
+        sources, obstacles = random_board(size, size, seed)
+        field = DistanceField(sources, obstacles)
+        for y in range(size):
+            for x in range(size):
+                distance = field.distances[y, x]
+                direction = field.direction_at(Position(x, y))
+                if distance == UNREACHABLE:
+                    assert direction is None
+                    continue
+                if distance == 0:
+                    assert direction == DIRECTIONS.CENTER
+                    continue
+                shortest = [name for name, dx, dy in STEPS if 0 <= x + dx < size and 0 <= y + dy < size and
+                            field.distances[y + dy, x + dx] == distance - 1]
+                assert direction == shortest[0], f"seed {seed} cell {x} {y}"
+                assert FIELD_DIRECTIONS[field.directions[y, x]] == direction
+
+
+@pytest.mark.parametrize("size", [12, 32])
+def test_labels_are_those_of_the_source_the_directions_lead_to(size):
+    for seed in range(10):
+        sources, obstacles = random_board(size, size, seed)
+        labels = np.random.default_rng(seed).integers(0, 5, sources.shape, dtype=np.int32)
+        field = DistanceField(sources, obstacles, labels)
+        assert DistanceField(sources, obstacles).labels is None
+        for y in range(size):
+            for x in range(size):
+                pos = Position(x, y)
+                if field.distance_at(pos) is None:
+                    assert field.label_at(pos) is None
+                    continue
+                while field.direction_at(pos) != DIRECTIONS.CENTER:
+                    pos = pos.translate(field.direction_at(pos), 1)
+                assert field.label_at(Position(x, y)) == labels[pos.y, pos.x], f"seed {seed} cell {x} {y}"
@@ -0,0 +1,237 @@
+"""
+LuxEngine rules checked against update lines worked out by hand from game_constants.json. Every test starts from an
+empty board, places the few units, city tiles and resources it needs, plays one or two turns and compares the whole
+update message
+"""
+from simulator.engine import LuxEngine
+
+from lux.constants import Constants
+
+RESOURCE_CODES = Constants.RESOURCE_CODES
+UNIT_TYPES = Constants.UNIT_TYPES
+DONE = Constants.INPUT_CONSTANTS.DONE
+NOTHING = [[], []]
+
+
+def empty_engine(size=6, turn=0) -> LuxEngine:
+    """
+    a LuxEngine with no resources, units, city tiles or roads, on the given turn
+    """
+    engine = LuxEngine(size, seed=0)
+    engine.resource_type[:] = RESOURCE_CODES.NONE
+    engine.resource_amount[:] = 0
+    engine.road[:] = 0
+    engine.units.clear()
+    engine.cities.clear()
+    engine.city_tiles.clear()
+    engine.unit_count = engine.city_count = engine.city_tile_count = 0
+    engine.turn = turn
+    return engine
+
+
+def add_city_tile(engine, team, x, y, fuel=0) -> None:
+    engine._LuxEngine__build_city_tile(team, x, y)
+    engine.cities[engine.city_tiles[(x, y)].cityid].fuel += fuel
+
+
+def add_unit(engine, team, x, y, u_type=UNIT_TYPES.WORKER, cargo=(0, 0, 0)):
+    unit = engine._LuxEngine__spawn_unit(team, u_type, x, y)
+    unit.cargo = list(cargo)
+    return unit
+
+
+def add_resource(engine, code, x, y, amount) -> None:
+    engine.resource_type[y, x] = code
+    engine.resource_amount[y, x] = amount
+
+
+# -------------------------------------- Night upkeep -------------------------------------- #
+
+def test_cities_burn_upkeep_from_the_first_night_turn():
+    engine = empty_engine(turn=29)
+    add_city_tile(engine, 0, 1, 1, fuel=30)
+    engine.step(NOTHING)
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "c 0 c_1 30 23", "ct 0 c_1 1 1 0", "ccd 1 1 6", DONE]
+    engine.step(NOTHING)
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "c 0 c_1 7 23", "ct 0 c_1 1 1 0", "ccd 1 1 6", DONE]
+    # 7 fuel does not cover 23 upkeep: the city falls and its road goes back to the minimum
+    engine.step(NOTHING)
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", DONE]
+
+
+def test_adjacent_city_tiles_share_upkeep():
+    engine = empty_engine(turn=30)
+    add_city_tile(engine, 0, 1, 1, fuel=100)
+    add_city_tile(engine, 0, 2, 1)
+    engine.step(NOTHING)
+    # two tiles with one neighbour each: 2 * (23 - 5)
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "c 0 c_1 64 36", "ct 0 c_1 1 1 0", "ct 0 c_1 2 1 0",
+                                    "ccd 1 1 6", "ccd 2 1 6", DONE]
+
+
+def test_units_off_city_tiles_burn_cargo_at_night():
+    engine = empty_engine(turn=35)
+    add_city_tile(engine, 0, 0, 0, fuel=1000)
+    add_unit(engine, 0, 0, 0)
+    add_unit(engine, 0, 3, 3, cargo=(10, 0, 0))
+    add_unit(engine, 0, 4, 4, cargo=(0, 1, 0))
+    add_unit(engine, 1, 5, 5)
+    engine.step(NOTHING)
+    # on its city tile u_1 burns nothing, u_2 burns 4 wood, u_3 burns one coal worth 10 and u_4 has nothing to burn
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 0 0 0 0 0 0", "u 0 0 u_2 3 3 0 6 0 0",
+                                    "u 0 0 u_3 4 4 0 0 0 0", "c 0 c_1 977 23", "ct 0 c_1 0 0 0", "ccd 0 0 6", DONE]
+
+
+# -------------------------------------- Wood regrowth ------------------------------------- #
+
+def test_wood_regrows_by_the_growth_rate_up_to_the_maximum():
+    engine = empty_engine()
+    add_resource(engine, RESOURCE_CODES.WOOD, 1, 1, 100)
+    add_resource(engine, RESOURCE_CODES.WOOD, 2, 1, 490)
+    add_resource(engine, RESOURCE_CODES.WOOD, 3, 1, 500)
+    add_resource(engine, RESOURCE_CODES.COAL, 4, 1, 100)
+    engine.step(NOTHING)
+    # ceil(100 * 1.025) = 103, ceil(490 * 1.025) = 503 capped to 500, coal does not grow
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "r wood 1 1 103", "r wood 2 1 500", "r wood 3 1 500",
+                                    "r coal 4 1 100", DONE]
+
+
+def test_wood_regrows_after_collection():
+    engine = empty_engine()
+    add_resource(engine, RESOURCE_CODES.WOOD, 1, 1, 100)
+    add_unit(engine, 0, 1, 2)
+    engine.step(NOTHING)
+    # 100 - 20 collected = 80, then ceil(80 * 1.025) = 82
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "r wood 1 1 82", "u 0 0 u_1 1 2 0 20 0 0", DONE]
+
+
+# ------------------------------------ Research thresholds --------------------------------- #
+
+def test_coal_needs_fifty_research_points():
+    engine = empty_engine()
+    engine.research_points = [48, 0]
+    add_city_tile(engine, 0, 0, 0)
+    add_resource(engine, RESOURCE_CODES.COAL, 3, 3, 300)
+    add_unit(engine, 0, 3, 2)
+    engine.step([["r 0 0"], []])
+    assert engine.get_updates() == ["rp 0 49", "rp 1 0", "r coal 3 3 300", "u 0 0 u_1 3 2 0 0 0 0",
+                                    "c 0 c_1 0 23", "ct 0 c_1 0 0 9", "ccd 0 0 6", DONE]
+    engine.city_tiles[(0, 0)].cooldown = 0
+    # the research point comes before collection, so the worker mines coal on the turn the team reaches 50
+    engine.step([["r 0 0"], []])
+    assert engine.get_updates() == ["rp 0 50", "rp 1 0", "r coal 3 3 295", "u 0 0 u_1 3 2 0 0 5 0",
+                                    "c 0 c_1 0 23", "ct 0 c_1 0 0 9", "ccd 0 0 6", DONE]
+
+
+def test_uranium_needs_two_hundred_research_points():
+    engine = empty_engine()
+    engine.research_points = [199, 200]
+    add_resource(engine, RESOURCE_CODES.URANIUM, 2, 2, 300)
+    add_unit(engine, 0, 1, 2)
+    add_unit(engine, 1, 3, 2)
+    engine.step(NOTHING)
+    assert engine.get_updates() == ["rp 0 199", "rp 1 200", "r uranium 2 2 298", "u 0 0 u_1 1 2 0 0 0 0",
+                                    "u 0 1 u_2 3 2 0 0 0 2", DONE]
+
+
+def test_cells_serve_the_passes_in_order():
+    engine = empty_engine()
+    add_resource(engine, RESOURCE_CODES.WOOD, 2, 2, 30)
+    add_unit(engine, 0, 1, 2)
+    add_unit(engine, 1, 3, 2)
+    engine.step(NOTHING)
+    # u_1 reaches the cell in the east pass and takes 20, u_2 only gets the 10 left in the west pass
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 1 2 0 20 0 0", "u 0 1 u_2 3 2 0 10 0 0",
+                                    DONE]
+
+
+def test_cells_split_what_is_left_between_workers_of_one_pass():
+    engine = empty_engine()
+    add_resource(engine, RESOURCE_CODES.WOOD, 2, 2, 30)
+    add_city_tile(engine, 0, 1, 2)
+    add_unit(engine, 0, 1, 2)
+    add_unit(engine, 0, 1, 2)
+    engine.step(NOTHING)
+    # both ask for 20 of 30 in the east pass, so each gets 15, exhausts the cell and delivers it to the city
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 1 2 0 0 0 0", "u 0 0 u_2 1 2 0 0 0 0",
+                                    "c 0 c_1 30 23", "ct 0 c_1 1 2 0", "ccd 1 2 6", DONE]
+
+
+# ---------------------------------------- Collisions -------------------------------------- #
+
+def test_units_moving_onto_one_cell_both_stay():
+    engine = empty_engine()
+    add_unit(engine, 0, 1, 2)
+    add_unit(engine, 1, 3, 2)
+    engine.step([["m u_1 e"], ["m u_2 w"]])
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 1 2 0 0 0 0", "u 0 1 u_2 3 2 0 0 0 0", DONE]
+
+
+def test_blocked_moves_cancel_the_moves_behind_them():
+    engine = empty_engine()
+    add_unit(engine, 0, 1, 1)
+    add_unit(engine, 0, 2, 1)
+    add_unit(engine, 1, 3, 1)
+    # u_2 runs into u_3, which stays, so u_1 cannot move onto u_2 either
+    engine.step([["m u_1 e", "m u_2 e"], []])
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 1 1 0 0 0 0", "u 0 0 u_2 2 1 0 0 0 0",
+                                    "u 0 1 u_3 3 1 0 0 0 0", DONE]
+
+
+def test_units_cannot_swap_outside_city_tiles():
+    engine = empty_engine()
+    add_unit(engine, 0, 1, 1)
+    add_unit(engine, 0, 2, 1)
+    engine.step([["m u_1 e", "m u_2 w"], []])
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 1 1 0 0 0 0", "u 0 0 u_2 2 1 0 0 0 0", DONE]
+
+
+def test_units_stack_on_their_own_city_tiles_only():
+    engine = empty_engine()
+    add_city_tile(engine, 0, 2, 2)
+    add_city_tile(engine, 1, 4, 2)
+    add_unit(engine, 0, 1, 2)
+    add_unit(engine, 0, 3, 2)
+    add_unit(engine, 0, 5, 2)
+    engine.step([["m u_1 e", "m u_2 w", "m u_3 w"], []])
+    # the road on the city tile takes 1 + 6 off the cooldown of 2; the move onto the enemy tile is dropped
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 2 2 0 0 0 0", "u 0 0 u_2 2 2 0 0 0 0",
+                                    "u 0 0 u_3 5 2 0 0 0 0", "c 0 c_1 0 23", "ct 0 c_1 2 2 0", "c 1 c_2 0 23",
+                                    "ct 1 c_2 4 2 0", "ccd 2 2 6", "ccd 4 2 6", DONE]
+
+
+# ------------------------------------- Roads and cooldowns -------------------------------- #
+
+def test_carts_develop_roads_that_speed_up_cooldowns():
+    engine = empty_engine()
+    add_unit(engine, 0, 1, 1, u_type=UNIT_TYPES.CART)
+    engine.step([["m u_1 e"], []])
+    # 3 - 1 - 0.75 of the road the cart just laid
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 1 0 u_1 2 1 1.25 0 0 0", "ccd 2 1 0.75", DONE]
+    engine.step([["m u_1 e"], []])
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 1 0 u_1 2 1 0 0 0 0", "ccd 2 1 1.5", DONE]
+
+
+def test_workers_pillage_roads_down_to_the_minimum():
+    engine = empty_engine()
+    engine.road[1, 1] = 0.75
+    add_unit(engine, 0, 1, 1)
+    engine.step([["p u_1"], []])
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 1 1 0.75 0 0 0", "ccd 1 1 0.25", DONE]
+    engine.units["u_1"].cooldown = 0
+    # 0.25 - 0.5 stops at 0, and a cell without road takes only 1 off the cooldown of 2
+    engine.step([["p u_1"], []])
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 1 1 1 0 0 0", DONE]
+
+
+def test_city_tiles_act_once_per_cooldown():
+    engine = empty_engine()
+    add_city_tile(engine, 0, 1, 1)
+    add_city_tile(engine, 0, 1, 2)
+    engine.step([["bw 1 1", "bc 1 2"], []])
+    assert engine.get_updates() == ["rp 0 0", "rp 1 0", "u 0 0 u_1 1 1 0 0 0 0", "u 1 0 u_2 1 2 0 0 0 0",
+                                    "c 0 c_1 0 36", "ct 0 c_1 1 1 9", "ct 0 c_1 1 2 9", "ccd 1 1 6", "ccd 1 2 6",
+                                    DONE]
+    # still cooling down: the research is dropped
+    engine.step([["r 1 1"], []])
+    assert engine.get_updates()[0] == "rp 0 0"
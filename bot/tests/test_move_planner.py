@@ -0,0 +1,130 @@
+"""
+MovePlanner on random crowds of units: whatever the units ask for, no two of them end up on one cell outside our
+cities, no two of them swap cells, and nobody walks into an opponent city tile or an opponent unit that cannot act
+"""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from lux.constants import Constants
+from lux.game_map import GameMap
+from lux.move_planner import MOVE_DIRECTIONS, MovePlanner
+from lux.position import Position
+from lux.unit import Unit
+
+DIRECTIONS = Constants.DIRECTIONS
+UNIT_TYPES = Constants.UNIT_TYPES
+
+
+def make_planner(size, player_units, opponent_units, player_city_tiles=(), opponent_city_tiles=()):
+    game_map = GameMap(size, size)
+    game_map.player_city_tiles = set(player_city_tiles)
+    game_map.opponent_city_tiles = set(opponent_city_tiles)
+    player = SimpleNamespace(units=player_units)
+    opponent = SimpleNamespace(units=opponent_units)
+    actions = []
+    system = SimpleNamespace(map=game_map, add_action=actions.append)
+    return MovePlanner(game_map, player, opponent), system, actions
+
+
+def make_unit(team, index, x, y, cooldown=0, u_type=UNIT_TYPES.WORKER):
+    return Unit(team, u_type, f"u_{team}_{index}", x, y, cooldown, 0, 0, 0)
+
+
+def random_crowd(size, seed):
+    """
+    units of both teams on distinct cells, except that our units may share our city tiles
+    """
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(size) for y in range(size)]
+    rng.shuffle(cells)
+    player_city_tiles = set(cells[:rng.randrange(1, size)])
+    opponent_city_tiles = set(cells[size:size + rng.randrange(size)])
+    free = cells[2 * size:]
+    player_units = [make_unit(0, index, *cell, cooldown=rng.choice([0, 0, 0, 1, 2]),
+                              u_type=rng.choice([UNIT_TYPES.WORKER, UNIT_TYPES.WORKER, UNIT_TYPES.CART]))
+                    for index, cell in enumerate(free[:rng.randrange(size, 3 * size)])]
+    player_units += [make_unit(0, len(player_units) + index, *cell)
+                     for index, cell in enumerate(rng.choices(sorted(player_city_tiles), k=3))]
+    opponent_units = [make_unit(1, index, *cell, cooldown=rng.choice([0, 1, 2]))
+                      for index, cell in enumerate(free[3 * size:4 * size])]
+    return rng, player_units, opponent_units, player_city_tiles, opponent_city_tiles
+
+
+def request_random_moves(rng, planner, units):
+    for unit in units:
+        if not unit.can_act() or rng.random() < 0.1:
+            continue
+        style = rng.randrange(3)
+        if style == 0:
+            directions = rng.sample(MOVE_DIRECTIONS, rng.randrange(1, 5))
+            planner.request_move(unit, directions, [d for d in MOVE_DIRECTIONS if d not in directions])
+        elif style == 1:
+            destination = Position(rng.randrange(planner.map.width), rng.randrange(planner.map.height))
+            planner.request_move_towards(unit, destination, avoid_city_tiles=rng.random() < 0.5)
+        else:
+            planner.hold(unit)
+
+
+def assert_settled_safely(planner, player_units, opponent_units, actions):
+    targets = planner.targets
+    assert sorted(targets) == list(range(len(player_units)))
+    moved = {index for index, unit in enumerate(player_units) if targets[index] != unit.pos}
+    assert len(actions) == len(moved)
+    cells = {}
+    for index, unit in enumerate(player_units):
+        target = targets[index]
+        assert target - unit.pos <= 1
+        if index in moved:
+            assert unit.can_act()
+            assert f"m {unit.id} {unit.pos.direction_to(target)}" in actions
+        if not planner.is_stackable(target):
+            assert target not in cells, f"{unit.id} and {cells.get(target)} both end on {target}"
+            cells[target] = unit.id
+    for index in moved:
+        for other in moved:
+            assert not (targets[index] == player_units[other].pos and targets[other] == player_units[index].pos)
+    for index in moved:
+        target = targets[index]
+        assert (target.x, target.y) not in planner.map.opponent_city_tiles
+        assert all(unit.pos != target for unit in opponent_units if not unit.can_act())
+
+
+@pytest.mark.parametrize("size", [8, 12, 16])
+def test_random_crowds_settle_without_collisions_or_swaps(size):
+    for seed in range(40):
+        rng, player_units, opponent_units, player_city_tiles, opponent_city_tiles = random_crowd(size, seed)
+        planner, system, actions = make_planner(size, player_units, opponent_units, player_city_tiles,
+                                                opponent_city_tiles)
+        request_random_moves(rng, planner, player_units)
+        planner.resolve(system)
+        assert_settled_safely(planner, player_units, opponent_units, actions)
+
+
+def test_a_line_of_units_follows_its_leader():
+    units = [make_unit(0, index, x, 0) for index, x in enumerate([3, 2, 1, 0])]
+    planner, system, actions = make_planner(6, units, [])
+    for unit in reversed(units):
+        planner.request_move(unit, [DIRECTIONS.EAST])
+    planner.resolve(system)
+    assert [planner.targets[index] for index in range(4)] == [Position(x, 0) for x in (4, 3, 2, 1)]
+
+
+def test_units_facing_each_other_do_not_swap():
+    units = [make_unit(0, 0, 1, 1), make_unit(0, 1, 2, 1)]
+    planner, system, actions = make_planner(4, units, [])
+    planner.request_move(units[0], [DIRECTIONS.EAST])
+    planner.request_move(units[1], [DIRECTIONS.WEST])
+    planner.resolve(system)
+    assert len(actions) <= 1
+    assert_settled_safely(planner, units, [], actions)
+
+
+def test_city_tiles_take_any_number_of_units():
+    units = [make_unit(0, 0, 1, 2), make_unit(0, 1, 3, 2), make_unit(0, 2, 2, 1)]
+    planner, system, actions = make_planner(5, units, [], player_city_tiles={(2, 2)})
+    for unit in units:
+        planner.request_move_towards(unit, Position(2, 2))
+    planner.resolve(system)
+    assert all(planner.targets[index] == Position(2, 2) for index in range(3))
@@ -0,0 +1,93 @@
+"""
+The batch parser, the lazy rebuild and the incremental update against the original line-by-line parser, on the update
+streams of whole games played by the simulator
+"""
+import os
+import random
+
+import numpy as np
+import pytest
+
+from lux.constants import Constants
+from lux.gamesetup.game import Game
+from lux.gamesetup.parser import UpdateStream, parse_updates
+from simulator.match import BOT_DIR, load_agent, run_match
+
+from benchmarks.bench_parser import legacy_update
+
+AGENTS = [os.path.join(BOT_DIR, name) for name in ("ooagent.py", "risk_averse_baseline.py")]
+ARRAYS = ["resource_type", "resource_amount", "road", "city_owner", "city_cooldown"]
+DONE = Constants.INPUT_CONSTANTS.DONE
+
+
+def record_game(size, seed):
+    random.seed(seed)
+    recorded = []
+    run_match([load_agent(path) for path in AGENTS], size, seed,
+              on_turn=lambda turn, turn_updates, _: recorded.append(turn_updates[0]))
+    return recorded
+
+
+@pytest.fixture(scope="module", params=[(12, 1), (24, 1)])
+def game_updates(request):
+    return record_game(*request.param)
+
+
+def get_state(game):
+    """
+    everything a turn's update sets, in a form that compares with ==
+    """
+    state = {name: getattr(game.map, name).tolist() for name in ARRAYS}
+    state["research_points"] = [player.research_points for player in game.players]
+    state["units"] = [sorted((unit.id, unit.type, unit.pos.x, unit.pos.y, unit.cooldown, unit.cargo.wood,
+                              unit.cargo.coal, unit.cargo.uranium) for unit in player.units)
+                      for player in game.players]
+    state["cities"] = [sorted((city.cityid, city.fuel, city.light_upkeep,
+                               sorted((tile.pos.x, tile.pos.y, tile.cooldown) for tile in city.citytiles))
+                              for city in player.cities.values()) for player in game.players]
+    state["city_tile_count"] = [player.city_tile_count for player in game.players]
+    state["citytiles"] = sorted((x, y, tile.team, tile.cityid) for (x, y), tile in game.map.citytiles.items())
+    state["city_index"] = [[game.map.city_ids[index] if index >= 0 else None for index in row]
+                           for row in game.map.city_index.tolist()]
+    return state
+
+
+def test_every_way_of_reading_a_turn_matches_the_legacy_parser(game_updates):
+    lazy = Game()
+    incremental = Game(incremental=True)
+    for game in (lazy, incremental):
+        game._initialize(game_updates[0])
+    for turn, updates in enumerate(game_updates):
+        lines = updates[2:] if turn == 0 else updates
+        legacy = Game()
+        legacy._initialize(game_updates[0])
+        legacy.turn = turn - 1
+        legacy_update(legacy, lines)
+        expected = get_state(legacy)
+        lazy._update(lines)
+        incremental._update(lines)
+        assert get_state(lazy) == expected, f"lazy rebuild, turn {turn}"
+        assert get_state(incremental) == expected, f"incremental update, turn {turn}"
+
+
+def test_an_update_stream_fed_in_pieces_parses_like_the_whole_turn(game_updates):
+    rng = random.Random(0)
+    for turn in range(0, len(game_updates), 7):
+        lines = game_updates[turn][2:] if turn == 0 else game_updates[turn]
+        expected = parse_updates(lines)
+        stream = UpdateStream()
+        # the lines after D_DONE belong to the next turn and are left unused
+        fed = lines + lines
+        position = 0
+        while not stream.done:
+            piece = fed[position:position + rng.randrange(1, 40)]
+            used = stream.feed(piece)
+            assert used == len(piece) or stream.done
+            position += used
+        assert position == len(lines) and fed[position - 1] == DONE
+        parsed = stream.finish()
+        for name, value in vars(expected).items():
+            if isinstance(value, np.ndarray):
+                assert np.array_equal(getattr(parsed, name), value), f"turn {turn}, {name}"
+            else:
+                assert getattr(parsed, name) == value, f"turn {turn}, {name}"
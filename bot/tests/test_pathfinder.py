@@ -0,0 +1,80 @@
+"""
+PathFinder keeps a unit's path across turns until a road or a city tile changes on it, whether the game reports the
+changed cells or rebuilds the whole state
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from lux.constants import Constants
+from lux.game_map import GameMap
+from lux.gamesetup.change_set import ChangeSet
+from lux.pathfinder import PathFinder
+from lux.position import Position
+
+UNIT_TYPES = Constants.UNIT_TYPES
+SIZE = 8
+
+
+def make_map(roads=(), city_tiles=()):
+    game_map = GameMap(SIZE, SIZE)
+    for x, y, level in roads:
+        game_map.road[y, x] = level
+    for x, y, team in city_tiles:
+        game_map.city_owner[y, x] = team
+    return game_map
+
+
+def make_unit(x, y):
+    return SimpleNamespace(id="u_1", pos=Position(x, y), type=UNIT_TYPES.WORKER)
+
+
+def start(game_map):
+    path_finder = PathFinder(SIZE, SIZE)
+    path_finder.update(game_map, ChangeSet(full=True), 0)
+    unit = make_unit(0, 3)
+    path_finder.get_next_direction(unit, Position(7, 3))
+    assert path_finder.searches == 1
+    return path_finder, unit
+
+
+def next_turn(path_finder, unit, game_map, changes):
+    path_finder.update(game_map, changes, 0)
+    path = path_finder.paths.get(unit.id)
+    if path is not None:
+        unit.pos = path.positions[path.step + 1]
+    path_finder.get_next_direction(unit, Position(7, 3))
+
+
+@pytest.mark.parametrize("full", [True, False])
+def test_changes_away_from_the_path_keep_it(full):
+    path_finder, unit = start(make_map())
+    changes = ChangeSet(full=full)
+    changes.roads.add((4, 6))
+    next_turn(path_finder, unit, make_map(roads=[(4, 6, 1)]), changes)
+    assert (path_finder.searches, path_finder.reuses) == (1, 1)
+
+
+@pytest.mark.parametrize("full", [True, False])
+@pytest.mark.parametrize("change", ["road", "city tile"])
+def test_changes_on_the_path_drop_it(full, change):
+    path_finder, unit = start(make_map())
+    changes = ChangeSet(full=full)
+    if change == "road":
+        changes.roads.add((5, 3))
+        game_map = make_map(roads=[(5, 3, 1)])
+    else:
+        changes.citytiles_added.add((5, 3))
+        game_map = make_map(city_tiles=[(5, 3, 1)])
+    next_turn(path_finder, unit, game_map, changes)
+    assert (path_finder.searches, path_finder.reuses) == (2, 0)
+    if change == "city tile":
+        assert (5, 3) not in path_finder.paths[unit.id].cells
+
+
+def test_a_unit_off_its_path_searches_again():
+    path_finder, unit = start(make_map())
+    unit.pos = Position(0, 4)
+    path_finder.update(make_map(), ChangeSet(full=True), 0)
+    path_finder.get_next_direction(unit, Position(7, 3))
+    assert (path_finder.searches, path_finder.reuses) == (2, 0)
@@ -0,0 +1,59 @@
+"""
+Elo and TrueSkill updates against values worked out by hand and the ones the reference trueskill package documents
+for its default environment (mu 25, sigma 25 / 3, beta sigma / 2, tau sigma / 100, draw probability 0.1)
+"""
+import pytest
+
+from simulator.ratings import Elo, TrueSkill
+
+
+def test_elo_expected_score():
+    elo = Elo()
+    elo.ratings.update(strong=1900, weak=1500)
+    assert elo.expected_score("strong", "weak") == pytest.approx(10 / 11)
+    assert elo.expected_score("weak", "strong") == pytest.approx(1 / 11)
+    assert elo.expected_score("new", "other new") == 0.5
+
+
+@pytest.mark.parametrize("winner, first, second", [(0, 1508, 1492), (1, 1492, 1508), (None, 1500, 1500)])
+def test_elo_update_between_equals(winner, first, second):
+    elo = Elo()
+    elo.update("a", "b", winner)
+    assert elo.ratings == pytest.approx({"a": first, "b": second})
+
+
+def test_elo_draw_against_a_weaker_player_loses_points():
+    elo = Elo(k=32)
+    elo.ratings.update(strong=1900, weak=1500)
+    elo.update("strong", "weak", None)
+    change = 32 * (0.5 - 10 / 11)
+    assert elo.ratings == pytest.approx({"strong": 1900 + change, "weak": 1500 - change})
+
+
+@pytest.mark.parametrize("winner", [0, 1])
+def test_trueskill_win_between_new_players(winner):
+    trueskill = TrueSkill()
+    trueskill.update("a", "b", winner)
+    won, lost = ("a", "b") if winner == 0 else ("b", "a")
+    assert trueskill.mu == pytest.approx({won: 29.396, lost: 20.604}, abs=1e-3)
+    assert trueskill.sigma == pytest.approx({won: 7.171, lost: 7.171}, abs=1e-3)
+    assert trueskill.get_rating(won) == pytest.approx(29.396 - 3 * 7.171, abs=1e-2)
+
+
+def test_trueskill_draw_between_new_players():
+    trueskill = TrueSkill()
+    trueskill.update("a", "b", None)
+    assert trueskill.mu == pytest.approx({"a": 25, "b": 25})
+    assert trueskill.sigma == pytest.approx({"a": 6.458, "b": 6.458}, abs=1e-3)
+
+
+def test_trueskill_upset_moves_the_ratings_more_than_an_expected_win():
+    expected, upset = TrueSkill(), TrueSkill()
+    for trueskill in (expected, upset):
+        for _ in range(5):
+            trueskill.update("strong", "weak", 0)
+    before = dict(upset.mu)
+    expected.update("strong", "weak", 0)
+    upset.update("strong", "weak", 1)
+    assert expected.mu["strong"] - before["strong"] < before["strong"] - upset.mu["strong"]
+    assert upset.mu["weak"] > before["weak"] and upset.sigma["weak"] < TrueSkill().initial_sigma
@@ -0,0 +1,76 @@
+"""
+ReplayRecorder and ReplayReader round trip: every turn reads back as recorded, in order or at random, on both sides of
+keyframe boundaries and from a replay whose writer was killed before close() wrote the index
+"""
+import os
+import random
+
+import pytest
+
+from lux.replay import KEYFRAME_INTERVAL, ReplayReader, ReplayRecorder
+from simulator.match import BOT_DIR, load_agent, run_match
+
+AGENTS = [os.path.join(BOT_DIR, name) for name in ("ooagent.py", "risk_averse_baseline.py")]
+TURNS = 3 * KEYFRAME_INTERVAL + 5
+
+
+@pytest.fixture(scope="module")
+def game_turns():
+    random.seed(1)
+    recorded = []
+
+    def on_turn(turn, turn_updates, turn_actions):
+        if turn < TURNS:
+            recorded.append((turn, turn_updates[0], turn_actions[0]))
+
+    run_match([load_agent(path) for path in AGENTS], 12, 1, on_turn=on_turn)
+    assert len(recorded) == TURNS
+    return recorded
+
+
+def record(path, game_turns, close=True):
+    recorder = ReplayRecorder(path)
+    for turn, updates, actions in game_turns:
+        recorder.record(turn, updates, actions)
+    if close:
+        recorder.close()
+    return recorder
+
+
+@pytest.mark.parametrize("close", [True, False])
+def test_every_turn_reads_back_as_recorded(tmp_path, game_turns, close):
+    path = str(tmp_path / "replay.lxr")
+    record(path, game_turns, close)
+    reader = ReplayReader(path)
+    assert len(reader) == TURNS and reader.turns == list(range(TURNS))
+    assert list(reader) == [(updates, actions) for _, updates, actions in game_turns]
+    # jumping back and forth makes every read switch keyframes
+    turns = list(range(TURNS))
+    random.Random(0).shuffle(turns)
+    boundaries = [turn for keyframe in range(0, TURNS, KEYFRAME_INTERVAL) for turn in (keyframe - 1, keyframe)
+                  if turn >= 0]
+    for turn in turns + boundaries[::-1]:
+        _, updates, actions = game_turns[turn]
+        assert reader.read_turn(turn) == (updates, actions), f"turn {turn}"
+    reader.close()
+
+
+def test_a_replay_cut_mid_frame_keeps_the_whole_frames(tmp_path, game_turns):
+    path = str(tmp_path / "replay.lxr")
+    recorder = record(path, game_turns, close=False)
+    cut = recorder.offsets[KEYFRAME_INTERVAL + 2] + 5
+    with open(path, "r+b") as replay_file:
+        replay_file.truncate(cut)
+    reader = ReplayReader(path)
+    assert reader.turns == list(range(KEYFRAME_INTERVAL + 2))
+    assert reader.read_turn(KEYFRAME_INTERVAL + 1) == game_turns[KEYFRAME_INTERVAL + 1][1:]
+    assert reader.read_turn(KEYFRAME_INTERVAL - 1) == game_turns[KEYFRAME_INTERVAL - 1][1:]
+    reader.close()
+
+
+def test_empty_turns_read_back_empty(tmp_path):
+    path = str(tmp_path / "replay.lxr")
+    record(path, [(0, ["0", "12 12", "D_DONE"], []), (1, [], ["m u_1 n", "bw 3 4"]), (2, [], [])])
+    reader = ReplayReader(path)
+    assert list(reader) == [(["0", "12 12", "D_DONE"], []), ([], ["m u_1 n", "bw 3 4"]), ([], [])]
+    reader.close()
@@ -0,0 +1,59 @@
+"""
+ResourceProjection.depleted_in, worked out in closed form for coal and uranium and by stepping only the drained wood
+cells, against stepping the whole board forward with project()
+"""
+import os
+import random
+
+import numpy as np
+import pytest
+
+from lux.gamesetup.game import Game
+from lux.resource_projection import NEVER, ResourceProjection
+from lux.tables import MAX_DAYS
+from simulator.match import BOT_DIR, load_agent, run_match
+
+AGENTS = [os.path.join(BOT_DIR, name) for name in ("ooagent.py", "risk_averse_baseline.py")]
+TURNS = [20, 60, 120, 200, 250, 340]
+
+
+def record_turns(size, seed):
+    random.seed(seed)
+    recorded = {}
+
+    def on_turn(turn, turn_updates, _):
+        if turn == 0 or turn in TURNS:
+            recorded[turn] = turn_updates[0]
+
+    run_match([load_agent(path) for path in AGENTS], size, seed, on_turn=on_turn)
+    return recorded
+
+
+@pytest.mark.parametrize("size, seed", [(12, 1), (16, 2), (24, 3)])
+def test_depleted_in_matches_stepping_the_board(size, seed):
+    recorded = record_turns(size, seed)
+    drained = 0
+    for turn in TURNS:
+        if turn not in recorded:  # the game ended before
+            continue
+        game = Game()
+        game._initialize(recorded[0])
+        game._update(recorded[turn])
+        # give one team coal and uranium to drain as well as wood
+        game.players[0].research_points = 200
+        projection = ResourceProjection(game.map, game.players, turn)
+        horizon = MAX_DAYS - turn
+        resources = projection.amount > 0
+        depleted_in = projection.depleted_in[resources]
+        assert (projection.depleted_in[projection.drain == 0] == NEVER).all()
+        drained += int(np.count_nonzero(projection.drain[resources]))
+        for turns in sorted({0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, horizon // 2, horizon}):
+            left = projection.project(turns)[resources] > 0
+            assert ((depleted_in > turns) == left).all(), f"turn {turn}, {turns} turns ahead"
+        assert ((depleted_in == NEVER) == (projection.project(horizon)[resources] > 0)).all()
+        # every cell that runs out still has resource the turn before
+        for turns in np.unique(depleted_in[depleted_in != NEVER]).tolist():
+            running_out = depleted_in == turns
+            assert (projection.project(turns - 1)[resources][running_out] > 0).all()
+            assert (projection.project(turns)[resources][running_out] == 0).all()
+    assert drained > 0
@@ -0,0 +1,63 @@
+"""
+SpatialIndex nearest and k_nearest against sorting every position by distance, on random boards
+"""
+import random
+
+import pytest
+
+from lux.position import Position
+from lux.spatial_index import SpatialIndex
+
+KINDS = ["wood", "coal", "uranium"]
+
+
+def random_index(width, height, count, seed, bucket_size=4):
+    rng = random.Random(seed)
+    cells = rng.sample([(x, y) for x in range(width) for y in range(height)], count)
+    items = [(Position(x, y), rng.choice(KINDS)) for x, y in cells]
+    index = SpatialIndex(width, height, bucket_size)
+    for pos, kind in items:
+        index.add(pos, kind)
+    return rng, index, items
+
+
+def reference_nearest(items, pos, k, kinds=None):
+    """
+    the k closest positions, ties going to the one added first
+    """
+    candidates = [(item_pos - pos, order, item_pos) for order, (item_pos, kind) in enumerate(items)
+                  if kinds is None or kind in kinds]
+    return [item_pos for _, _, item_pos in sorted(candidates)[:k]]
+
+
+@pytest.mark.parametrize("width, height, bucket_size", [(12, 12, 4), (16, 16, 4), (32, 32, 4), (24, 24, 5),
+                                                        (7, 13, 3), (32, 32, 1)])
+def test_k_nearest_matches_sorting_by_distance(width, height, bucket_size):
+    for seed in range(20):
+        count = random.Random(seed).randrange(1, min(60, width * height))
+        rng, index, items = random_index(width, height, count, seed, bucket_size)
+        assert len(index) == count
+        for _ in range(30):
+            pos = Position(rng.randrange(-1, width + 1), rng.randrange(-1, height + 1))
+            k = rng.choice([1, 2, 3, 5, count, count + 3])
+            kinds = rng.choice([None, {"wood"}, {"coal", "uranium"}, set()])
+            expected = reference_nearest(items, pos, k, kinds)
+            assert index.k_nearest(pos, k, kinds) == expected, f"seed {seed} at {pos}, k {k}, kinds {kinds}"
+            assert index.nearest(pos, kinds) == (expected[0] if expected else None)
+
+
+def test_ties_go_to_the_position_added_first():
+    index = SpatialIndex(12, 12)
+    for pos in (Position(7, 5), Position(3, 5), Position(5, 7), Position(5, 3)):
+        index.add(pos)
+    assert index.nearest(Position(5, 5)) == Position(7, 5)
+    assert index.k_nearest(Position(5, 5), 4) == [Position(7, 5), Position(3, 5), Position(5, 7), Position(5, 3)]
+    assert index.nearest(Position(5, 5)) == Position(5, 5).get_closest_from_list(
+        [Position(7, 5), Position(3, 5), Position(5, 7), Position(5, 3)])
+
+
+def test_empty_index_finds_nothing():
+    index = SpatialIndex(12, 12)
+    assert index.nearest(Position(3, 3)) is None and index.k_nearest(Position(3, 3), 5) == []
+    index.add(Position(1, 1))
+    assert index.k_nearest(Position(3, 3), 0) == []
@@ -0,0 +1,34 @@
+"""
+TurnBudget is on for Kaggle runs, whose configuration carries actTimeout, and off for local matches unless
+LUX_TURN_BUDGET says otherwise
+"""
+import pytest
+
+from lux.time_budget import TurnBudget
+
+KAGGLE = {"actTimeout": 3, "episodeSteps": 361}
+
+
+@pytest.mark.parametrize("value, configuration, enabled", [
+    (None, None, False),
+    (None, {}, False),
+    (None, KAGGLE, True),
+    ("on", None, True),
+    ("off", KAGGLE, False),
+    ("OFF", None, False),
+])
+def test_budget_is_only_on_when_asked_or_on_kaggle(monkeypatch, value, configuration, enabled):
+    if value is None:
+        monkeypatch.delenv("LUX_TURN_BUDGET", raising=False)
+    else:
+        monkeypatch.setenv("LUX_TURN_BUDGET", value)
+    assert (TurnBudget.from_environment(configuration) is not None) == enabled
+
+
+def test_overage_spent_halves_the_budget():
+    budget = TurnBudget()
+    budget.start_turn({"step": 0, "remainingOverageTime": 60}, KAGGLE)
+    full = budget.budget
+    assert full == pytest.approx(3 - 0.5 + 60 / 361)
+    budget.start_turn({"step": 1, "remainingOverageTime": 59}, KAGGLE)
+    assert budget.budget == pytest.approx((3 - 0.5 + 59 / 360) / 2)
@@ -0,0 +1,88 @@
+"""
+TurnStore keeps the last capacity turns of a game, one record per turn, in a file or in anonymous memory
+"""
+import os
+import random
+
+import pytest
+
+from lux.turn_store import STATE_FIELDS, TurnStore
+
+
+def make_state(turn):
+    rng = random.Random(turn)
+    state = {name: rng.randrange(1000) for name, _ in STATE_FIELDS}
+    state.update(turn=turn, fuel=rng.randrange(100000) / 4)
+    return state
+
+
+@pytest.fixture(params=["file", "memory"])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(capacity):
+        if request.param == "file":
+            store = TurnStore.create(str(tmp_path / "history.bin"), capacity=capacity)
+        else:
+            store = TurnStore.anonymous(capacity=capacity)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_reads_any_stored_turn(make_store):
+    store = make_store(capacity=64)
+    assert store.read(0) is None and store.read_last() is None
+    for turn in range(40):
+        store.append(make_state(turn))
+    turns = list(range(40))
+    random.Random(0).shuffle(turns)
+    for turn in turns:
+        assert store.read(turn) == make_state(turn)
+    assert store.read(40) is None and store.read(-1) is None
+    assert store.read_last() == make_state(39)
+    assert len(store) == 40
+
+
+def test_overwrites_the_oldest_turns_once_full(make_store):
+    store = make_store(capacity=16)
+    for turn in range(50):
+        store.append(make_state(turn))
+    assert len(store) == 16 and store.count == 50
+    for turn in range(50):
+        assert store.read(turn) == (make_state(turn) if turn >= 34 else None)
+    assert store.read_last() == make_state(49)
+
+
+def test_reopened_file_keeps_the_records(tmp_path):
+    path = str(tmp_path / "history.bin")
+    store = TurnStore.create(path, capacity=8)
+    for turn in range(11):
+        store.append(make_state(turn))
+    store.close()
+    reopened = TurnStore.open(path)
+    assert reopened.count == 11 and reopened.capacity == 8
+    assert [reopened.read(turn) for turn in range(11)] == [None] * 3 + [make_state(turn) for turn in range(3, 11)]
+    reopened.close()
+
+
+def test_writes_a_file_only_when_asked(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("LUX_HISTORY", raising=False)
+    store = TurnStore.from_environment(0)
+    store.append(make_state(0))
+    assert store.path is None and store.read(0) == make_state(0)
+    store.close()
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.setenv("LUX_HISTORY", str(tmp_path / "history_{player}.bin"))
+    store = TurnStore.from_environment(1)
+    store.append(make_state(0))
+    store.close()
+    assert os.listdir(tmp_path) == ["history_1.bin"]
+    reopened = TurnStore.open(store.path)
+    assert reopened.read(0) == make_state(0)
+    reopened.close()